@@ -1,7 +1,150 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import User
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.http import StreamingHttpResponse
+from django.urls import path
+from django.utils.decorators import method_decorator
+from . import bulk_users
+from .models import Lesson, Resource, Sign, User
+from .pagination import estimated_count
+
+CURSOR_VAR = 'after'
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Listado por keyset sobre ``-id``: cada página continúa desde el último id de la anterior
+    (``?after=``) en lugar de usar OFFSET, y el total es ``estimated_count`` (sin ``COUNT(*)``
+    por encima de ``ADMIN_ESTIMATED_COUNT_THRESHOLD`` en PostgreSQL).
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Cambiar de filtro o de búsqueda vuelve a la primera página
+        return super().get_query_string(new_params, [*(remove or []), CURSOR_VAR])
+
+    def get_ordering(self, request, queryset):
+        return ['-pk']
+
+    def get_results(self, request):
+        try:
+            after = int(request.GET.get(CURSOR_VAR) or 0)
+        except ValueError:
+            raise IncorrectLookupParameters
+        queryset = self.queryset.filter(pk__lt=after) if after else self.queryset
+        rows = list(queryset[:self.list_per_page + 1])  # Una fila más indica si hay página siguiente
+
+        self.result_list = rows[:self.list_per_page]
+        self.next_url = self.get_query_string({CURSOR_VAR: rows[-2].pk}) if len(rows) > self.list_per_page else None
+        self.first_url = self.get_query_string() if after else None
+        self.result_count = estimated_count(self.queryset, settings.ADMIN_ESTIMATED_COUNT_THRESHOLD)
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = False  # Sin enlaces por número de página (admin/core/user/pagination.html)
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'is_deaf', 'is_mute', 'is_staff')
+    list_filter = ('role', 'is_deaf', 'is_mute', 'email_verified')
+    search_fields = ('email', 'username', 'name')
+    search_help_text = "Email, usuario o nombre (en SQLite, solo por el inicio del email o del usuario)."
+    sortable_by = ()  # Siempre por -id: el orden del keyset y de los índices de los filtros
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER  # Los contadores por filtro son un COUNT por opción
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        En PostgreSQL, subcadena sobre ``LOWER(campo)`` con los índices de trigramas de la
+        migración 0012. En otros motores, prefijo como rango sobre los índices de
+        ``LOWER(email)`` y ``username``.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        lowered = term.lower()
+        queryset = queryset.alias(email_lower=Lower('email'))
+        if connections[queryset.db].vendor == 'postgresql':
+            queryset = queryset.alias(username_lower=Lower('username'), name_lower=Lower('name'))
+            lookup = 'contains' if len(lowered) >= 3 else 'startswith'  # Un trigrama necesita 3 caracteres
+            condition = (
+                Q(**{f'email_lower__{lookup}': lowered})
+                | Q(**{f'username_lower__{lookup}': lowered})
+                | Q(**{f'name_lower__{lookup}': lowered})
+            )
+        else:
+            # U+10FFFF es mayor que cualquier carácter en la comparación binaria de SQLite
+            condition = (
+                Q(email_lower__gte=lowered, email_lower__lt=lowered + '\U0010ffff')
+                | Q(username__gte=term, username__lt=term + '\U0010ffff')
+            )
+        return queryset.filter(condition), False
+
+    @method_decorator(transaction.non_atomic_requests)
+    def changelist_view(self, request, extra_context=None):
+        """
+        Listado de solo lectura fuera de ATOMIC_REQUESTS para que se sirva desde las réplicas.
+        Las acciones masivas (POST) abren su propia transacción.
+        """
+        if request.method == 'POST':
+            with transaction.atomic():
+                return super().changelist_view(request, extra_context)
+        return super().changelist_view(request, extra_context)
+
+    def get_urls(self):
+        return [
+            path('export/', self.admin_site.admin_view(self.export_view), name='core_user_export'),
+        ] + super().get_urls()
+
+    @method_decorator(transaction.non_atomic_requests)
+    def export_view(self, request):
+        """
+        Descarga de todos los usuarios (``?format=csv|ndjson``) en streaming con un cursor del servidor.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        fmt = 'ndjson' if request.GET.get('format') == 'ndjson' else 'csv'
+        # Bajo ASGI un iterador síncrono se consumiría entero antes de enviarse
+        lines = bulk_users.aexport_lines(fmt) if isinstance(request, ASGIRequest) else bulk_users.export_lines(fmt)
+        content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="usuarios.{fmt}"'
+        return response
 
 admin.site.register(User, UserAdmin)
+
+
+class SignAdmin(admin.ModelAdmin):
+    list_display = ('name', 'aliases', 'updated_at')
+    search_fields = ('name', 'aliases')
+
+admin.site.register(Sign, SignAdmin)
+
+
+class ResourceInline(admin.TabularInline):
+    model = Resource
+    extra = 1
+
+
+class LessonAdmin(admin.ModelAdmin):
+    list_display = ('title', 'level', 'position', 'is_published', 'updated_at')
+    list_filter = ('level', 'is_published')
+    prepopulated_fields = {'slug': ('title',)}
+    inlines = [ResourceInline]
+
+admin.site.register(Lesson, LessonAdmin)
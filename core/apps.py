@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -6,3 +7,16 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # Asegúrate de que las señales se importen
+        from django.db.backends.signals import connection_created
+        from core.instrumentation import install
+
+        # Contador de consultas y tiempo de base de datos por petición
+        connection_created.connect(install, dispatch_uid='core.instrumentation.install')
+
+        # Las tareas periódicas (purgas, envío de correos, revocaciones) se inician desde
+        # asgi.py/wsgi.py con core.scheduler.start_background_tasks
+
+        # Precarga opcional del modelo de reconocimiento
+        if settings.RECOGNITION_WARMUP:
+            from core.classifiers import warm_up
+            warm_up()
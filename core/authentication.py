@@ -0,0 +1,80 @@
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from . import revocation
+from .cache import TTLCache
+from .models import User
+
+# Usuarios completos por id; se invalida en cada User.save/delete (ver core/signals.py)
+user_cache = TTLCache(settings.USER_CACHE_MAXSIZE, settings.USER_CACHE_TTL)
+
+
+def get_cached_user(user_id):
+    """
+    Devuelve el ``User`` con ese id desde la caché del proceso o la base de datos.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("Usuario no encontrado.", code='user_not_found')
+        user_cache.set(user_id, user)
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuario construido solo con los claims firmados del token (id, role, email_verified,
+    is_deaf, is_mute, is_staff). Las vistas que necesiten el modelo completo usan ``get_user()``.
+    """
+
+    def get_user(self):
+        return get_cached_user(self.id)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT sin consultar ``User`` en cada petición.
+
+    Los cambios de rol o la desactivación de una cuenta se reflejan cuando el token se
+    renueva (``ACCESS_TOKEN_LIFETIME``), no en cada petición.
+    """
+
+    def get_validated_token(self, raw_token):
+        """
+        Valida el token y comprueba que no se haya revocado (logout). Sin consultas salvo
+        que el filtro de Bloom de ``core.revocation`` dé positivo.
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if revocation.get_store().is_revoked(validated_token.get(api_settings.JTI_CLAIM), validated_token.get('exp')):
+            raise InvalidToken("El token ha sido revocado.")
+        return validated_token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("El token no contiene un identificador de usuario.")
+        return ClaimsUser(validated_token)
+
+
+def authenticate_request(request, cookie=True):
+    """
+    Usuario del access token del header ``Authorization`` o, si no lo hay y ``cookie`` es
+    verdadero, de la cookie ``access`` (un elemento ``<video>`` no puede enviar headers).
+    Las vistas que modifican datos no aceptan la cookie (no tienen protección CSRF).
+    Devuelve ``None`` si no es válido.
+    """
+    authentication = StatelessJWTAuthentication()
+    try:
+        result = authentication.authenticate(request)
+        if result is not None:
+            return result[0]
+        raw_token = request.COOKIES.get('access') if cookie else None
+        if not raw_token:
+            return None
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except AuthenticationFailed:
+        return None
@@ -0,0 +1,31 @@
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import User
+
+
+class EmailBackend(ModelBackend):
+    """
+    Autentica por email sin distinguir mayúsculas (índice ``Lower(email)``) o por username,
+    en una sola consulta.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = (
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(Q(email_lower=username.lower()) | Q(username=username))
+            .first()
+        )
+        if user is None:
+            # Igualar el tiempo de respuesta con el de un usuario existente (ver ModelBackend)
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
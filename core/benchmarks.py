@@ -0,0 +1,255 @@
+import asyncio
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.utils import timezone
+
+from .models import TranslationEvent, User, VerificationToken
+
+PASSWORD = 'Bench-Password-123'
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Scenario:
+    """
+    Escenario de carga para un endpoint: prepara los datos y genera el cuerpo de cada petición.
+    """
+    name = None
+    path = None
+    expected_status = 200
+
+    def __init__(self, run_id, total):
+        self.run_id = run_id
+        self.total = total
+
+    def setup(self):
+        pass
+
+    def payload(self, index):
+        raise NotImplementedError
+
+    def email(self, index):
+        return f'bench-{self.run_id}-{index}@example.com'
+
+
+class RegisterScenario(Scenario):
+    name = 'register'
+    path = '/api/auth/register/'
+    expected_status = 201
+
+    def payload(self, index):
+        return {
+            'email': self.email(index),
+            'name': 'Bench',
+            'password': PASSWORD,
+            'confirm_password': PASSWORD,
+            'security_question_1': 'q1',
+            'security_answer_1': 'a1',
+            'security_question_2': 'q2',
+            'security_answer_2': 'a2',
+        }
+
+
+class LoginScenario(Scenario):
+    name = 'login'
+    path = '/api/auth/login/'
+    users = 50
+
+    def setup(self):
+        # Un único hash compartido: la preparación no debe costar un PBKDF2 por usuario
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            User(username=self.email(i), email=self.email(i), password=password) for i in range(self.users)
+        )
+
+    def payload(self, index):
+        return {'email': self.email(index % self.users), 'password': PASSWORD}
+
+
+class VerifyEmailScenario(Scenario):
+    name = 'verify-email'
+    path = '/api/auth/verify-email/'
+
+    def setup(self):
+        expires = timezone.now() + timedelta(hours=1)
+        User.objects.bulk_create(User(username=self.email(i), email=self.email(i)) for i in range(self.total))
+        VerificationToken.objects.bulk_create(
+            VerificationToken(identifier=self.email(i), token=f'{self.run_id}-{i}', expires=expires)
+            for i in range(self.total)
+        )
+
+    def payload(self, index):
+        return {'token': f'{self.run_id}-{index}'}
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (RegisterScenario, LoginScenario, VerifyEmailScenario)}
+
+
+def percentile(values, pct):
+    """
+    Percentil por interpolación lineal sobre una lista ya ordenada.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _queries(response):
+    match = SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+def _run_wsgi(scenario, concurrency):
+    local = threading.local()
+
+    def call(index):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+        started = time.perf_counter()
+        response = client.post(scenario.path, scenario.payload(index), content_type='application/json')
+        return time.perf_counter() - started, response.status_code, _queries(response)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(call, range(scenario.total)))
+
+
+def _run_asgi(scenario, concurrency):
+    async def main():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(index):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(scenario.path, scenario.payload(index), content_type='application/json')
+                return time.perf_counter() - started, response.status_code, _queries(response)
+
+        return await asyncio.gather(*(call(i) for i in range(scenario.total)))
+
+    return asyncio.run(main())
+
+
+def run_scenario(name, requests, concurrency, mode='asgi'):
+    """
+    Ejecuta ``requests`` peticiones contra el endpoint y devuelve sus estadísticas.
+    """
+    scenario = SCENARIOS[name](uuid.uuid4().hex[:8], requests)
+    scenario.setup()
+
+    runner = _run_asgi if mode == 'asgi' else _run_wsgi
+    started = time.perf_counter()
+    samples = runner(scenario, concurrency)
+    wall = time.perf_counter() - started
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    errors = sum(1 for sample in samples if sample[1] != scenario.expected_status)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput_rps': round(len(samples) / wall, 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def environment():
+    """
+    Datos del entorno que acompañan a los resultados para poder compararlos.
+    """
+    return {
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'password_hasher': settings.PASSWORD_HASHERS[0],
+        'hashing_pool_workers': settings.HASHING_POOL_MAX_WORKERS,
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Lista las regresiones de ``current`` frente a ``baseline`` por encima de ``threshold``
+    (fracción): más latencia p95/p99, menos throughput o más consultas por petición.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for metric in ('p95_ms', 'p99_ms', 'queries_per_request'):
+            if base.get(metric) and result.get(metric) is not None and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f'{name}: {metric} {base[metric]} -> {result[metric]}')
+        if base.get('throughput_rps') and result['throughput_rps'] < base['throughput_rps'] * (1 - threshold):
+            regressions.append(f"{name}: throughput_rps {base['throughput_rps']} -> {result['throughput_rps']}")
+    return regressions
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def serialization(rows=1000, repeat=5):
+    """
+    Micro-benchmark de la serialización de respuestas, sin base de datos: historial de
+    traducciones con ``rows`` filas y perfil de un usuario repetido ``rows`` veces. Compara
+    ``ModelSerializer`` + ``JSONRenderer`` de DRF con ``ValuesSerializer`` + ``FastJSONRenderer``.
+    Devuelve milisegundos (mejor de ``repeat``) por caso y ruta.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from .fastjson import FastJSONRenderer
+    from .serializers import (
+        TranslationEventSerializer, TranslationEventValuesSerializer, UserReadSerializer, UserValuesSerializer,
+    )
+
+    now = timezone.now()
+    events = [
+        TranslationEvent(id=i, label=f'signo-{i % 50}', confidence=0.5 + i % 50 / 100, model_version='v1', created_at=now)
+        for i in range(rows)
+    ]
+    # Lo que devolvería .values(): el coste de crear las instancias tampoco se paga en la ruta rápida
+    event_rows = [TranslationEventValuesSerializer.to_representation(event) for event in events]
+    user = User(id=1, email='bench@example.com', name='Bench', role='user', date_joined=now)
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+
+    cases = {
+        'history': (
+            lambda: drf.render(TranslationEventSerializer(events, many=True).data),
+            lambda: fast.render(list(event_rows)),
+        ),
+        'profile': (
+            lambda: [drf.render(UserReadSerializer(user).data) for _ in range(rows)],
+            lambda: [fast.render(UserValuesSerializer.to_representation(user)) for _ in range(rows)],
+        ),
+    }
+    results = {}
+    for name, (baseline, current) in cases.items():
+        drf_ms = _best_of(baseline, repeat) * 1000
+        fast_ms = _best_of(current, repeat) * 1000
+        results[name] = {
+            'drf_ms': round(drf_ms, 2),
+            'fast_ms': round(fast_ms, 2),
+            'speedup': round(drf_ms / fast_ms, 1),
+        }
+    return results
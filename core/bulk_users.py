@@ -0,0 +1,267 @@
+"""
+Alta masiva y exportación de usuarios (comandos ``import_users`` y ``export_users`` y
+exportación desde el admin).
+
+La importación lee el CSV o NDJSON fila a fila y procesa lotes de ``batch_size`` usuarios:
+valida cada fila, calcula los hashes de contraseña y respuestas de seguridad en un pool de
+procesos (el coste del hasher es todo CPU) e inserta el lote con ``bulk_create`` en una
+transacción. Una fila inválida o duplicada se informa con su número de línea sin detener
+el resto.
+
+La exportación recorre la tabla con ``.iterator(chunk_size=...)``: en PostgreSQL es un
+cursor del servidor, así que la memoria no depende del número de usuarios.
+"""
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import validate_email
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import hashers
+from .models import User
+
+IMPORT_FIELDS = (
+    'email', 'name', 'password', 'role', 'is_deaf', 'is_mute',
+    'security_question_1', 'security_answer_1', 'security_question_2', 'security_answer_2',
+)
+EXPORT_FIELDS = (
+    'id', 'email', 'name', 'role', 'is_deaf', 'is_mute', 'email_verified', 'is_active', 'date_joined', 'last_login',
+)
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'si', 'sí', 'x'}
+ROLES = dict(User.ROLE_CHOICES)
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(stream, fmt):
+    """
+    Genera ``(línea, fila)`` desde un CSV con cabecera o un NDJSON. Una línea NDJSON
+    ilegible se genera como ``(línea, RowError)``.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RowError(f"JSON inválido: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Cada línea debe ser un objeto JSON.")
+            continue
+        yield line_number, row
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def clean_row(row):
+    """
+    Valida una fila y devuelve sus valores normalizados; ``RowError`` con el motivo si no es válida.
+    """
+    email = str(row.get('email') or '').strip()
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise RowError(f"Email inválido: {email!r}")
+    if len(email) > USERNAME_MAX_LENGTH:
+        raise RowError(f"El email supera los {USERNAME_MAX_LENGTH} caracteres.")
+    password = str(row.get('password') or '')
+    if not password:
+        raise RowError("Falta la contraseña.")
+    role = str(row.get('role') or 'user').strip()
+    if role not in ROLES:
+        raise RowError(f"Rol desconocido: {role!r}")
+    return {
+        'email': email,
+        'name': str(row.get('name') or '').strip(),
+        'password': password,
+        'role': role,
+        'is_deaf': _flag(row.get('is_deaf')),
+        'is_mute': _flag(row.get('is_mute')),
+        'security_question_1': str(row.get('security_question_1') or ''),
+        'security_answer_1': str(row.get('security_answer_1') or ''),
+        'security_question_2': str(row.get('security_question_2') or ''),
+        'security_answer_2': str(row.get('security_answer_2') or ''),
+    }
+
+
+def get_pool(workers):
+    """
+    Pool de procesos para los hashes. Usa ``spawn``, como ``core.uploads``; cada proceso
+    configura Django para leer ``PASSWORD_HASHERS`` (ver ``hashers.init_worker``).
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=hashers.init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'traductor_LSE.settings'),),
+    )
+
+
+def _build_user(values, hashes, verified):
+    password, answer_1, answer_2 = hashes
+    return User(
+        username=values['email'],  # bulk_create no llama a User.save
+        email=values['email'],
+        name=values['name'],
+        password=password,
+        role=values['role'],
+        is_deaf=values['is_deaf'],
+        is_mute=values['is_mute'],
+        security_question_1=values['security_question_1'],
+        security_answer_1=answer_1,
+        security_question_2=values['security_question_2'],
+        security_answer_2=answer_2,
+        email_verified=verified,
+    )
+
+
+def _insert_batch(batch, pool, verified, on_error):
+    """
+    Inserta un lote de ``(línea, valores)``. Devuelve el número de usuarios creados.
+    """
+    # Del primario: sin falsos negativos por retraso de réplica. Los duplicados no se hashean.
+    existing = set(
+        User.objects.using(DEFAULT_DB_ALIAS).annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=[values['email'].lower() for _, values in batch])
+        .values_list('email_lower', flat=True)
+    )
+    pending = []
+    for line, values in batch:
+        if values['email'].lower() in existing:
+            on_error(line, values['email'], "Ya existe un usuario con este email.")
+        else:
+            pending.append((line, values))
+
+    # Los hashes se calculan antes de abrir la transacción, que solo dura lo que el INSERT
+    secrets = [(values['password'], values['security_answer_1'], values['security_answer_2']) for _, values in pending]
+    if pool is None:
+        hashes = map(hashers.hash_secrets, secrets)
+    else:
+        hashes = pool.map(hashers.hash_secrets, secrets, chunksize=16)
+    users = [_build_user(values, item, verified) for (_, values), item in zip(pending, hashes)]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+        return len(users)
+    except IntegrityError:
+        pass
+
+    # Conflicto con una escritura concurrente (p. ej. el username de otro usuario):
+    # se inserta fila a fila para identificar las que fallan.
+    created = 0
+    for (line, values), user in zip(pending, users):
+        try:
+            with transaction.atomic():
+                user.save()
+            created += 1
+        except IntegrityError as exc:
+            on_error(line, values['email'], f"Conflicto al insertar: {exc}")
+    return created
+
+
+def import_users(stream, fmt='csv', batch_size=500, workers=None, verified=False, on_error=None):
+    """
+    Importa los usuarios de ``stream``. ``workers=0`` calcula los hashes en el propio proceso.
+    ``on_error(línea, email, mensaje)`` recibe cada fila rechazada. Devuelve ``(creados, rechazados)``.
+    """
+    errors = 0
+
+    def report(line, email, message):
+        nonlocal errors
+        errors += 1
+        if on_error:
+            on_error(line, email, message)
+
+    workers = os.cpu_count() if workers is None else workers
+    pool = get_pool(workers) if workers else None
+    created = 0
+    seen = set()
+    batch = []
+    try:
+        for line, row in read_rows(stream, fmt):
+            if isinstance(row, RowError):
+                report(line, '', str(row))
+                continue
+            try:
+                values = clean_row(row)
+            except RowError as exc:
+                report(line, str(row.get('email') or ''), str(exc))
+                continue
+            key = values['email'].lower()
+            if key in seen:
+                report(line, values['email'], "Email repetido en el fichero.")
+                continue
+            seen.add(key)
+            batch.append((line, values))
+            if len(batch) >= batch_size:
+                created += _insert_batch(batch, pool, verified, report)
+                batch = []
+        if batch:
+            created += _insert_batch(batch, pool, verified, report)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return created, errors
+
+
+class _Echo:
+    """
+    Pseudo-fichero para ``csv.writer``: devuelve la línea en lugar de acumularla.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_lines(fmt='csv', chunk_size=2000):
+    """
+    Genera la exportación de usuarios línea a línea (sin hashes ni respuestas de seguridad).
+    """
+    rows = User.objects.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+async def aexport_lines(fmt='csv', chunk_size=2000):
+    """
+    Versión asíncrona para ``StreamingHttpResponse`` bajo ASGI, que si no consumiría el
+    iterador síncrono completo en memoria. Cada bloque se lee en el hilo síncrono de la
+    petición, el mismo que tiene abierto el cursor.
+    """
+    lines = export_lines(fmt, chunk_size)
+    take = sync_to_async(lambda: ''.join(islice(lines, chunk_size)))
+    try:
+        while True:
+            chunk = await take()
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(lines.close)()
@@ -0,0 +1,70 @@
+"""
+Versionado y caché de los catálogos de contenido (lecciones y recursos).
+
+Cada catálogo tiene un contador en ``CatalogueVersion`` que se incrementa con cualquier
+modificación (señales de ``core.signals``, p. ej. al editar desde el admin). La versión se
+lee de la caché, así que calcular el ETag de una petición no consulta la base de datos; las
+páginas ya renderizadas se guardan con la versión en la clave, de modo que un cambio las
+invalida todas sin tener que borrarlas.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from .models import CatalogueVersion
+
+LEARNING = 'learning'
+
+
+def _cache():
+    return caches[settings.CATALOGUE_CACHE]
+
+
+def _version_key(name):
+    return f'catalogue:{name}:version'
+
+
+def get_version(name=LEARNING):
+    """
+    Versión actual del catálogo; solo consulta la base de datos si no está en caché.
+    """
+    key = _version_key(name)
+    version = _cache().get(key)
+    if version is None:
+        # Siempre del primario: una réplica con retraso fijaría una versión antigua en la caché
+        version = (
+            CatalogueVersion.objects.using(DEFAULT_DB_ALIAS)
+            .filter(name=name).values_list('version', flat=True).first()
+        ) or 0
+        _cache().set(key, version, settings.CATALOGUE_VERSION_TTL)
+    return version
+
+
+def bump(name=LEARNING):
+    """
+    Incrementa la versión del catálogo. La caché se limpia al confirmar la transacción para
+    que ninguna lectura concurrente vuelva a guardar la versión anterior.
+    """
+    if not CatalogueVersion.objects.filter(name=name).update(version=F('version') + 1):
+        CatalogueVersion.objects.get_or_create(name=name, defaults={'version': 1})
+    transaction.on_commit(lambda: _cache().delete(_version_key(name)))
+
+
+def etag(version, name=LEARNING):
+    return f'"{name}-{version}"'
+
+
+def page_key(version, path, name=LEARNING):
+    digest = hashlib.blake2b(path.encode(), digest_size=16).hexdigest()
+    return f'catalogue:{name}:{version}:{digest}'
+
+
+def get_page(version, path, name=LEARNING):
+    return _cache().get(page_key(version, path, name))
+
+
+def set_page(version, path, content, name=LEARNING):
+    _cache().set(page_key(version, path, name), content, settings.CATALOGUE_PAGE_TTL)
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import model_registry
+
+
+def normalize_windows(windows):
+    """
+    Normaliza un lote de ventanas ``(B, W, F)`` de keypoints: resta la media y divide por la
+    desviación típica de cada ventana, de modo que la posición y la distancia a la cámara
+    no afecten a la clasificación.
+    """
+    windows = windows.astype(np.float32, copy=False)
+    mean = windows.mean(axis=(1, 2), keepdims=True)
+    std = windows.std(axis=(1, 2), keepdims=True)
+    return (windows - mean) / np.maximum(std, 1e-6)
+
+
+class Classifier:
+    """
+    Interfaz de los clasificadores de señas.
+
+    ``predict`` recibe un lote ``(B, W, F)`` de ventanas normalizadas y devuelve dos arrays
+    de longitud ``B``: el índice de la etiqueta y su confianza. ``revision`` distingue pesos
+    distintos publicados con el mismo nombre de versión (forma parte de la clave de la caché
+    de resultados).
+    """
+    labels = ()
+    version = ''
+    revision = ''
+
+    def predict(self, windows):
+        raise NotImplementedError
+
+
+class LinearClassifier(Classifier):
+    """
+    Clasificador lineal vectorizado: media temporal de la ventana, proyección y softmax.
+    """
+
+    def __init__(self, weights, bias, labels, version='', revision=''):
+        self.weights = weights  # (F, C)
+        self.bias = bias  # (C,)
+        self.labels = tuple(labels)
+        self.version = version
+        self.revision = revision
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Construye el clasificador sobre los arrays (memmaps) de una versión del registro.
+        """
+        return cls(
+            model.arrays['weights'], model.arrays['bias'], model.manifest['labels'], model.version,
+            revision=str(model.manifest.get('created', '')),
+        )
+
+    def predict(self, windows):
+        logits = windows.mean(axis=1) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        indices = probabilities.argmax(axis=1)
+        return indices, probabilities[np.arange(len(indices)), indices]
+
+
+class StubClassifier(LinearClassifier):
+    """
+    Modelo de prueba con pesos pseudoaleatorios fijos, para desarrollo y tests.
+    """
+
+    def __init__(self, classes=10):
+        rng = np.random.default_rng(0)
+        features = settings.RECOGNITION_FEATURES
+        super().__init__(
+            weights=rng.standard_normal((features, classes)).astype(np.float32),
+            bias=np.zeros(classes, dtype=np.float32),
+            labels=[f'seña_{i}' for i in range(classes)],
+            version='stub',
+        )
+
+
+_classifier = None
+_served = (None, None)  # (versión del registro, clasificador construido sobre ella)
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """
+    Devuelve el clasificador activo.
+
+    Si hay una versión activa en el registro de modelos (``RECOGNITION_MODEL_DIR``) se usa
+    esa; si no, el clasificador configurado en ``RECOGNITION_CLASSIFIER`` (uno por proceso).
+    """
+    global _classifier, _served
+    registry = model_registry.get_registry()
+    model = registry.current() if registry is not None else None
+    if model is not None:
+        served_model, classifier = _served
+        if served_model is not model:
+            classifier = LinearClassifier.from_model(model)
+            _served = (model, classifier)
+        return classifier
+
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = import_string(settings.RECOGNITION_CLASSIFIER)()
+    return _classifier
+
+
+def warm_up():
+    """
+    Carga el clasificador y ejecuta una predicción vacía para que las páginas de los pesos
+    estén en memoria antes de la primera petición.
+    """
+    windows = np.zeros((1, settings.RECOGNITION_WINDOW, settings.RECOGNITION_FEATURES), dtype=np.float32)
+    get_classifier().predict(windows)
@@ -0,0 +1,175 @@
+"""
+Texto en español a secuencia de señas (LSE).
+
+A partir de la tabla ``Sign`` (solo las señas con clip) se construye una vez un trie por
+palabras con el nombre y los ``aliases`` de cada seña, normalizados: minúsculas y sin tildes
+(la ñ se conserva). Componer una frase es recorrer sus palabras tomando en cada posición la
+expresión más larga del trie ("buenos días" antes que "buenos"). Una palabra sin seña se
+prueba en singular y, si tampoco, se deletrea con el alfabeto dactilológico: las señas
+llamadas ``TEXT_TO_SIGN_LETTER_PREFIX`` + letra ("letra a", "letra ll"...).
+
+Las listas de reproducción se recuerdan en una ``TTLCache`` acotada por frase normalizada,
+así que las frases habituales no recorren el trie. Como mucho cada
+``TEXT_TO_SIGN_REFRESH_INTERVAL`` segundos una consulta comprueba si la tabla ha cambiado;
+si es así, el índice se reconstruye y las listas anteriores dejan de usarse.
+"""
+import re
+import threading
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+from .cache import TTLCache
+
+TOKEN_RE = re.compile(r'\w+')
+ACCENTS = str.maketrans('áéíóúüàèìòùâêîôûäëïö', 'aeiouuaeiouaeiouaeio')
+PLURAL_SUFFIXES = (('ces', 'z'), ('es', ''), ('s', ''))  # luces -> luz, flores -> flor, casas -> casa
+END = None  # Clave del nodo del trie con la seña de la expresión que termina en él
+
+
+def normalize(text):
+    return text.lower().translate(ACCENTS)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+class SignCompositor:
+    """
+    Índice de expresiones y alfabeto dactilológico con la caché de listas de reproducción.
+    El estado se publica con una sola asignación, como en ``core.sign_index``.
+    """
+
+    def __init__(self, letter_prefix='letra ', cache_size=10000, cache_ttl=3600, refresh_interval=5.0):
+        self.letter_prefix = normalize(letter_prefix)
+        self.refresh_interval = refresh_interval
+        self.playlists = TTLCache(cache_size, cache_ttl)
+        self._state = ({}, {}, 1, 0)  # (trie, letras, longitud de la letra más larga, generación)
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        self._checked_at = None
+
+    def build(self, rows):
+        """
+        Construye el índice desde filas ``(id, name, aliases, clip)``. Si dos señas comparten
+        una forma, se queda la primera.
+        """
+        # Un solo reverse(): con miles de señas es la mayor parte del tiempo de construcción
+        media_url = reverse('media', kwargs={'path': '_'})[:-1]
+        trie, letters = {}, {}
+        for sign_id, name, aliases, clip in rows:
+            entry = {'sign': sign_id, 'name': name, 'clip': media_url + quote(clip, safe=RFC3986_SUBDELIMS + '/~:@')}
+            for form in [name, *aliases.split(',')]:
+                tokens = tokenize(form)
+                if not tokens:
+                    continue
+                node = trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(END, entry)
+            key = normalize(name)
+            if key.startswith(self.letter_prefix) and key[len(self.letter_prefix):].strip():
+                letters.setdefault(key[len(self.letter_prefix):].strip(), entry)
+        generation = self._state[3] + 1
+        self._state = (trie, letters, max(map(len, letters), default=1), generation)
+        self.playlists.clear()
+
+    def refresh(self):
+        from .models import Sign
+
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            signs = Sign.objects.exclude(clip='')
+            version = tuple(signs.aggregate(Count('id'), Max('updated_at')).values())
+            if version != self._version:
+                self.build(signs.order_by('id').values_list('id', 'name', 'aliases', 'clip'))
+                self._version = version
+            self._checked_at = now
+
+    def compose(self, text):
+        """
+        Lista de reproducción de ``text``: una entrada por seña con el texto que cubre. Las
+        entradas ``letter`` deletrean una palabra sin seña y ``unknown`` marca los caracteres
+        sin seña en el alfabeto. La lista es compartida: no debe modificarse.
+        """
+        self.refresh()
+        trie, letters, longest, generation = self._state
+        tokens = tokenize(text)
+        key = (generation, ' '.join(tokens))
+        playlist = self.playlists.get(key)
+        if playlist is None:
+            playlist = self._compose(tokens, trie, letters, longest)
+            self.playlists.set(key, playlist)
+        return playlist
+
+    def _compose(self, tokens, trie, letters, longest):
+        items = []
+        position = 0
+        while position < len(tokens):
+            node, end, entry = trie, position + 1, None
+            for index in range(position, len(tokens)):
+                node = node.get(tokens[index])
+                if node is None:
+                    break
+                if END in node:
+                    end, entry = index + 1, node[END]
+            if entry is None:
+                entry = self._singular(tokens[position], trie)
+            if entry is None:
+                items.extend(self._fingerspell(tokens[position], letters, longest))
+            else:
+                items.append({'type': 'sign', 'text': ' '.join(tokens[position:end]), **entry})
+            position = end
+        return tuple(items)
+
+    @staticmethod
+    def _singular(token, trie):
+        for suffix, replacement in PLURAL_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix) + 1:
+                node = trie.get(token[:-len(suffix)] + replacement)
+                if node is not None and END in node:
+                    return node[END]
+        return None
+
+    @staticmethod
+    def _fingerspell(word, letters, longest):
+        # Las letras dobles ("ll", "rr", "ch") tienen su propia seña: se prueba primero la más larga
+        items = []
+        position = 0
+        while position < len(word):
+            for size in range(min(longest, len(word) - position), 0, -1):
+                entry = letters.get(word[position:position + size])
+                if entry is not None:
+                    break
+            text = word[position:position + size]
+            items.append({'type': 'letter', 'text': text, **entry} if entry else {'type': 'unknown', 'text': text})
+            position += size
+        return items
+
+
+_compositor = None
+_compositor_lock = threading.Lock()
+
+
+def get_compositor():
+    global _compositor
+    if _compositor is None:
+        with _compositor_lock:
+            if _compositor is None:
+                _compositor = SignCompositor(
+                    settings.TEXT_TO_SIGN_LETTER_PREFIX,
+                    settings.TEXT_TO_SIGN_CACHE_SIZE,
+                    settings.TEXT_TO_SIGN_CACHE_TTL,
+                    settings.TEXT_TO_SIGN_REFRESH_INTERVAL,
+                )
+    return _compositor
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+# Variables de contexto de la petición que deben seguirla a otros hilos (p. ej. el pool de
+# hashing). No se copia el contexto completo porque incluye las conexiones de Django,
+# que no pueden compartirse entre hilos.
+_propagated = []
+
+
+def propagate(var):
+    """
+    Registra una ``ContextVar`` para que se traslade a los hilos de trabajo. Devuelve la variable.
+    """
+    _propagated.append(var)
+    return var
+
+
+def snapshot():
+    """
+    Captura los valores actuales de las variables registradas.
+    """
+    return [(var, var.get(None)) for var in _propagated]
+
+
+@contextmanager
+def restore(values):
+    """
+    Aplica en el hilo actual los valores capturados con ``snapshot`` mientras dure el bloque.
+    """
+    tokens = [(var, var.set(value)) for var, value in values]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
@@ -0,0 +1,70 @@
+"""
+JSON rápido para las respuestas y peticiones de la API.
+
+Con ``orjson`` instalado (dependencia opcional) la serialización y el parseo se hacen en
+código nativo; sin él, todo recae en los equivalentes de DRF y Django, con la misma salida.
+Los tipos que ``orjson`` no conoce (``Decimal``, cadenas perezosas de traducción, etc.) se
+delegan en el encoder de DRF o de Django.
+"""
+from django import http
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin ella se usan los serializadores estándar
+    orjson = None
+
+_drf_default = JSONEncoder().default
+_django_default = DjangoJSONEncoder().default
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    ``JSONRenderer`` con ``orjson``. Las fechas se escriben como el ``DateTimeField`` de DRF
+    (ISO 8601 con ``Z``); la indentación del ``Accept`` se respeta (2 espacios).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_drf_default, option=option)
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` con ``orjson``, que rechaza ``NaN`` e ``Infinity`` como el modo estricto de DRF.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class JsonResponse(http.JsonResponse):
+    """
+    ``django.http.JsonResponse`` serializado con ``orjson``. Las fechas pasan por
+    ``DjangoJSONEncoder`` para que la salida sea idéntica a la de Django.
+    """
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if orjson is None or encoder is not DjangoJSONEncoder or json_dumps_params:
+            super().__init__(data, encoder, safe, json_dumps_params, **kwargs)
+            return
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        content = orjson.dumps(data, default=_django_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        http.HttpResponse.__init__(self, content=content, **kwargs)
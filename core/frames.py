@@ -0,0 +1,122 @@
+"""
+Extracción de frames de los clips subidos. Se ejecuta en los procesos del pool de
+``core.uploads``, así que no depende de Django: solo Pillow, NumPy y, si está instalado,
+OpenCV (``cv2``) para decodificar video.
+"""
+import json
+import os
+import zipfile
+
+import numpy as np
+from PIL import Image, ImageOps, ImageSequence
+
+try:
+    import cv2
+except ImportError:  # Dependencia opcional: sin ella solo se aceptan imágenes
+    cv2 = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+
+
+class UnsupportedMedia(Exception):
+    pass
+
+
+def _zip_frames(path):
+    with zipfile.ZipFile(path) as archive:
+        names = sorted(name for name in archive.namelist() if name.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names:
+            with archive.open(name) as fh:
+                with Image.open(fh) as image:
+                    image.load()
+                    yield image
+
+
+def _image_frames(path):
+    with Image.open(path) as image:
+        # GIF, WebP o TIFF animados tienen varios frames; el resto, uno
+        for frame in ImageSequence.Iterator(image):
+            yield frame
+
+
+def _video_frames(path, max_frames):
+    if cv2 is None:
+        raise UnsupportedMedia("La decodificación de video requiere opencv-python-headless.")
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise UnsupportedMedia("No se pudo abrir el video.")
+    try:
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or max_frames
+        step = max(1, total // max_frames)  # Submuestreo uniforme hasta max_frames
+        index = 0
+        while True:
+            ok = capture.grab()
+            if not ok:
+                break
+            if index % step == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    yield Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            index += 1
+    finally:
+        capture.release()
+
+
+def iter_frames(path, kind, max_frames):
+    if kind == 'video':
+        return _video_frames(path, max_frames)
+    if zipfile.is_zipfile(path):
+        return _zip_frames(path)
+    return _image_frames(path)
+
+
+def normalize_frame(image, size):
+    """
+    Orientación EXIF, RGB y escala a ``size`` x ``size`` conservando la proporción (con bandas).
+    """
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    return ImageOps.pad(image, (size, size), method=Image.Resampling.BILINEAR)
+
+
+def extract_frames(source, output_dir, kind, size=224, thumbnail_size=160, max_frames=300):
+    """
+    Decodifica ``source`` y escribe en ``output_dir``:
+
+    * ``frames.npy``: array ``uint8`` ``(N, size, size, 3)`` con los frames normalizados.
+    * ``thumbnail.jpg``: miniatura del frame central.
+    * ``frames.json``: número de frames y media/desviación por canal (para normalizar al entrenar).
+
+    Devuelve el número de frames extraídos.
+    """
+    frames = []
+    try:
+        for image in iter_frames(source, kind, max_frames):
+            frames.append(np.asarray(normalize_frame(image, size)))
+            if len(frames) >= max_frames:
+                break
+    except (OSError, zipfile.BadZipFile) as exc:
+        raise UnsupportedMedia(f"No se pudo decodificar el fichero: {exc}") from None
+    if not frames:
+        raise UnsupportedMedia("El fichero no contiene frames.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    stack = np.stack(frames)
+    np.save(os.path.join(output_dir, 'frames.npy'), stack)
+
+    thumbnail = Image.fromarray(stack[len(stack) // 2])
+    thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+    thumbnail.save(os.path.join(output_dir, 'thumbnail.jpg'), quality=85)
+
+    # Momentos por canal acumulados frame a frame, sin copiar el lote completo a float
+    total = np.zeros(3)
+    squares = np.zeros(3)
+    for frame in stack:
+        pixels = frame.reshape(-1, 3).astype(np.float64) / 255
+        total += pixels.sum(axis=0)
+        squares += np.square(pixels).sum(axis=0)
+    count = stack.shape[0] * stack.shape[1] * stack.shape[2]
+    mean = total / count
+    std = np.sqrt(np.maximum(squares / count - mean ** 2, 0))
+    with open(os.path.join(output_dir, 'frames.json'), 'w') as fh:
+        json.dump({'count': len(stack), 'mean': mean.round(6).tolist(), 'std': std.round(6).tolist()}, fh)
+    return len(stack)
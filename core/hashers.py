@@ -0,0 +1,133 @@
+"""
+Hashers de contraseñas con el coste tomado de los ajustes ``PASSWORD_*``.
+
+Mantienen el identificador de algoritmo de Django (``pbkdf2_sha256``, ``argon2``, ``scrypt``),
+así que verifican los hashes existentes; ``must_update`` compara el coste guardado en cada hash
+con el configurado y Django lo rehace al verificar la contraseña (login, respuestas de
+seguridad). Cambiar el coste no necesita ninguna migración de datos.
+
+``calibrate`` mide cada algoritmo en la máquina y propone el coste que se acerca a una
+latencia objetivo por hash (comando ``calibrate_hashers``).
+"""
+import math
+import os
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.test.utils import override_settings
+
+
+def _cost(setting, default):
+    # 0 o ausente = valor por defecto de Django
+    return property(lambda self: getattr(settings, setting, 0) or default)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    cost_setting = 'PASSWORD_PBKDF2_ITERATIONS'
+    iterations = _cost(cost_setting, hashers.PBKDF2PasswordHasher.iterations)
+
+    @property
+    def cost(self):
+        return self.iterations
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    cost_setting = 'PASSWORD_ARGON2_TIME_COST'
+    time_cost = _cost(cost_setting, hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = _cost('PASSWORD_ARGON2_MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def cost(self):
+        return self.time_cost
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    cost_setting = 'PASSWORD_SCRYPT_WORK_FACTOR'
+    work_factor = _cost(cost_setting, hashers.ScryptPasswordHasher.work_factor)
+
+    @property
+    def cost(self):
+        return self.work_factor
+
+
+def init_worker(settings_module):
+    """
+    Inicializa Django en un proceso de un pool ``spawn``. Este módulo no importa modelos,
+    así que puede cargarse antes de ``django.setup()``.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def hash_secrets(secrets):
+    """
+    Hashes de ``(contraseña, respuesta_1, respuesta_2)`` con el hasher configurado; se ejecuta
+    en los procesos del pool de ``core.bulk_users``. Un valor vacío se guarda vacío (nunca
+    coincide al comprobarlo).
+    """
+    return tuple(hashers.make_password(value) if value else '' for value in secrets)
+
+
+HASHERS = {
+    'pbkdf2': PBKDF2PasswordHasher,
+    'argon2': Argon2PasswordHasher,
+    'scrypt': ScryptPasswordHasher,
+}
+
+
+class HasherUnavailable(Exception):
+    pass
+
+
+def measure(hasher_class, cost, samples=5):
+    """
+    Mediana en milisegundos de ``encode`` con el coste ``cost``.
+    """
+    with override_settings(**{hasher_class.cost_setting: cost}):
+        hasher = hasher_class()
+        timings = []
+        for _ in range(samples):
+            salt = hasher.salt()
+            start = time.perf_counter()
+            hasher.encode('calibración', salt)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _round_cost(name, cost):
+    if name == 'pbkdf2':
+        return max(1000, int(round(cost, -3)))
+    if name == 'scrypt':
+        return 2 ** max(10, round(math.log2(cost)))  # N debe ser potencia de 2
+    return max(1, round(cost))
+
+
+def calibrate(name, target_ms, samples=5):
+    """
+    Coste de ``name`` cuyo hash tarda aproximadamente ``target_ms``. El tiempo crece de forma
+    lineal con el coste en los tres algoritmos: se escala desde el valor actual y se corrige
+    con una segunda medición. Devuelve ``(coste, ms)``.
+    """
+    hasher_class = HASHERS[name]
+    if name == 'argon2':
+        try:
+            hasher_class()._load_library()
+        except ValueError as exc:  # argon2-cffi no está instalado
+            raise HasherUnavailable(str(exc)) from None
+
+    cost = hasher_class().cost
+    elapsed = measure(hasher_class, cost, samples)
+    for _ in range(2):
+        proposed = _round_cost(name, cost * target_ms / elapsed)
+        if proposed == cost:
+            break
+        try:
+            elapsed = measure(hasher_class, proposed, samples)
+        except ValueError:
+            # scrypt: el coste supera el límite de memoria de OpenSSL; se queda en el anterior
+            break
+        cost = proposed
+    return cost, elapsed
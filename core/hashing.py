@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import context, instrumentation
+
+
+class HashingPoolFull(Exception):
+    """
+    Se lanza cuando el pool de hashing no admite más trabajos en cola.
+    """
+
+
+class BoundedHashingExecutor:
+    """
+    Pool de hilos acotado para el trabajo costoso de contraseñas (PBKDF2).
+
+    ``hashlib.pbkdf2_hmac`` libera el GIL, por lo que un pool de hilos
+    aprovecha varios núcleos sin tener que serializar usuarios ni conexiones
+    entre procesos. El número de trabajos admitidos (en ejecución + en cola)
+    está limitado: cuando se supera, ``submit`` falla de inmediato con
+    ``HashingPoolFull`` en lugar de acumular peticiones.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='core-hashing')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Encola ``fn`` en el pool o lanza ``HashingPoolFull`` si no hay espacio.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+        try:
+            future = self._executor.submit(self._call, context.snapshot(), fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Versión asíncrona de ``submit``: espera el resultado sin bloquear el event loop.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _call(values, fn, *args, **kwargs):
+        # Cada hilo del pool mantiene sus propias conexiones; se respetan CONN_MAX_AGE y
+        # la salud de la conexión igual que al inicio y fin de una petición.
+        close_old_connections()
+        with context.restore(values):
+            stats = instrumentation.current_stats()
+            started = time.perf_counter()
+            measured = stats.measured() if stats else 0.0
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                # El tiempo del trabajo que no se atribuye a la base de datos ni a otra
+                # etapa se registra como etapa "hash" de la petición que lo encoló.
+                if stats is not None:
+                    elapsed = time.perf_counter() - started
+                    stats.add_stage('hash', elapsed - (stats.measured() - measured))
+                close_old_connections()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Devuelve el pool de hashing del proceso, creándolo según la configuración.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedHashingExecutor(
+                    max_workers=settings.HASHING_POOL_MAX_WORKERS,
+                    max_queue=settings.HASHING_POOL_MAX_QUEUE,
+                )
+    return _executor
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    """
+    Ejecuta ``fn`` en el pool de hashing del proceso.
+    """
+    return await get_executor().run(fn, *args, **kwargs)
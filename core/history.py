@@ -0,0 +1,275 @@
+"""
+Historial de traducciones.
+
+Los reconocimientos se acumulan en un buffer en memoria del proceso y un hilo los escribe
+por lotes (``COPY`` en PostgreSQL, ``bulk_create`` en otros motores), de modo que el camino
+de reconocimiento nunca espera a la base de datos.
+
+En PostgreSQL ``core_translationevent`` es una tabla particionada por rango mensual de
+``created_at``: las particiones se crean por adelantado con ``ensure_partitions`` y las
+antiguas se eliminan enteras con ``drop_partitions_before`` (ver
+``prune_translation_events``). Una partición ``DEFAULT`` recoge las filas de meses sin
+partición para que la escritura nunca falle por ello; ``ensure_partitions`` las traslada al
+crear la partición de su mes.
+"""
+import atexit
+import collections
+import csv
+import io
+import logging
+import re
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, close_old_connections, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('user_id', 'label', 'confidence', 'model_version', 'created_at')
+TEXT_COLUMNS = ('label', 'model_version')  # NOT NULL: en CSV un campo vacío sin comillas sería NULL
+PARTITION_SUFFIX = re.compile(r'_y(\d{4})m(\d{2})$')
+
+
+def month_start(value, offset=0):
+    """
+    Primer instante (UTC) del mes de ``value`` desplazado ``offset`` meses.
+    """
+    value = value.astimezone(dt_timezone.utc)
+    year, month = divmod(value.year * 12 + value.month - 1 + offset, 12)
+    return datetime(year, month + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _table():
+    from .models import TranslationEvent
+    return TranslationEvent._meta.db_table
+
+
+def partition_name(table, month):
+    return f'{table}_y{month:%Y}m{month:%m}'
+
+
+def create_partitioned_table(schema_editor, model):
+    """
+    Crea la tabla particionada (PostgreSQL). La clave primaria incluye ``created_at``
+    porque PostgreSQL exige que contenga la clave de partición.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    user_table = model._meta.get_field('user').related_model._meta.db_table
+    schema_editor.execute(f"""
+        CREATE TABLE {qn(table)} (
+            "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+            "user_id" bigint NOT NULL REFERENCES {qn(user_table)} ("id") DEFERRABLE INITIALLY DEFERRED,
+            "label" varchar(100) NOT NULL,
+            "confidence" double precision NOT NULL,
+            "model_version" varchar(64) NOT NULL,
+            "created_at" timestamp with time zone NOT NULL,
+            PRIMARY KEY ("id", "created_at")
+        ) PARTITION BY RANGE ("created_at")
+    """)
+    schema_editor.execute(
+        f'CREATE INDEX "tevent_user_history_idx" ON {qn(table)} ("user_id", "created_at" DESC, "id" DESC)'
+    )
+    schema_editor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+
+def ensure_partitions(months_ahead=2, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Crea (si no existen) las particiones del mes actual y de los ``months_ahead`` siguientes.
+    No hace nada fuera de PostgreSQL. Devuelve los nombres de las particiones.
+
+    Si la partición ``DEFAULT`` ya tiene filas de ese mes, PostgreSQL no permite crear la
+    partición encima: se crea como tabla suelta, se le mueven esas filas y se adjunta.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return []
+    table = _table()
+    qn = connection.ops.quote_name
+    now = now or timezone.now()
+    names = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            start, end = month_start(now, offset), month_start(now, offset + 1)
+            name = partition_name(table, start)
+            bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            names.append(name)
+            cursor.execute('SELECT to_regclass(%s)', [qn(name)])
+            if cursor.fetchone()[0] is not None:
+                continue
+            with transaction.atomic(using=using):
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {qn(table + "_default")} WHERE created_at >= %s AND created_at < %s)',
+                    [start, end],
+                )
+                if not cursor.fetchone()[0]:
+                    cursor.execute(f'CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table)} {bounds}')
+                    continue
+                cursor.execute(f'CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)')
+                cursor.execute(f"""
+                    WITH moved AS (
+                        DELETE FROM {qn(table + "_default")} WHERE created_at >= %s AND created_at < %s RETURNING *
+                    )
+                    INSERT INTO {qn(name)} SELECT * FROM moved
+                """, [start, end])
+                cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} {bounds}')
+                logger.info("Filas de %s movidas de la partición DEFAULT a %s", f'{start:%Y-%m}', name)
+    return names
+
+
+def drop_partitions_before(cutoff, using=DEFAULT_DB_ALIAS):
+    """
+    Separa y elimina las particiones mensuales que terminan antes de ``cutoff``.
+    Borrar una partición entera no genera filas muertas ni requiere ``VACUUM``.
+    """
+    connection = connections[using]
+    table = _table()
+    qn = connection.ops.quote_name
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+        """, [table])
+        for (name,) in cursor.fetchall():
+            match = PARTITION_SUFFIX.search(name)
+            if not match:
+                continue  # Partición DEFAULT
+            month = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+            if month_start(month, 1) <= cutoff:
+                cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+                cursor.execute(f'DROP TABLE {qn(name)}')
+                dropped.append(name)
+    return dropped
+
+
+def _copy(connection, events):
+    qn = connection.ops.quote_name
+    sql = f"COPY {qn(_table())} ({', '.join(COLUMNS)}) FROM STDIN"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(events)
+            buffer.seek(0)
+            raw.copy_expert(f"{sql} WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(TEXT_COLUMNS)}))", buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                for event in events:
+                    copy.write_row(event)
+
+
+def write_events(events, using=DEFAULT_DB_ALIAS):
+    """
+    Inserta una lista de tuplas ``COLUMNS`` en una sola operación.
+    """
+    from .models import TranslationEvent
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        _copy(connection, events)
+    else:
+        TranslationEvent.objects.using(using).bulk_create(
+            [TranslationEvent(**dict(zip(COLUMNS, event))) for event in events], batch_size=1000,
+        )
+
+
+class EventBuffer:
+    """
+    Buffer de eventos del proceso. ``add`` solo añade a una cola en memoria; un hilo daemon
+    la vuelca cuando alcanza ``max_size`` eventos o cada ``interval`` segundos.
+
+    La cola está acotada a ``max_pending`` eventos: si la base de datos no da abasto se
+    descartan los más antiguos (``dropped``) en lugar de crecer sin límite.
+    """
+
+    def __init__(self, max_size, interval, max_pending):
+        self.max_size = max_size
+        self.interval = interval
+        self.dropped = 0
+        self._events = collections.deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, event):
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            full = len(self._events) >= self.max_size
+        if self._thread is None:
+            self._start()
+        if full:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='translation-history', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _take(self):
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def flush(self):
+        """
+        Escribe todos los eventos pendientes. Devuelve cuántos se han escrito.
+        """
+        events = self._take()
+        if not events:
+            return 0
+        try:
+            write_events(events)
+        except IntegrityError:
+            # Algún usuario se eliminó mientras sus eventos esperaban en el buffer
+            from .models import User
+            existing = set(User.objects.filter(id__in={event[0] for event in events}).values_list('id', flat=True))
+            events = [event for event in events if event[0] in existing]
+            write_events(events)
+        return len(events)
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error al escribir el historial de traducciones")
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = EventBuffer(
+                    settings.TRANSLATION_BUFFER_SIZE,
+                    settings.TRANSLATION_FLUSH_INTERVAL,
+                    settings.TRANSLATION_BUFFER_MAX,
+                )
+    return _buffer
+
+
+def record(user_id, label, confidence, model_version=''):
+    """
+    Añade un reconocimiento al historial sin esperar a la base de datos.
+    """
+    if settings.TRANSLATION_HISTORY_ENABLED:
+        get_buffer().add((int(user_id), label, float(confidence), model_version, timezone.now()))
@@ -0,0 +1,94 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from . import context
+
+# Sentencias de control de transacción: cuentan en el tiempo de base de datos
+# pero no como consultas de la vista.
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT', 'ROLLBACK')
+
+_current = context.propagate(contextvars.ContextVar('core_request_stats', default=None))
+
+
+class RequestStats:
+    """
+    Acumula el coste de una petición: consultas, tiempo de base de datos y etapas.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.stages = {}
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def measured(self):
+        """
+        Tiempo ya atribuido a la base de datos o a alguna etapa.
+        """
+        return self.db_time + sum(self.stages.values())
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_stats():
+    """
+    Devuelve las estadísticas de la petición en curso o ``None`` fuera de una petición.
+    """
+    return _current.get()
+
+
+@contextmanager
+def activate(stats):
+    """
+    Asocia ``stats`` al contexto actual (petición, hilo del pool, etc.).
+    """
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """
+    Mide el bloque y lo suma a la etapa ``name`` de la petición en curso.
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_stage(name, time.perf_counter() - started)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            stats.queries += 1
+
+
+def install(sender, connection, **kwargs):
+    """
+    Receptor de ``connection_created``: instala el contador de consultas en la conexión.
+
+    El wrapper solo mide cuando hay unas estadísticas activas en el contexto, así que
+    cubre también las consultas hechas desde ``sync_to_async`` y el pool de hashing.
+    """
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
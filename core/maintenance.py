@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from . import history
+from .models import RevokedToken, TranslationEvent, VerificationToken
+
+
+def _delete_batch(queryset, batch_size):
+    """
+    Borra como máximo ``batch_size`` filas del queryset en una transacción corta.
+
+    Primero se leen las claves primarias por el índice correspondiente y después se
+    borran por clave, de modo que cada lote bloquea solo las filas que elimina.
+    """
+    with transaction.atomic():
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        queryset.model._base_manager.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def _delete_in_batches(queryset, batch_size, max_batches=None, pause=0):
+    """
+    Repite ``_delete_batch`` hasta vaciar el queryset; devuelve ``(filas, lotes)``.
+    """
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = _delete_batch(queryset, batch_size)
+        if not count:
+            break
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted, batches
+
+
+def purge_verification_tokens(batch_size=1000, max_batches=None, pause=0, now=None):
+    """
+    Elimina en lotes acotados los tokens de verificación expirados o ya usados.
+
+    Los expirados se recorren por ``vtoken_expires_idx`` y los usados por el índice
+    parcial ``vtoken_used_idx``, así que el coste de cada lote no depende del tamaño de
+    la tabla. Devuelve el número total de tokens eliminados.
+    """
+    now = now or timezone.now()
+    querysets = [
+        VerificationToken.objects.filter(expires__lte=now).order_by('expires', 'id'),
+        VerificationToken.objects.filter(is_used=True).order_by('id'),
+    ]
+
+    deleted = batches = 0
+    for queryset in querysets:
+        remaining = None if max_batches is None else max_batches - batches
+        count, used = _delete_in_batches(queryset, batch_size, remaining, pause)
+        deleted += count
+        batches += used
+    return deleted
+
+
+def prune_revoked_tokens(batch_size=1000, now=None):
+    """
+    Elimina en lotes (por ``expires_at``) las revocaciones de tokens ya expirados, que ya no
+    pueden usarse. Devuelve el número de filas eliminadas.
+    """
+    now = now or timezone.now()
+    queryset = RevokedToken.objects.filter(expires_at__lte=now).order_by('expires_at', 'id')
+    return _delete_in_batches(queryset, batch_size)[0]
+
+
+def prune_translation_events(keep_months=None, months_ahead=None, batch_size=1000, now=None):
+    """
+    Mantiene el historial de traducciones: crea las particiones de los próximos meses y
+    elimina los eventos anteriores a los últimos ``keep_months`` meses (mes en curso incluido).
+
+    En PostgreSQL se eliminan particiones completas; el resto de motores (y la partición
+    ``DEFAULT``) se purgan en lotes por ``created_at``. Devuelve las particiones eliminadas
+    y el número de filas borradas por lotes.
+    """
+    now = now or timezone.now()
+    keep_months = settings.TRANSLATION_HISTORY_MONTHS if keep_months is None else keep_months
+    months_ahead = settings.TRANSLATION_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    cutoff = history.month_start(now, 1 - keep_months)
+
+    dropped = []
+    if connections[DEFAULT_DB_ALIAS].vendor == 'postgresql':
+        history.ensure_partitions(months_ahead, now)
+        dropped = history.drop_partitions_before(cutoff)
+    queryset = TranslationEvent.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+    return dropped, _delete_in_batches(queryset, batch_size)[0]
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta la batería de carga de los endpoints de autenticación sobre una base de datos "
+        "de pruebas (SQLite o PostgreSQL local) y guarda los resultados en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoints', default=','.join(benchmarks.SCENARIOS),
+            help="Endpoints separados por comas (%s)." % ', '.join(benchmarks.SCENARIOS),
+        )
+        parser.add_argument('--requests', type=int, default=200, help="Peticiones por endpoint.")
+        parser.add_argument('--concurrency', type=int, default=10, help="Peticiones simultáneas.")
+        parser.add_argument(
+            '--mode', choices=('asgi', 'wsgi'), default='asgi',
+            help="asgi: AsyncClient sobre un event loop; wsgi: un Client por hilo.",
+        )
+        parser.add_argument('--output', help="Fichero JSON donde guardar los resultados.")
+        parser.add_argument('--compare', help="Resultados JSON previos con los que comparar.")
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help="Margen relativo permitido antes de considerar una regresión (0.1 = 10%%).",
+        )
+        parser.add_argument('--keepdb', action='store_true', help="Reutiliza la base de datos de pruebas.")
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(names) - set(benchmarks.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Endpoints desconocidos: {', '.join(sorted(unknown))}")
+
+        # SQLite en memoria compartida bloquea tablas enteras con escrituras concurrentes;
+        # en un fichero temporal los hilos esperan al bloqueo como en un despliegue real.
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_auth.sqlite3')
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            report = {'environment': benchmarks.environment(), 'mode': options['mode'], 'results': {}}
+            for name in names:
+                # Sin límites de intentos: todas las peticiones salen de la misma IP
+                with override_settings(AUTH_THROTTLE_RATES={}):
+                    result = benchmarks.run_scenario(name, options['requests'], options['concurrency'], options['mode'])
+                report['results'][name] = result
+                self.stdout.write(
+                    f"{name:<14} {result['throughput_rps']:>9} req/s  p50 {result['p50_ms']} ms  "
+                    f"p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+                    f"queries {result['queries_per_request']}  errores {result['errors']}"
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+            regressions = benchmarks.compare(baseline, report, options['threshold'])
+            if regressions:
+                raise CommandError("Regresiones detectadas:\n" + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la referencia."))
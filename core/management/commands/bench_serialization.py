@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmarks, fastjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la serialización de DRF (ModelSerializer + JSONRenderer) con la ruta ligera "
+        "(ValuesSerializer + FastJSONRenderer) sin tocar la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Filas del historial y repeticiones del perfil.")
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones; se toma la mejor.")
+
+    def handle(self, *args, **options):
+        if fastjson.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson no está instalado: FastJSONRenderer usa el JSON de DRF."))
+        results = benchmarks.serialization(options['rows'], options['repeat'])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} DRF {result['drf_ms']} ms  rápida {result['fast_ms']} ms  x{result['speedup']}"
+            )
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import hashers
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide los hashers de contraseñas disponibles en esta máquina y propone el coste de cada "
+        "uno para una latencia objetivo por hash, junto con la capacidad de login resultante."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250, help="Latencia objetivo por hash en milisegundos.")
+        parser.add_argument('--samples', type=int, default=5, help="Mediciones por coste (se usa la mediana).")
+        parser.add_argument(
+            '--algorithms', default=','.join(hashers.HASHERS),
+            help="Algoritmos separados por comas (%s)." % ', '.join(hashers.HASHERS),
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['algorithms'].split(',') if name.strip()]
+        unknown = set(names) - set(hashers.HASHERS)
+        if unknown:
+            raise CommandError(f"Algoritmos desconocidos: {', '.join(sorted(unknown))}")
+        if options['target_ms'] <= 0 or options['samples'] < 1:
+            raise CommandError("--target-ms y --samples deben ser positivos.")
+
+        workers = settings.HASHING_POOL_MAX_WORKERS
+        proposals = {}
+        for name in names:
+            try:
+                cost, elapsed = hashers.calibrate(name, options['target_ms'], options['samples'])
+            except hashers.HasherUnavailable as exc:
+                self.stdout.write(f"{name:<8} no disponible: {exc}")
+                continue
+            setting = hashers.HASHERS[name].cost_setting
+            proposals[name] = (setting, cost)
+            # Cada hilo del pool hace 1000/ms hashes por segundo (PBKDF2, scrypt y Argon2 liberan el GIL)
+            self.stdout.write(
+                f"{name:<8} {setting}={cost:<10} {elapsed:8.1f} ms/hash  "
+                f"~{workers * 1000 / elapsed:.0f} logins/s con HASHING_POOL_MAX_WORKERS={workers}"
+            )
+
+        if settings.PASSWORD_HASHER in proposals:
+            setting, cost = proposals[settings.PASSWORD_HASHER]
+            self.stdout.write(self.style.SUCCESS(
+                f"\nPropuesta para el algoritmo actual:\nPASSWORD_HASHER={settings.PASSWORD_HASHER}\n{setting}={cost}"
+            ))
+        self.stdout.write(
+            "Los hashes existentes se rehacen con el nuevo coste al iniciar sesión (must_update)."
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core import bulk_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta los usuarios a CSV o NDJSON recorriendo la tabla con un cursor del servidor "
+        "(memoria constante). No incluye contraseñas ni respuestas de seguridad."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=('csv', 'ndjson'), default='csv')
+        parser.add_argument('--output', help="Fichero de salida (por defecto, la salida estándar).")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Filas leídas por bloque del cursor.")
+
+    def handle(self, *args, **options):
+        lines = bulk_users.export_lines(options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(lines)
@@ -0,0 +1,66 @@
+import csv
+import os
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bulk_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea usuarios en bloque desde un CSV con cabecera o un NDJSON. Columnas: %s "
+        "(solo email y password son obligatorias)." % ', '.join(bulk_users.IMPORT_FIELDS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichero a importar ('-' para la entrada estándar).")
+        parser.add_argument('--format', choices=('csv', 'ndjson'), help="Por defecto, según la extensión.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Usuarios por INSERT.")
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Procesos para calcular los hashes (por defecto, uno por núcleo; 0 = sin pool).",
+        )
+        parser.add_argument('--verified', action='store_true', help="Marca los emails como verificados.")
+        parser.add_argument('--errors', help="CSV donde guardar las filas rechazadas (por defecto, stderr).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size debe ser positivo.")
+
+        errors_file = open(options['errors'], 'w', newline='') if options['errors'] else None
+        errors_writer = csv.writer(errors_file) if errors_file else None
+        if errors_writer:
+            errors_writer.writerow(('line', 'email', 'error'))
+
+        def on_error(line, email, message):
+            if errors_writer:
+                errors_writer.writerow((line, email, message))
+            else:
+                self.stderr.write(f"Línea {line} ({email or '-'}): {message}")
+
+        try:
+            if path == '-':
+                stream = nullcontext(sys.stdin)  # La entrada estándar no es nuestra: no se cierra
+            elif not os.path.isfile(path):
+                raise CommandError(f"No existe el fichero {path}")
+            else:
+                stream = open(path, newline='', encoding='utf-8-sig')
+            with stream as source:
+                created, rejected = bulk_users.import_users(
+                    source, fmt,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    verified=options['verified'],
+                    on_error=on_error,
+                )
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Usuarios creados: {created}"))
+        if rejected:
+            self.stdout.write(self.style.WARNING(f"Filas rechazadas: {rejected}"))
@@ -0,0 +1,20 @@
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+
+from core import uploads
+from core.models import Upload
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa las subidas completas que quedaron pendientes (p. ej. tras reiniciar el "
+        "servidor) usando el pool de procesos de extracción de frames."
+    )
+
+    def handle(self, *args, **options):
+        pending = list(Upload.objects.filter(status='processing').values_list('id', 'kind'))
+        futures = [uploads.submit(upload_id, kind) for upload_id, kind in pending]
+        wait(futures)
+        ready = Upload.objects.filter(id__in=[upload_id for upload_id, _ in pending], status='ready').count()
+        self.stdout.write(self.style.SUCCESS(f"Subidas procesadas: {ready} de {len(pending)}"))
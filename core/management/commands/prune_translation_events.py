@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.maintenance import prune_translation_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea las particiones mensuales próximas del historial de traducciones y elimina "
+        "los eventos más antiguos que el periodo de retención."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int, default=None, help="Meses de historial a conservar.")
+        parser.add_argument('--months-ahead', type=int, default=None, help="Particiones futuras a crear.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas eliminadas por lote.")
+
+    def handle(self, *args, **options):
+        dropped, deleted = prune_translation_events(
+            keep_months=options['keep_months'],
+            months_ahead=options['months_ahead'],
+            batch_size=options['batch_size'],
+        )
+        for name in dropped:
+            self.stdout.write(f"Partición eliminada: {name}")
+        self.stdout.write(self.style.SUCCESS(f"Eventos eliminados por lotes: {deleted}"))
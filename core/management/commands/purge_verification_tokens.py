@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.maintenance import purge_verification_tokens
+
+
+class Command(BaseCommand):
+    help = "Elimina en lotes los tokens de verificación expirados o ya utilizados."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Filas eliminadas por lote.")
+        parser.add_argument('--max-batches', type=int, default=None, help="Número máximo de lotes a ejecutar.")
+        parser.add_argument('--pause', type=float, default=0, help="Segundos de espera entre lotes.")
+
+    def handle(self, *args, **options):
+        deleted = purge_verification_tokens(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Tokens eliminados: {deleted}"))
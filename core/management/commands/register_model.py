@@ -0,0 +1,56 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from core.model_registry import ModelNotFound, get_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Registra una versión del modelo de reconocimiento a partir de un .npz con los arrays "
+        "'weights', 'bias' y 'labels', o activa una versión existente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_version', nargs='?', help="Nombre de la versión a registrar o activar.")
+        parser.add_argument('source', nargs='?', help="Fichero .npz con los pesos del modelo.")
+        parser.add_argument('--activate', action='store_true', help="Activa una versión ya registrada.")
+        parser.add_argument('--no-activate', action='store_true', help="Registra la versión sin activarla.")
+        parser.add_argument('--list', action='store_true', help="Lista las versiones registradas.")
+
+    def handle(self, *args, **options):
+        registry = get_registry()
+        if registry is None:
+            raise CommandError("RECOGNITION_MODEL_DIR no está configurado.")
+
+        if options['list']:
+            active = registry.active_version()
+            for version in registry.versions():
+                self.stdout.write(f"{'*' if version == active else ' '} {version}")
+            return
+
+        version = options['model_version']
+        if not version:
+            raise CommandError("Indica la versión.")
+
+        if options['activate']:
+            try:
+                registry.activate(version)
+            except ModelNotFound:
+                raise CommandError(f"La versión {version!r} no existe.")
+            self.stdout.write(self.style.SUCCESS(f"Versión activa: {version}"))
+            return
+
+        if not options['source']:
+            raise CommandError("Indica el fichero .npz con los pesos.")
+        with np.load(options['source']) as data:
+            missing = {'weights', 'bias', 'labels'} - set(data.files)
+            if missing:
+                raise CommandError(f"Faltan arrays en el fichero: {', '.join(sorted(missing))}")
+            arrays = {'weights': data['weights'].astype(np.float32), 'bias': data['bias'].astype(np.float32)}
+            labels = [str(label) for label in data['labels']]
+
+        try:
+            registry.register(version, arrays, {'labels': labels}, activate=not options['no_activate'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Versión registrada: {version}"))
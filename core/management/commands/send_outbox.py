@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía los correos pendientes de la cola EmailOutbox por lotes, reutilizando una "
+        "conexión con el servidor de correo. Con --loop se ejecuta de forma continua."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Correos reclamados por lote.")
+        parser.add_argument('--max-batches', type=int, default=None, help="Número máximo de lotes por pasada.")
+        parser.add_argument('--loop', action='store_true', help="Repite el envío indefinidamente.")
+        parser.add_argument('--interval', type=float, default=5, help="Segundos entre pasadas con --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_pending(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            if sent or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Correos enviados: {sent}"))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
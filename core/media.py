@@ -0,0 +1,151 @@
+"""
+Servicio de ficheros de ``MEDIA_ROOT`` con soporte de peticiones ``Range``.
+
+Los bytes nunca pasan por Python si se puede evitar:
+
+* Con ``MEDIA_X_ACCEL_PREFIX`` o ``MEDIA_X_SENDFILE`` la vista solo comprueba el acceso y
+  delega el envío (y los ``Range``) en el proxy frontal.
+* Bajo WSGI se devuelve un ``FileResponse`` posicionado al inicio del rango: gunicorn
+  (``wsgi.file_wrapper``) envía exactamente ``Content-Length`` bytes desde esa posición con
+  ``os.sendfile``.
+* Bajo ASGI no hay ``sendfile``; el rango se envía con un iterador asíncrono que lee
+  bloques en un hilo, sin cargar el fichero en memoria ni ocupar el event loop.
+"""
+import asyncio
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+ASYNC_BLOCK_SIZE = 256 * 1024
+
+
+class RangeFile:
+    """
+    Vista de solo lectura de ``length`` bytes de un fichero abierto desde su posición actual.
+    Expone ``fileno`` para que ``wsgi.file_wrapper`` pueda usar ``sendfile``.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+async def aiter_file(file, length):
+    """
+    Lee ``length`` bytes desde la posición actual del fichero en bloques, fuera del event loop.
+    """
+    try:
+        while length > 0:
+            chunk = await asyncio.to_thread(file.read, min(ASYNC_BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def parse_range(header, size):
+    """
+    Interpreta un único rango ``bytes=inicio-fin``. Devuelve ``(inicio, fin)`` inclusivo,
+    ``None`` si la cabecera no aplica (se sirve el fichero completo) o ``False`` si el rango
+    no se puede satisfacer. Los rangos múltiples se ignoran, como permite la RFC 9110.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Sufijo: los últimos N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def resolve(path):
+    """
+    Ruta absoluta de un fichero de ``MEDIA_ROOT``; ``Http404`` si sale del directorio.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path
+
+
+def serve(request, path):
+    """
+    Respuesta para el fichero ``path`` de ``MEDIA_ROOT`` (ya autorizado).
+    """
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    if settings.MEDIA_X_ACCEL_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_X_ACCEL_PREFIX.rstrip('/') + '/' + quote(path)
+        return response
+    full_path = resolve(path)
+    if settings.MEDIA_X_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    stat = os.stat(full_path)
+    size = stat.st_size
+    last_modified = http_date(stat.st_mtime)
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range is not None and if_range and parse_http_date_safe(if_range) != int(stat.st_mtime):
+        byte_range = None  # El fichero ha cambiado: se envía completo
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    status = 200 if byte_range is None else 206
+    file = open(full_path, 'rb')
+    file.seek(start)
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(aiter_file(file, length), content_type=content_type, status=status)
+    else:
+        response = FileResponse(RangeFile(file, length), content_type=content_type, status=status)
+    response['Content-Length'] = str(length)
+    if byte_range is not None:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = last_modified
+    return response
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# Límites superiores de los buckets de cada histograma
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 4, 5, 10, 20, 50, 100)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+HISTOGRAMS = {
+    'core_request_duration_seconds': ("Latencia total de la petición.", DURATION_BUCKETS),
+    'core_db_duration_seconds': ("Tiempo de base de datos por petición.", DURATION_BUCKETS),
+    'core_db_queries': ("Consultas a la base de datos por petición.", QUERY_BUCKETS),
+    'core_stage_duration_seconds': ("Tiempo por etapa (hash, jwt, ...) y petición.", DURATION_BUCKETS),
+    'core_recognition_batch_size': ("Ventanas clasificadas por lote.", BATCH_BUCKETS),
+    'core_recognition_inference_seconds': ("Tiempo de inferencia por lote.", DURATION_BUCKETS),
+}
+
+COUNTERS = {
+    'core_recognition_cache_lookups_total': "Ventanas buscadas en la caché de reconocimiento por resultado (local, shared, miss).",
+}
+
+FILE_PREFIX = 'core-metrics-'
+
+
+class MetricsRegistry:
+    """
+    Histogramas acumulativos en memoria del proceso.
+
+    Cada serie es una lista ``[bucket_0, ..., bucket_n, +Inf, suma]`` indexada por
+    ``(métrica, etiquetas)``; la de un contador es ``[total]``. Si ``METRICS_DIR`` está configurado, el proceso vuelca su
+    instantánea a un fichero propio como máximo cada ``METRICS_FLUSH_INTERVAL``
+    segundos para que ``/api/metrics`` pueda agregar todos los workers.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def observe(self, name, value, **labels):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(buckets) + 1) + [0.0]
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+        self._maybe_flush()
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0]
+            series[0] += value
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def _maybe_flush(self):
+        directory = getattr(settings, 'METRICS_DIR', '')
+        now = time.monotonic()
+        if not directory or now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        self.flush(directory)
+
+    def flush(self, directory):
+        """
+        Escribe la instantánea del proceso de forma atómica (fichero temporal + rename).
+        """
+        data = [[name, list(labels), series] for (name, labels), series in self.snapshot().items()]
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp_path, os.path.join(directory, f'{FILE_PREFIX}{os.getpid()}.json'))
+
+
+registry = MetricsRegistry()
+
+
+def observe_request(view, stats):
+    """
+    Registra las estadísticas de una petición finalizada.
+    """
+    registry.observe('core_request_duration_seconds', stats.elapsed(), view=view)
+    registry.observe('core_db_duration_seconds', stats.db_time, view=view)
+    registry.observe('core_db_queries', stats.queries, view=view)
+    for stage, seconds in stats.stages.items():
+        registry.observe('core_stage_duration_seconds', seconds, view=view, stage=stage)
+
+
+def _merge(total, snapshot):
+    for key, series in snapshot.items():
+        if key in total:
+            total[key] = [a + b for a, b in zip(total[key], series)]
+        else:
+            total[key] = list(series)
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Existe, pero es de otro usuario
+    return True
+
+
+def collect():
+    """
+    Agrega la instantánea de este proceso con las de los demás workers. Los ficheros de
+    workers que ya no existen se eliminan: cada reinicio dejaría uno más en el directorio.
+    """
+    total = registry.snapshot()
+    directory = getattr(settings, 'METRICS_DIR', '')
+    if not directory or not os.path.isdir(directory):
+        return total
+
+    own_file = f'{FILE_PREFIX}{os.getpid()}.json'
+    for filename in os.listdir(directory):
+        if not filename.startswith(FILE_PREFIX) or filename == own_file:
+            continue
+        path = os.path.join(directory, filename)
+        pid = filename[len(FILE_PREFIX):-len('.json')]
+        if pid.isdigit() and not _is_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Otro worker lo ha eliminado a la vez
+            continue
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue  # Fichero a medio escribir o eliminado
+        _merge(total, {(name, tuple(tuple(label) for label in labels)): series for name, labels, series in data})
+    return total
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+
+def render_prometheus(snapshot):
+    """
+    Formato de exposición de texto de Prometheus para los histogramas y contadores agregados.
+    """
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (series_name, labels), series in sorted(snapshot.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], series[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, ("le", bound))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {series[-1]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    for name, help_text in COUNTERS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (series_name, labels), series in sorted(snapshot.items()):
+            if series_name == name:
+                lines.append(f'{name}{_format_labels(labels)} {series[0]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,152 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import instrumentation, metrics, routers
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Se lanza cuando una vista ejecuta más consultas que su ``query_budget``.
+    """
+
+
+def get_query_budget(view_func):
+    """
+    Devuelve el presupuesto de consultas declarado por una vista (``query_budget``) o ``None``.
+    Acepta tanto la función devuelta por ``as_view()`` como una vista basada en función.
+    """
+    view = getattr(view_func, 'view_class', view_func)
+    return getattr(view, 'query_budget', None)
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada petición (consultas, tiempo de base de datos, etapas y latencia total),
+    lo registra en los histogramas de ``core.metrics`` y añade la cabecera ``Server-Timing``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = instrumentation.RequestStats()
+        with instrumentation.activate(stats):
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = instrumentation.RequestStats()
+        with instrumentation.activate(stats):
+            response = await self.get_response(request)
+        return self.finish(request, response, stats)
+
+    @staticmethod
+    def finish(request, response, stats):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        metrics.observe_request(view, stats)
+
+        timings = [f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"']
+        timings += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in stats.stages.items()]
+        timings.append(f'total;dur={stats.elapsed() * 1000:.2f}')
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Comprueba que cada vista no supere el ``query_budget`` que declara.
+
+    Usa las estadísticas de ``InstrumentationMiddleware``, por lo que debe ir después de
+    ella en ``MIDDLEWARE``. Solo se activa con ``QUERY_BUDGET_ENFORCE`` (por defecto en DEBUG
+    y en los tests): al excederse el presupuesto lanza ``QueryBudgetExceeded``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENFORCE:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.check(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.check(request)
+        return response
+
+    @staticmethod
+    def check(request):
+        stats = instrumentation.current_stats()
+        match = getattr(request, 'resolver_match', None)
+        if stats is None or match is None:
+            return
+        budget = get_query_budget(match.func)
+        if budget is not None and stats.queries > budget:
+            raise QueryBudgetExceeded(
+                f"La vista '{match.view_name}' ejecutó {stats.queries} consultas "
+                f"(presupuesto: {budget})."
+            )
+
+
+class ReplicaPinningMiddleware:
+    """
+    Lectura de las propias escrituras con réplicas: si la petición escribe en el primario,
+    fija la sesión al primario durante ``REPLICA_PIN_SECONDS`` mediante una cookie.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = routers.PinState(pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        token = routers.activate(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.deactivate(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = routers.PinState(pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        token = routers.activate(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.deactivate(token)
+        return self.finish(response, state)
+
+    @staticmethod
+    def finish(response, state):
+        if state.written:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='None', secure=True,
+            )
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_user_email_verified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='verificationtoken',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['identifier'], name='vtoken_identifier_unused_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationtoken',
+            index=models.Index(fields=['expires', 'id'], name='vtoken_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationtoken',
+            index=models.Index(condition=models.Q(('is_used', True)), fields=['id'], name='vtoken_used_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from core.history import create_partitioned_table, ensure_partitions
+
+
+def create_table(apps, schema_editor):
+    model = apps.get_model('core', 'TranslationEvent')
+    if schema_editor.connection.vendor == 'postgresql':
+        create_partitioned_table(schema_editor, model)
+        ensure_partitions(using=schema_editor.connection.alias)
+    else:
+        schema_editor.create_model(model)
+
+
+def drop_table(apps, schema_editor):
+    model = apps.get_model('core', 'TranslationEvent')
+    if schema_editor.connection.vendor == 'postgresql':
+        # Elimina también todas las particiones
+        schema_editor.execute(f'DROP TABLE {schema_editor.quote_name(model._meta.db_table)} CASCADE')
+    else:
+        schema_editor.delete_model(model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_user_email_case_insensitive'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TranslationEvent',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('label', models.CharField(max_length=100)),
+                        ('confidence', models.FloatField()),
+                        ('model_version', models.CharField(blank=True, max_length=64)),
+                        ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translation_events', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='tevent_user_history_idx')],
+                    },
+                ),
+            ],
+        ),
+        # La tabla se crea después de registrar el modelo en el estado para poder usarlo
+        migrations.RunPython(create_table, drop_table),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_learning_catalogue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resource',
+            name='file',
+            field=models.FileField(blank=True, db_index=True, upload_to='lessons/'),
+        ),
+        migrations.AddField(
+            model_name='sign',
+            name='clip',
+            field=models.FileField(blank=True, db_index=True, upload_to='signs/'),
+        ),
+        migrations.AlterField(
+            model_name='resource',
+            name='url',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
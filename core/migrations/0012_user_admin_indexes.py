@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+# Búsqueda del admin por subcadena (core.admin.UserAdmin.get_search_results). Solo en
+# PostgreSQL: en SQLite la búsqueda es por prefijo sobre unique_email_ci y username.
+TRIGRAM_INDEXES = {
+    'user_email_trgm_idx': 'email',
+    'user_username_trgm_idx': 'username',
+    'user_name_trgm_idx': 'name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('core', 'User')._meta.db_table)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        # CONCURRENTLY: no bloquea las escrituras en tablas grandes (migración no atómica)
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+            f'ON {table} USING gin (LOWER({schema_editor.quote_name(column)}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0011_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'id'], name='user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_deaf', True)), fields=['id'], name='user_deaf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_mute', True)), fields=['id'], name='user_mute_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('email_verified', False)), fields=['id'], name='user_unverified_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes, atomic=False),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sign',
+            name='aliases',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_sign_aliases'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sign',
+            name='embedding',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+    ]
@@ -0,0 +1,149 @@
+"""
+Registro de versiones de los modelos de reconocimiento.
+
+Cada versión es un directorio inmutable ``<RECOGNITION_MODEL_DIR>/<versión>/`` con un
+``manifest.json`` (etiquetas y metadatos) y un fichero ``.npy`` por array de pesos. El
+fichero ``CURRENT`` contiene el nombre de la versión activa.
+
+Los arrays se abren con ``np.load(mmap_mode='r')``: no se copian a la memoria del proceso,
+sino que se proyectan desde la caché de páginas del sistema operativo, que comparten todos
+los workers. La carga solo lee las cabeceras de los ficheros y tarda milisegundos.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+
+class ModelNotFound(Exception):
+    pass
+
+
+class LoadedModel:
+    """
+    Versión cargada: ``arrays`` (memmaps de solo lectura por nombre) y ``manifest``.
+    """
+
+    def __init__(self, version, arrays, manifest):
+        self.version = version
+        self.arrays = arrays
+        self.manifest = manifest
+
+
+class ModelRegistry:
+    """
+    Versiones de modelo en ``root``. ``current()`` devuelve la versión activa y, como mucho
+    cada ``check_interval`` segundos, comprueba si ``CURRENT`` ha cambiado para cargar la
+    nueva. El cambio es una asignación atómica: los lotes en curso terminan con el modelo
+    anterior, que se libera cuando deja de estar referenciado.
+    """
+
+    def __init__(self, root, check_interval=5.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._model = None
+        self._current_stat = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(self._path(name, MANIFEST_FILE))
+        )
+
+    def active_version(self):
+        try:
+            with open(self._path(CURRENT_FILE)) as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, version):
+        directory = self._path(version)
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE)) as fh:
+                manifest = json.load(fh)
+        except FileNotFoundError:
+            raise ModelNotFound(version) from None
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+            for name in manifest['arrays']
+        }
+        return LoadedModel(version, arrays, manifest)
+
+    def current(self):
+        """
+        Devuelve la versión activa (``None`` si no hay ninguna registrada).
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._model
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self._path(CURRENT_FILE))
+                stat = (stat.st_ino, stat.st_mtime_ns)
+            except FileNotFoundError:
+                stat = None
+            if stat != self._current_stat:
+                version = self.active_version()
+                self._model = self.load(version) if version else None
+                self._current_stat = stat
+        return self._model
+
+    def register(self, version, arrays, manifest=None, activate=True):
+        """
+        Escribe una versión nueva. Se prepara en un directorio temporal y se publica con un
+        ``rename`` atómico, de modo que ningún worker ve una versión a medio escribir.
+        """
+        if os.path.exists(self._path(version)):
+            raise ValueError(f"La versión {version!r} ya existe.")
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix='.tmp-')
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+        manifest = dict(manifest or {}, arrays=sorted(arrays), created=time.time())
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as fh:
+            json.dump(manifest, fh)
+        os.rename(staging, self._path(version))
+        if activate:
+            self.activate(version)
+
+    def activate(self, version):
+        """
+        Cambia la versión activa reescribiendo ``CURRENT`` de forma atómica.
+        """
+        if not os.path.isfile(self._path(version, MANIFEST_FILE)):
+            raise ModelNotFound(version)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as tmp:
+            tmp.write(version)
+        os.replace(tmp_path, self._path(CURRENT_FILE))
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    Registro de ``RECOGNITION_MODEL_DIR`` (``None`` si no está configurado).
+    """
+    global _registry
+    if not settings.RECOGNITION_MODEL_DIR:
+        return None
+    if _registry is None or _registry.root != settings.RECOGNITION_MODEL_DIR:
+        _registry = ModelRegistry(settings.RECOGNITION_MODEL_DIR, settings.RECOGNITION_MODEL_CHECK_INTERVAL)
+    return _registry
@@ -1,14 +1,35 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.hashers import check_password, make_password
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 import hashlib
+import re
+import uuid
+
+import numpy as np
+
+# Formato anterior de las respuestas de seguridad: SHA-256 sin sal en hexadecimal
+LEGACY_ANSWER_RE = re.compile(r'[0-9a-f]{64}')
+
+
+class UserManager(BaseUserManager):
+    def filter_email(self, email):
+        """
+        Filtra por email sin distinguir mayúsculas usando el índice único ``Lower(email)``.
+        """
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+
 
 class User(AbstractUser):
     """
     Modelo de usuario personalizado que extiende AbstractUser.
     Incluye campos adicionales como email, nombre, y respuestas de seguridad.
     """
-    email = models.EmailField(unique=True)  # Asegúrate de que el email sea único
+    email = models.EmailField()  # Único sin distinguir mayúsculas (ver Meta.constraints)
     name = models.CharField(max_length=255, blank=True)  # Nombre del usuario
     is_deaf = models.BooleanField(default=False)  # Indica si el usuario es sordo
     is_mute = models.BooleanField(default=False)  # Indica si el usuario es mudo
@@ -43,9 +64,20 @@ class User(AbstractUser):
         verbose_name="permisos de usuario",
     )
 
+    objects = UserManager()
+
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=['email'], name='unique_email')  # Asegura que no haya emails duplicados
+            # Un único índice funcional: "Foo@x" y "foo@x" son el mismo email
+            models.UniqueConstraint(Lower('email'), name='unique_email_ci'),
+        ]
+        indexes = [
+            # Filtros del admin en el orden de su listado (-id): el filtro y el LIMIT salen
+            # del índice. Los booleanos solo indexan el valor minoritario.
+            models.Index(fields=['role', 'id'], name='user_role_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_deaf=True), name='user_deaf_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_mute=True), name='user_mute_idx'),
+            models.Index(fields=['id'], condition=models.Q(email_verified=False), name='user_unverified_idx'),
         ]
 
     def save(self, *args, **kwargs):
@@ -58,15 +90,35 @@ class User(AbstractUser):
 
     def set_security_answer_1(self, answer):
         """
-        Cifrar la respuesta a la primera pregunta de seguridad.
+        Cifrar la respuesta a la primera pregunta de seguridad (con sal, hasher de PASSWORD_HASHERS).
         """
-        self.security_answer_1 = hashlib.sha256(answer.encode()).hexdigest()
+        self.security_answer_1 = make_password(answer)
 
     def set_security_answer_2(self, answer):
         """
-        Cifrar la respuesta a la segunda pregunta de seguridad.
+        Cifrar la respuesta a la segunda pregunta de seguridad (con sal, hasher de PASSWORD_HASHERS).
+        """
+        self.security_answer_2 = make_password(answer)
+
+    def check_security_answer(self, number, answer):
+        """
+        Comprobar la respuesta a la pregunta de seguridad ``number`` (1 o 2).
+        Si es correcta y su hash es del formato anterior o de otro algoritmo o coste,
+        se rehace con el hasher actual y se guarda.
         """
-        self.security_answer_2 = hashlib.sha256(answer.encode()).hexdigest()
+        field = f'security_answer_{number}'
+        encoded = getattr(self, field)
+
+        def setter(raw_answer):
+            getattr(self, f'set_security_answer_{number}')(raw_answer)
+            self.save(update_fields=[field])
+
+        if LEGACY_ANSWER_RE.fullmatch(encoded):
+            valid = constant_time_compare(encoded, hashlib.sha256(answer.encode()).hexdigest())
+            if valid:
+                setter(answer)
+            return valid
+        return check_password(answer, encoded, setter)
 
 
 class VerificationToken(models.Model):
@@ -81,6 +133,16 @@ class VerificationToken(models.Model):
     is_used = models.BooleanField(default=False)  # Indica si el token ya ha sido utilizado
     used_at = models.DateTimeField(null=True, blank=True)  # Registra cuándo se utilizó el token
 
+    class Meta:
+        indexes = [
+            # Tokens pendientes de un email (solo las filas sin usar ocupan el índice)
+            models.Index(fields=['identifier'], condition=models.Q(is_used=False), name='vtoken_identifier_unused_idx'),
+            # Purga de tokens expirados en orden de expiración
+            models.Index(fields=['expires', 'id'], name='vtoken_expires_idx'),
+            # Purga de tokens usados sin recorrer las filas pendientes
+            models.Index(fields=['id'], condition=models.Q(is_used=True), name='vtoken_used_idx'),
+        ]
+
     def is_expired(self):
         """
         Verifica si el token ha expirado.
@@ -92,3 +154,190 @@ class VerificationToken(models.Model):
         Representación en cadena del modelo VerificationToken.
         """
         return f"VerificationToken(identifier={self.identifier}, token={self.token}, expires={self.expires})"
+
+
+class RevokedToken(models.Model):
+    """
+    JTI de un token JWT revocado (logout o refresh token ya rotado). Se borra cuando el
+    token expira; ver ``core/revocation.py``.
+    """
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)  # Purga de los expirados
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)  # Sincronización incremental
+
+    def __str__(self):
+        return self.jti
+
+
+class EmailOutbox(models.Model):
+    """
+    Correo pendiente de envío (patrón outbox). Se inserta en la misma transacción que los
+    datos que lo originan y lo envía después ``send_outbox`` (ver ``core.outbox``).
+    """
+    to = models.EmailField()  # Destinatario
+    subject = models.CharField(max_length=255)  # Asunto
+    body = models.TextField()  # Cuerpo en texto plano
+    attempts = models.PositiveSmallIntegerField(default=0)  # Intentos de envío realizados
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # No se reintenta antes de esta fecha
+    last_error = models.TextField(blank=True)  # Error del último intento fallido
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)  # Fecha de envío (nulo = pendiente)
+
+    class Meta:
+        indexes = [
+            # Cola de pendientes: solo las filas sin enviar ocupan el índice
+            models.Index(fields=['next_attempt_at', 'id'], condition=models.Q(sent_at__isnull=True), name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"EmailOutbox(to={self.to}, subject={self.subject}, sent_at={self.sent_at})"
+
+
+class TranslationEvent(models.Model):
+    """
+    Seña reconocida durante una sesión de traducción de un usuario.
+    En PostgreSQL la tabla está particionada por meses sobre ``created_at`` (ver ``core.history``).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='translation_events')
+    label = models.CharField(max_length=100)  # Etiqueta de la seña reconocida
+    confidence = models.FloatField()  # Confianza del clasificador
+    model_version = models.CharField(max_length=64, blank=True)  # Versión del modelo que la reconoció
+    created_at = models.DateTimeField(default=timezone.now)  # Momento del reconocimiento
+
+    class Meta:
+        indexes = [
+            # Historial de un usuario paginado por (created_at, id) descendente
+            models.Index(fields=['user', '-created_at', '-id'], name='tevent_user_history_idx'),
+        ]
+
+    def __str__(self):
+        return f"TranslationEvent(user={self.user_id}, label={self.label}, created_at={self.created_at})"
+
+
+class Sign(models.Model):
+    """
+    Seña del diccionario con su vector de embedding, usado para buscar señas similares.
+    El embedding se guarda como bytes ``float32`` (ver ``core.sign_index``).
+    """
+    name = models.CharField(max_length=100, unique=True)  # Palabra o glosa de la seña
+    aliases = models.TextField(blank=True)  # Otras formas separadas por comas (flexiones, sinónimos; ver core.compositor)
+    description = models.TextField(blank=True)  # Descripción de la ejecución de la seña
+    embedding = models.BinaryField(blank=True, default=b'')  # Vector float32 de SIGN_EMBEDDING_DIM dimensiones; vacío en señas que solo tienen clip (p. ej. letras)
+    clip = models.FileField(upload_to='signs/', blank=True, db_index=True)  # Video de la seña (ver MediaView)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Sincronización incremental del índice
+
+    def set_embedding(self, vector):
+        """
+        Guarda el vector como bytes ``float32``; debe tener ``SIGN_EMBEDDING_DIM`` valores.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (settings.SIGN_EMBEDDING_DIM,):
+            raise ValueError(f"El embedding debe ser un vector de {settings.SIGN_EMBEDDING_DIM} valores.")
+        self.embedding = vector.tobytes()
+
+    def clean(self):
+        # Vacío = seña sin embedding; el índice de búsqueda solo carga los del tamaño configurado
+        if self.embedding and len(self.embedding) != settings.SIGN_EMBEDDING_DIM * 4:
+            raise ValidationError({'embedding': f"El embedding debe tener {settings.SIGN_EMBEDDING_DIM} valores float32."})
+
+    def get_embedding(self):
+        return np.frombuffer(self.embedding, dtype=np.float32)
+
+    def __str__(self):
+        return self.name
+
+
+class Lesson(models.Model):
+    """
+    Lección de la sección de aprendizaje de lengua de señas.
+    """
+    LEVEL_CHOICES = [
+        ('basic', 'Básico'),
+        ('intermediate', 'Intermedio'),
+        ('advanced', 'Avanzado'),
+    ]
+    title = models.CharField(max_length=200)  # Título de la lección
+    slug = models.SlugField(max_length=200, unique=True)  # Identificador en las URLs
+    summary = models.TextField(blank=True)  # Resumen de la lección
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='basic')  # Nivel de dificultad
+    position = models.PositiveIntegerField(default=0)  # Orden dentro del catálogo
+    is_published = models.BooleanField(default=True)  # Visible en la API
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
+
+    class Meta:
+        indexes = [
+            # Paginación por cursor de las lecciones publicadas
+            models.Index(fields=['position', 'id'], condition=models.Q(is_published=True), name='lesson_published_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class Resource(models.Model):
+    """
+    Recurso (video, enlace o documento) asociado a una lección.
+    """
+    KIND_CHOICES = [
+        ('video', 'Video'),
+        ('link', 'Enlace'),
+        ('document', 'Documento'),
+    ]
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='resources')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)  # Tipo de recurso
+    title = models.CharField(max_length=200)  # Título del recurso
+    url = models.URLField(max_length=500, blank=True)  # Dirección del recurso externo
+    file = models.FileField(upload_to='lessons/', blank=True, db_index=True)  # Fichero propio (ver MediaView)
+    position = models.PositiveIntegerField(default=0)  # Orden dentro de la lección
+    updated_at = models.DateTimeField(auto_now=True)  # Última modificación
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lesson', 'position', 'id'], name='resource_lesson_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class CatalogueVersion(models.Model):
+    """
+    Contador de versión de un catálogo de contenido. Se incrementa con cada modificación y
+    forma parte de los ETags y de las claves de caché de sus páginas (ver ``core.catalogue``).
+    """
+    name = models.CharField(max_length=50, primary_key=True)  # Nombre del catálogo
+    version = models.PositiveBigIntegerField(default=0)  # Versión actual
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class Upload(models.Model):
+    """
+    Subida por partes (reanudable) de un clip de entrenamiento: video, imagen animada o ZIP
+    de imágenes. ``received`` es el número de bytes ya escritos en disco (ver ``core.uploads``).
+    """
+    KIND_CHOICES = [
+        ('video', 'Video'),
+        ('images', 'Secuencia de imágenes'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Subiendo'),
+        ('processing', 'Procesando'),
+        ('ready', 'Listo'),
+        ('failed', 'Fallido'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)  # Nombre original del fichero
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)  # Tipo de contenido
+    size = models.PositiveBigIntegerField()  # Tamaño total anunciado por el cliente
+    received = models.PositiveBigIntegerField(default=0)  # Bytes recibidos
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='uploading')
+    frame_count = models.PositiveIntegerField(default=0)  # Frames extraídos
+    error = models.TextField(blank=True)  # Motivo del fallo del procesamiento
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload(id={self.id}, filename={self.filename}, status={self.status})"
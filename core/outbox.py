@@ -0,0 +1,115 @@
+"""
+Envío de los correos de ``EmailOutbox``.
+
+Las peticiones solo insertan filas; ``send_pending`` (comando ``send_outbox`` o tarea
+periódica) reclama lotes con ``SELECT ... FOR UPDATE SKIP LOCKED`` en una transacción corta
+que aplaza su ``next_attempt_at`` ``EMAIL_OUTBOX_LEASE`` segundos: mientras dura esa
+concesión ningún otro proceso las ve pendientes. Los correos se envían después, fuera de la
+transacción y por una única conexión del backend de correo, y al terminar se registra el
+resultado. Si el proceso muere a mitad de lote, las filas vuelven a la cola al vencer la
+concesión. Los fallos se reintentan con espera exponencial.
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(to, subject, body):
+    """
+    Añade un correo a la cola. Debe llamarse dentro de la transacción que lo origina.
+    """
+    return EmailOutbox.objects.create(to=to, subject=subject, body=body)
+
+
+def backoff(attempts):
+    """
+    Espera antes del siguiente intento: exponencial con jitter y acotada.
+    """
+    delay = min(settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def _pending(now):
+    return EmailOutbox.objects.filter(
+        sent_at__isnull=True, next_attempt_at__lte=now, attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def _claim(batch_size, due):
+    """
+    Reclama un lote de los correos listos en ``due``: cuenta el intento y aplaza las filas
+    hasta que venza la concesión, contada desde el momento de reclamarlas.
+    """
+    with transaction.atomic():
+        rows = list(_pending(due).select_for_update(skip_locked=True).order_by('next_attempt_at', 'id')[:batch_size])
+        lease_until = timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        for row in rows:
+            row.attempts += 1
+            row.next_attempt_at = lease_until
+        EmailOutbox.objects.bulk_update(rows, ['attempts', 'next_attempt_at'])
+    return rows
+
+
+def _send_batch(connection, batch_size, due):
+    """
+    Reclama y envía un lote. Ningún bloqueo ni transacción se mantiene durante el envío.
+    Devuelve ``(reclamadas, enviadas)``.
+    """
+    rows = _claim(batch_size, due)
+    sent = []
+    for row in rows:
+        message = EmailMessage(row.subject, row.body, settings.DEFAULT_FROM_EMAIL, [row.to], connection=connection)
+        try:
+            message.send()
+        except Exception as exc:
+            logger.warning("Error al enviar el correo %s (intento %s): %s", row.id, row.attempts, exc)
+            row.last_error = str(exc)[:1000]
+            row.next_attempt_at = timezone.now() + backoff(row.attempts)
+            # La conexión puede haber quedado inutilizable: se reabre para el resto del lote
+            connection.close()
+            try:
+                connection.open()
+            except Exception:
+                pass
+        else:
+            row.sent_at = timezone.now()
+            sent.append(row)
+    EmailOutbox.objects.bulk_update(rows, ['last_error', 'next_attempt_at', 'sent_at'])
+    return len(rows), len(sent)
+
+
+def send_pending(batch_size=100, max_batches=None, now=None):
+    """
+    Envía lotes hasta vaciar la cola de correos listos en ``now`` (por defecto, al empezar).
+    Devuelve el número de enviados.
+    """
+    due = now or timezone.now()
+    total_sent = 0
+    batches = 0
+    if not _pending(due).exists():
+        return 0  # Sin conectar con el servidor de correo si no hay nada que enviar
+    connection = get_connection()
+    try:
+        connection.open()  # Una sola conexión (p. ej. SMTP) para todos los lotes
+    except Exception:
+        logger.exception("No se pudo conectar con el servidor de correo")
+        return 0
+    try:
+        while max_batches is None or batches < max_batches:
+            claimed, sent = _send_batch(connection, batch_size, due)
+            total_sent += sent
+            batches += 1
+            if claimed < batch_size:
+                break
+    finally:
+        connection.close()
+    return total_sent
@@ -0,0 +1,154 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class TranslationCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) del historial: cada página continúa desde la última fila
+    de la anterior usando ``tevent_user_history_idx``, sin ``OFFSET`` ni ``COUNT``.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 200
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Paginación por cursor que guarda en el cursor el valor de todos los campos de
+    ``ordering`` de la última fila, no solo del primero. ``CursorPagination`` continúa desde
+    ``ordering[0]`` y salta con ``OFFSET`` las filas que empatan en él; aquí cada página es un
+    rango ``(a, b) > (x, y)`` sobre el índice, haya o no empates. El último campo de
+    ``ordering`` debe ser único y ninguno nulo.
+    """
+    invalid_cursor_message = 'Cursor no válido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor[0]
+
+        ordering = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after(ordering, self.cursor[1]))
+
+        # Una fila de más indica si hay otra página en ese sentido
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _after(ordering, values):
+        # (a, b, c) > (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first = ordering[0].lstrip('-')
+        # Cota simple sobre el primer campo para que el planificador use el índice como rango
+        bound = Q(**{f'{first}__{"lte" if ordering[0].startswith("-") else "gte"}': values[0]})
+        return bound & condition
+
+    def _position(self, instance):
+        return [
+            instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-'))
+            for field in self.ordering
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor((False, self._position(self.page[-1])))
+        return self.encode_cursor((True, self.cursor[1])) if self.cursor else None
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor((True, self._position(self.page[0])))
+        return self.encode_cursor((False, self.cursor[1])) if self.cursor else None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            values = tokens['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, values
+
+    def encode_cursor(self, cursor):
+        reverse, values = cursor
+        tokens = {'p': [str(value) for value in values]}
+        if reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class CatalogueCursorPagination(KeysetCursorPagination):
+    """
+    Paginación por cursor del catálogo de lecciones en su orden de publicación. Muchas
+    lecciones comparten ``position`` (por defecto 0), así que el cursor lleva también el id.
+    """
+    ordering = ('position', 'id')
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+def estimated_count(queryset, threshold):
+    """
+    Número de filas de ``queryset``. En PostgreSQL se pide primero la estimación del
+    planificador (``EXPLAIN``, sin recorrer la tabla) y, si supera ``threshold``, se devuelve
+    esa estimación; por debajo del umbral, o en otros motores, se ejecuta ``COUNT(*)``.
+    """
+    connection = connections[queryset.db]
+    if threshold and connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= threshold:
+            return estimate
+    return queryset.count()
@@ -0,0 +1,173 @@
+"""
+Caché de resultados del clasificador de señas.
+
+La clave de cada ventana es un hash de sus keypoints normalizados redondeados a múltiplos de
+``RECOGNITION_CACHE_QUANTUM`` más la versión y revisión del modelo: una seña repetida, una
+pausa con las manos quietas o ventanas solapadas que apenas cambian dan la misma huella y
+reutilizan el resultado sin inferencia. Dentro de un lote, las ventanas con la misma huella
+se clasifican una sola vez.
+
+Hay dos niveles: una LRU acotada por proceso (``TTLCache``) y, si ``RECOGNITION_CACHE``
+nombra un alias de ``CACHES``, una caché compartida entre workers consultada con un único
+``get_many`` por lote. Al activar o registrar un modelo cambia la clave, así que las
+entradas anteriores dejan de usarse; el nivel local se vacía en ese momento y el compartido
+las expira por TTL.
+
+Los aciertos y fallos se cuentan en ``core_recognition_cache_lookups_total``.
+"""
+import hashlib
+import logging
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .cache import TTLCache
+from .classifiers import normalize_windows
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'recognition'
+
+
+def fingerprints(windows, quantum):
+    """
+    Huella hexadecimal de cada ventana normalizada de un lote ``(B, W, F)``. SHA-1 no protege
+    nada aquí: es el hash más rápido de ``hashlib`` en CPUs con instrucciones SHA.
+    """
+    scaled = windows * np.float32(1 / quantum)
+    np.rint(scaled, out=scaled)
+    if not np.isfinite(scaled).all():  # Keypoints NaN (manos fuera de cuadro) o fuera de rango
+        np.nan_to_num(scaled, copy=False)
+        np.clip(scaled, -32768, 32767, out=scaled)
+    quantized = scaled.astype(np.int16)
+    return [hashlib.sha1(window).hexdigest() for window in quantized]
+
+
+class RecognitionCache:
+    """
+    Caché de ``(índice de etiqueta, confianza)`` por huella de ventana y modelo.
+    """
+
+    def __init__(self, maxsize, ttl, quantum, shared=None):
+        self.local = TTLCache(maxsize, ttl)
+        self.ttl = ttl
+        self.quantum = quantum
+        self.shared = shared
+        self.model = None
+        self.hits = {'local': 0, 'shared': 0, 'miss': 0}
+        self._lock = threading.Lock()
+
+    def _use_model(self, model):
+        if model != self.model:
+            with self._lock:
+                if model != self.model:
+                    self.local.clear()
+                    self.model = model
+
+    def _count(self, **counts):
+        for result, count in counts.items():
+            if count:
+                self.hits[result] += count
+                metrics.registry.increment('core_recognition_cache_lookups_total', count, result=result)
+
+    def hit_rate(self):
+        total = sum(self.hits.values())
+        return (self.hits['local'] + self.hits['shared']) / total if total else 0.0
+
+    def _get_shared(self, keys):
+        try:
+            return self.shared.get_many(keys)
+        except Exception as exc:  # La caché compartida caída no debe cortar el reconocimiento
+            logger.warning("Caché de reconocimiento compartida no disponible: %s", exc)
+            return {}
+
+    def _set_shared(self, values):
+        try:
+            self.shared.set_many(values, self.ttl)
+        except Exception as exc:
+            logger.warning("Caché de reconocimiento compartida no disponible: %s", exc)
+
+    def predict(self, classifier, windows):
+        """
+        Como ``classifier.predict(normalize_windows(windows))``, pero solo infiere las
+        ventanas que no están en caché.
+        """
+        normalized = normalize_windows(windows)
+        model = f'{classifier.version}:{classifier.revision}'
+        self._use_model(model)
+
+        results = [None] * len(normalized)
+        missing = {}  # clave -> posiciones del lote
+        local = 0
+        for position, digest in enumerate(fingerprints(normalized, self.quantum)):
+            key = f'{KEY_PREFIX}:{model}:{digest}'
+            value = self.local.get(key)
+            if value is None:
+                missing.setdefault(key, []).append(position)
+            else:
+                results[position] = value
+                local += 1
+
+        shared = 0
+        if missing and self.shared is not None:
+            for key, value in self._get_shared(list(missing)).items():
+                value = tuple(value)
+                self.local.set(key, value)
+                for position in missing.pop(key):
+                    results[position] = value
+                    shared += 1
+
+        if missing:
+            indices, confidences = classifier.predict(normalized[[positions[0] for positions in missing.values()]])
+            computed = {}
+            for (key, positions), index, confidence in zip(missing.items(), indices, confidences):
+                value = computed[key] = (int(index), float(confidence))
+                self.local.set(key, value)
+                for position in positions:
+                    results[position] = value
+            if self.shared is not None:
+                self._set_shared(computed)
+            # Las repeticiones dentro del lote tampoco pasan por el modelo
+            local += sum(len(positions) - 1 for positions in missing.values())
+
+        self._count(local=local, shared=shared, miss=len(missing))
+        return (
+            np.array([index for index, _ in results], dtype=np.intp),
+            np.array([confidence for _, confidence in results], dtype=np.float32),
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Caché del proceso según ``RECOGNITION_CACHE_*`` (``None`` si está desactivada).
+    """
+    global _cache
+    if not settings.RECOGNITION_CACHE_SIZE:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RecognitionCache(
+                    settings.RECOGNITION_CACHE_SIZE,
+                    settings.RECOGNITION_CACHE_TTL,
+                    settings.RECOGNITION_CACHE_QUANTUM,
+                    caches[settings.RECOGNITION_CACHE] if settings.RECOGNITION_CACHE else None,
+                )
+    return _cache
+
+
+def predict(classifier, windows):
+    """
+    Clasifica un lote de ventanas sin normalizar pasando por la caché si está activada.
+    """
+    cache = get_cache()
+    if cache is None:
+        return classifier.predict(normalize_windows(windows))
+    return cache.predict(classifier, windows)
@@ -0,0 +1,168 @@
+"""
+Revocación de tokens JWT (logout y rotación de refresh tokens).
+
+La fuente de verdad es la tabla ``RevokedToken``: revocar es un ``INSERT`` con ``jti``
+único, así que consumir un refresh token es atómico entre workers y reutilizarlo falla.
+Las filas se borran cuando el token expira (``maintenance.prune_revoked_tokens``): la
+tabla no crece más allá de los tokens vivos.
+
+Cada proceso mantiene un filtro de Bloom por intervalo de expiración
+(``REVOCATION_BUCKET_SECONDS``). Comprobar un token mira solo el filtro de su ``exp``: un
+negativo es definitivo y no consulta nada, que es el caso de casi todas las peticiones; un
+positivo (revocado o falso positivo, ~``REVOCATION_BLOOM_ERROR_RATE``) se confirma en la
+tabla. Los filtros cuyo intervalo ya ha expirado se descartan enteros, de modo que la
+memoria depende de la vida de los tokens, no del histórico.
+
+Las revocaciones de otros workers llegan con la sincronización periódica
+(``REVOCATION_SYNC_INTERVAL``); las del propio proceso se ven al instante. La sincronización
+y la purga solo se inician en los procesos del servidor (``start_background_tasks``).
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de tamaño fijo para ``capacity`` elementos con la tasa de falsos
+    positivos ``error_rate``. Posiciones por doble hash sobre un BLAKE2b de 128 bits.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    """
+    Filtros de Bloom por intervalo de expiración delante de ``RevokedToken``.
+    """
+
+    def __init__(self, bucket_seconds, capacity, error_rate):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._synced_at = None
+
+    def _bucket(self, exp):
+        return int(exp) // self.bucket_seconds
+
+    def _add_local(self, jti, exp):
+        key = self._bucket(exp)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = BloomFilter(self.capacity, self.error_rate)
+            bucket.add(jti)
+
+    def expire(self, now=None):
+        """
+        Descarta los filtros de intervalos en los que ya han expirado todos los tokens.
+        """
+        current = self._bucket(time.time() if now is None else now)
+        with self._lock:
+            for key in [key for key in self._buckets if key < current]:
+                del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def might_be_revoked(self, jti, exp):
+        bucket = self._buckets.get(self._bucket(exp))
+        return bucket is not None and jti in bucket
+
+    def is_revoked(self, jti, exp):
+        """
+        ``True`` si el token está revocado. Sin consultas salvo que el filtro dé positivo.
+        """
+        if not jti or not self.might_be_revoked(jti, exp):
+            return False
+        return RevokedToken.objects.using(DEFAULT_DB_ALIAS).filter(jti=jti).exists()
+
+    def revoke(self, jti, exp):
+        """
+        Revoca el token. Devuelve ``False`` si ya estaba revocado (refresh token reutilizado).
+        """
+        expires_at = datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+        try:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+        finally:
+            self._add_local(jti, exp)
+        return True
+
+    def sync(self):
+        """
+        Añade a los filtros las revocaciones de otros workers. La primera vez carga todas las
+        vigentes; después, las recientes con un margen que cubre transacciones lentas (añadir
+        dos veces un ``jti`` no tiene efecto).
+        """
+        now = timezone.now()
+        queryset = RevokedToken.objects.using(DEFAULT_DB_ALIAS).filter(expires_at__gt=now)
+        if self._synced_at is not None:
+            queryset = queryset.filter(revoked_at__gte=self._synced_at - timedelta(seconds=settings.REVOCATION_SYNC_OVERLAP))
+        for jti, expires_at in queryset.values_list('jti', 'expires_at').iterator(chunk_size=5000):
+            self._add_local(jti, expires_at.timestamp())
+        self._synced_at = now
+        self.expire(now.timestamp())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RevocationStore(
+                    settings.REVOCATION_BUCKET_SECONDS,
+                    settings.REVOCATION_BLOOM_CAPACITY,
+                    settings.REVOCATION_BLOOM_ERROR_RATE,
+                )
+    return _store
+
+
+def sync():
+    get_store().sync()
+
+
+def start_background_tasks():
+    """
+    Inicia la sincronización y la purga periódicas de revocaciones (desde
+    ``core.scheduler.start_background_tasks``).
+    """
+    from .maintenance import prune_revoked_tokens
+    from .scheduler import schedule
+
+    if settings.REVOCATION_SYNC_INTERVAL:
+        schedule('sync-revocations', settings.REVOCATION_SYNC_INTERVAL, sync)
+    if settings.REVOCATION_PRUNE_INTERVAL:
+        schedule('prune-revoked-tokens', settings.REVOCATION_PRUNE_INTERVAL, prune_revoked_tokens)
@@ -0,0 +1,75 @@
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.decorators import method_decorator
+
+from . import context
+
+
+class PinState:
+    """
+    Estado de lectura de la petición: ``pinned`` si debe leer del primario (escritura
+    reciente en esta sesión) y ``written`` si ha escrito durante la propia petición.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.written = False
+
+
+_state = context.propagate(contextvars.ContextVar('core_db_pin_state', default=None))
+
+
+def activate(state):
+    """
+    Asocia el estado de lectura a la petición en curso; devuelve el token para restaurarlo.
+    """
+    return _state.set(state)
+
+
+def deactivate(token):
+    _state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Envía las lecturas a las réplicas de ``DATABASE_REPLICAS`` y las escrituras al primario.
+
+    Se lee del primario cuando no hay réplicas, dentro de una transacción en el primario
+    (p. ej. vistas con ``ATOMIC_REQUESTS``) y cuando la sesión está fijada al primario por
+    una escritura reciente (ver ``ReplicaPinningMiddleware``).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state is not None and (state.pinned or state.written):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def read_only(view_class):
+    """
+    Decorador de clase para vistas de solo lectura: las excluye de ``ATOMIC_REQUESTS``
+    para que sus consultas puedan ir a las réplicas.
+    """
+    return method_decorator(transaction.non_atomic_requests, name='dispatch')(view_class)
@@ -0,0 +1,77 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Ejecuta una función cada ``interval`` segundos en un hilo daemon del proceso.
+
+    Los errores se registran y no detienen el hilo; las conexiones a la base de datos
+    del hilo se cierran o reciclan en cada ejecución igual que al final de una petición.
+    """
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            close_old_connections()
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Error en la tarea periódica %s", self.name)
+            finally:
+                close_old_connections()
+
+
+_tasks = {}
+_tasks_lock = threading.Lock()
+
+
+def schedule(name, interval, func):
+    """
+    Registra e inicia una tarea periódica una sola vez por proceso.
+    """
+    with _tasks_lock:
+        if name not in _tasks:
+            task = PeriodicTask(name, interval, func)
+            task.start()
+            _tasks[name] = task
+        return _tasks[name]
+
+
+def start_background_tasks():
+    """
+    Inicia las tareas periódicas configuradas del proceso. Se llama desde ``asgi.py`` y
+    ``wsgi.py`` y no desde ``AppConfig.ready``: ni los comandos de gestión (``migrate`` antes
+    de crear las tablas, ``shell``...), ni los tests, ni los procesos de los pools necesitan
+    hilos que consulten la base de datos.
+    """
+    from . import revocation
+    from .maintenance import prune_translation_events, purge_verification_tokens
+    from .outbox import send_pending
+
+    if settings.VERIFICATION_TOKEN_PURGE_INTERVAL:
+        schedule('purge-verification-tokens', settings.VERIFICATION_TOKEN_PURGE_INTERVAL, purge_verification_tokens)
+    if settings.EMAIL_OUTBOX_INTERVAL:
+        schedule('send-outbox', settings.EMAIL_OUTBOX_INTERVAL, send_pending)
+    if settings.TRANSLATION_MAINTENANCE_INTERVAL:
+        schedule('prune-translation-events', settings.TRANSLATION_MAINTENANCE_INTERVAL, prune_translation_events)
+    revocation.start_background_tasks()
@@ -1,6 +1,9 @@
+import numpy as np
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
-from .models import User
+from django.db import IntegrityError, transaction
+from .models import Lesson, Resource, TranslationEvent, User
 
 class UserSerializer(serializers.ModelSerializer):
     confirm_password = serializers.CharField(write_only=True, required=True)
@@ -22,12 +25,6 @@ class UserSerializer(serializers.ModelSerializer):
             "security_answer_2",
         ]
 
-    def validate_email(self, value):
-        """Verifica que el email sea único."""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Este correo electrónico ya está en uso.")
-        return value
-
     def validate(self, validated_data):
         """Validar los datos de entrada."""
         if validated_data['password'] != validated_data['confirm_password']:
@@ -57,7 +54,12 @@ class UserSerializer(serializers.ModelSerializer):
         user.set_security_answer_2(validated_data.get("security_answer_2", ""))
         
         user.set_password(validated_data["password"])
-        user.save()
+        try:
+            # La unicidad del email la garantiza el índice único Lower(email), sin consulta previa
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            raise serializers.ValidationError({"email": ["Este correo electrónico ya está en uso."]})
         return user
 
 
@@ -74,6 +76,29 @@ class UserReadSerializer(serializers.ModelSerializer):
         ]
 
 
+class ValuesSerializer:
+    """
+    Serializador de solo lectura para salidas planas: los dicts salen directamente de
+    ``.values()`` o de los atributos de una instancia ya cargada, sin crear campos de DRF
+    por fila. Solo para campos simples del modelo (sin relaciones ni ficheros); las fechas
+    las formatea el renderer igual que ``DateTimeField``.
+    """
+    fields = ()
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.fields)
+
+    @classmethod
+    def to_representation(cls, instance):
+        return {name: getattr(instance, name) for name in cls.fields}
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """Misma salida que UserReadSerializer."""
+    fields = tuple(UserReadSerializer.Meta.fields)
+
+
 class LoginSerializer(serializers.Serializer):
     """Serializador para el inicio de sesión."""
     email = serializers.EmailField(required=True)
@@ -91,3 +116,64 @@ class LoginSerializer(serializers.Serializer):
 
         attrs["user"] = user  # Almacenar el usuario autenticado
         return attrs
+
+
+class TranslationEventSerializer(serializers.ModelSerializer):
+    """Serializador de los eventos del historial de traducciones."""
+    class Meta:
+        model = TranslationEvent
+        fields = ["id", "label", "confidence", "model_version", "created_at"]
+
+
+class TranslationEventValuesSerializer(ValuesSerializer):
+    """Misma salida que TranslationEventSerializer."""
+    fields = tuple(TranslationEventSerializer.Meta.fields)
+
+
+class SignSearchSerializer(serializers.Serializer):
+    """Serializador de la búsqueda de señas por embedding."""
+    embeddings = serializers.JSONField()  # Lista de vectores de SIGN_EMBEDDING_DIM valores
+    k = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    MAX_QUERIES = 32
+
+    def validate_embeddings(self, value):
+        """Convertir los vectores a una matriz float32 (Q, D) sin recorrerlos en Python."""
+        try:
+            matrix = np.asarray(value, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Los embeddings deben ser listas de números.")
+        if matrix.ndim != 2 or matrix.shape[1] != settings.SIGN_EMBEDDING_DIM:
+            raise serializers.ValidationError(f"Cada embedding debe tener {settings.SIGN_EMBEDDING_DIM} valores.")
+        if not 1 <= len(matrix) <= self.MAX_QUERIES:
+            raise serializers.ValidationError(f"Se admiten entre 1 y {self.MAX_QUERIES} embeddings por consulta.")
+        if not np.isfinite(matrix).all():
+            raise serializers.ValidationError("Los embeddings no pueden contener NaN ni infinitos.")
+        return matrix
+
+
+class TextToSignSerializer(serializers.Serializer):
+    """Serializador del texto a traducir a señas."""
+    text = serializers.CharField(max_length=settings.TEXT_TO_SIGN_MAX_LENGTH)
+
+
+class ResourceSerializer(serializers.ModelSerializer):
+    """Serializador de los recursos de una lección."""
+    class Meta:
+        model = Resource
+        fields = ["id", "kind", "title", "url", "file"]
+
+
+class LessonSerializer(serializers.ModelSerializer):
+    """Serializador del listado de lecciones."""
+    class Meta:
+        model = Lesson
+        fields = ["id", "slug", "title", "summary", "level"]
+
+
+class LessonDetailSerializer(LessonSerializer):
+    """Serializador de una lección con sus recursos."""
+    resources = ResourceSerializer(many=True, read_only=True)
+
+    class Meta(LessonSerializer.Meta):
+        fields = LessonSerializer.Meta.fields + ["resources"]
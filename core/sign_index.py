@@ -0,0 +1,273 @@
+"""
+Índice en memoria de los embeddings del diccionario de señas.
+
+Los vectores se normalizan (L2) y se guardan en una matriz ``float32`` ``(N, D)``, así que
+la similitud coseno de un lote de consultas es un único producto de matrices. Con muchas
+señas (``SIGN_INDEX_IVF_MIN``) se usa además un índice de listas invertidas (IVF): se
+agrupan los vectores con k-means y cada consulta solo se compara con los vectores de las
+``SIGN_INDEX_NPROBE`` listas más cercanas.
+"""
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models.functions import Length
+from django.utils import timezone
+
+# Margen al sincronizar por ``updated_at``: cubre transacciones que confirmaron tarde
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def top_k(scores, k):
+    """
+    Índices de las ``k`` mejores puntuaciones de cada fila, en orden descendente.
+    ``argpartition`` evita ordenar las N puntuaciones completas.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.intp)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def kmeans(vectors, clusters, iterations=10, seed=0):
+    """
+    k-means esférico (producto escalar sobre vectores normalizados); devuelve los centroides.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)]
+    for _ in range(iterations):
+        assign = (vectors @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=clusters) == 0
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+
+class SignIndex:
+    """
+    Vectores normalizados, ids y nombres de las señas. Las modificaciones construyen arrays
+    nuevos y los publican con una sola asignación, así que las búsquedas concurrentes
+    nunca ven un estado a medias.
+    """
+
+    def __init__(self, dim, ivf_min=0, nprobe=8):
+        self.dim = dim
+        self.ivf_min = ivf_min
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._state = self._build(np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32), [])
+
+    def __len__(self):
+        return len(self._state['ids'])
+
+    def _build(self, ids, vectors, names, previous=None, dirty=None):
+        """
+        Publica un estado nuevo. ``previous`` es el IVF del estado anterior: si sus centroides
+        siguen siendo válidos solo se asignan a una lista las filas ``dirty`` (nuevas o
+        modificadas) en lugar de todas.
+        """
+        state = {'ids': ids, 'vectors': vectors, 'names': names, 'rows': {int(i): row for row, i in enumerate(ids)}}
+        if self.ivf_min and len(ids) >= self.ivf_min:
+            # Se reentrena cuando el índice ha duplicado su tamaño desde el último entrenamiento
+            if previous is None or len(ids) >= 2 * previous['trained_size']:
+                centroids = kmeans(vectors, int(np.sqrt(len(ids))))
+                trained_size = len(ids)
+                assign = (vectors @ centroids.T).argmax(axis=1)
+            else:
+                centroids, trained_size = previous['centroids'], previous['trained_size']
+                assign = np.zeros(len(ids), dtype=np.intp)
+                assign[:len(previous['assign'])] = previous['assign']
+                dirty = np.asarray(dirty, dtype=np.intp)
+                assign[dirty] = (vectors[dirty] @ centroids.T).argmax(axis=1)
+            order = np.argsort(assign, kind='stable')
+            state['ivf'] = {
+                'centroids': centroids,
+                'trained_size': trained_size,
+                'assign': assign,
+                'order': order,
+                'offsets': np.searchsorted(assign[order], np.arange(len(centroids) + 1)),
+            }
+        return state
+
+    def upsert(self, ids, vectors, names):
+        """
+        Añade o reemplaza señas. Se copian los arrays y se reutilizan los centroides IVF.
+        """
+        if not len(ids):
+            return
+        vectors = normalize(vectors).reshape(len(ids), self.dim)
+        with self._lock:
+            state = self._state
+            all_ids, all_vectors, all_names = state['ids'], state['vectors'].copy(), list(state['names'])
+            new_ids, new_vectors, new_names, dirty = [], [], [], []
+            for sign_id, vector, name in zip(ids, vectors, names):
+                row = state['rows'].get(int(sign_id))
+                if row is None:
+                    dirty.append(len(all_ids) + len(new_ids))
+                    new_ids.append(sign_id)
+                    new_vectors.append(vector)
+                    new_names.append(name)
+                else:
+                    dirty.append(row)
+                    all_vectors[row] = vector
+                    all_names[row] = name
+            if new_ids:
+                all_ids = np.concatenate([all_ids, np.asarray(new_ids, dtype=np.int64)])
+                all_vectors = np.concatenate([all_vectors, np.asarray(new_vectors, dtype=np.float32)])
+                all_names += new_names
+            self._state = self._build(all_ids, all_vectors, all_names, state.get('ivf'), dirty)
+
+    def remove(self, ids):
+        """
+        Quita señas del índice sin recargar las demás; se conservan los centroides IVF.
+        """
+        with self._lock:
+            state = self._state
+            keep = ~np.isin(state['ids'], np.fromiter(ids, dtype=np.int64))
+            if keep.all():
+                return
+            previous = state.get('ivf')
+            if previous is not None:
+                previous = dict(previous, assign=previous['assign'][keep])
+            names = [name for name, kept in zip(state['names'], keep) if kept]
+            self._state = self._build(state['ids'][keep], state['vectors'][keep], names, previous, [])
+
+    def replace(self, ids, vectors, names):
+        """
+        Reconstruye el índice completo (p. ej. tras borrar señas).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = normalize(vectors).reshape(len(ids), self.dim)
+        with self._lock:
+            self._state = self._build(ids, vectors, list(names))
+
+    def vector(self, sign_id):
+        state = self._state
+        row = state['rows'].get(int(sign_id))
+        return None if row is None else state['vectors'][row]
+
+    def search(self, queries, k=10, exclude=None):
+        """
+        Busca las ``k`` señas más similares a cada consulta de un lote ``(Q, D)``.
+        Devuelve una lista por consulta de ``(id, nombre, similitud)``.
+        """
+        state = self._state
+        queries = normalize(queries).reshape(-1, self.dim)
+        extra = 1 if exclude is not None else 0
+        if 'ivf' in state:
+            rows = self._search_ivf(state, queries, k + extra)
+        else:
+            scores = queries @ state['vectors'].T
+            best = top_k(scores, k + extra)
+            rows = [(candidates, scores[q, candidates]) for q, candidates in enumerate(best)]
+
+        results = []
+        for candidates, scores in rows:
+            matches = [
+                (int(state['ids'][row]), state['names'][row], round(float(score), 4))
+                for row, score in zip(candidates, scores)
+                if state['ids'][row] != exclude
+            ]
+            results.append(matches[:k])
+        return results
+
+    def _search_ivf(self, state, queries, k):
+        ivf = state['ivf']
+        probes = top_k(queries @ ivf['centroids'].T, self.nprobe)
+        rows = []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate([ivf['order'][ivf['offsets'][c]:ivf['offsets'][c + 1]] for c in lists])
+            scores = state['vectors'][candidates] @ query
+            best = top_k(scores[np.newaxis], k)[0]
+            rows.append((candidates[best], scores[best]))
+        return rows
+
+
+class SyncedSignIndex(SignIndex):
+    """
+    Índice sincronizado con la tabla ``Sign``: como mucho cada ``refresh_interval`` segundos
+    carga solo las señas modificadas desde la última sincronización (por ``updated_at``) y
+    quita las que ya no están en la tabla comparando los ids.
+    """
+
+    def __init__(self, dim, ivf_min=0, nprobe=8, refresh_interval=5.0):
+        super().__init__(dim, ivf_min, nprobe)
+        self.refresh_interval = refresh_interval
+        self._synced_at = None
+        self._checked_at = None
+        self._sync_lock = threading.Lock()
+
+    def mark_stale(self):
+        self._checked_at = None
+
+    def _signs(self):
+        """
+        Señas con un embedding de ``dim`` valores. Las demás (sin embedding o de otra
+        dimensión) se ignoran: una sola fila mal formada no debe impedir cargar el índice.
+        """
+        from .models import Sign
+
+        return Sign.objects.alias(embedding_size=Length('embedding')).filter(embedding_size=self.dim * 4)
+
+    def _load(self, queryset):
+        rows = list(queryset.values_list('id', 'name', 'embedding'))
+        ids = [row[0] for row in rows]
+        names = [row[1] for row in rows]
+        vectors = np.frombuffer(b''.join(bytes(row[2]) for row in rows), dtype=np.float32).reshape(len(rows), self.dim)
+        return ids, vectors, names
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._sync_lock:
+            started = timezone.now()
+            signs = self._signs()
+            if self._synced_at is None:
+                self.replace(*self._load(signs))
+            else:
+                self.upsert(*self._load(signs.filter(updated_at__gte=self._synced_at - SYNC_OVERLAP)))
+                # Se comparan los ids y no el total: un borrado y un alta en el mismo intervalo lo
+                # dejan igual. Faltan las señas que han recibido su embedding sin cambiar
+                # ``updated_at`` (``QuerySet.update``); sobran las borradas o sin embedding válido.
+                current, indexed = set(signs.values_list('id', flat=True)), set(self._state['ids'].tolist())
+                if current - indexed:
+                    self.upsert(*self._load(signs.filter(id__in=current - indexed)))
+                if indexed - current:
+                    self.remove(indexed - current)
+            self._synced_at = started
+            self._checked_at = now
+
+    def search(self, queries, k=10, exclude=None):
+        self.refresh()
+        return super().search(queries, k, exclude)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SyncedSignIndex(
+                    settings.SIGN_EMBEDDING_DIM,
+                    settings.SIGN_INDEX_IVF_MIN,
+                    settings.SIGN_INDEX_NPROBE,
+                    settings.SIGN_INDEX_REFRESH_INTERVAL,
+                )
+    return _index
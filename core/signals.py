@@ -1,11 +1,42 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import VerificationToken
+from . import catalogue, compositor, sign_index
+from .authentication import user_cache
+from .models import Lesson, Resource, Sign, User, VerificationToken
 
-@receiver(post_save, sender=VerificationToken)
-def mark_token_as_used(sender, instance, created, **kwargs):
-    """Marca el token como usado y registra el tiempo de uso."""
-    if not created and instance.is_used:
+@receiver(pre_save, sender=VerificationToken)
+def mark_token_as_used(sender, instance, **kwargs):
+    """Registra el tiempo de uso del token al guardarlo como usado (sin volver a guardar)."""
+    if instance.is_used and instance.used_at is None:
         instance.used_at = timezone.now()
-        instance.save()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Elimina el usuario de la caché de autenticación al modificarlo o borrarlo."""
+    user_cache.delete(instance.pk)
+
+
+@receiver(post_save, sender=Sign)
+@receiver(post_delete, sender=Sign)
+def refresh_sign_index(sender, instance, **kwargs):
+    """Fuerza la sincronización del índice de señas del proceso en la próxima búsqueda."""
+    sign_index.get_index().mark_stale()
+
+
+@receiver(post_save, sender=Sign)
+@receiver(post_delete, sender=Sign)
+def refresh_sign_compositor(sender, instance, **kwargs):
+    """Fuerza la comprobación del índice de texto a señas del proceso en la próxima frase."""
+    compositor.get_compositor().mark_stale()
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def bump_catalogue_version(sender, instance, **kwargs):
+    """Invalida los ETags y las páginas en caché del catálogo de aprendizaje."""
+    catalogue.bump()
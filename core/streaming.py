@@ -0,0 +1,227 @@
+"""
+Endpoint WebSocket de reconocimiento de señas en tiempo real (``/ws/recognition/``).
+
+Cada mensaje binario contiene uno o más frames empaquetados en little-endian: un ``uint32``
+con el número de secuencia seguido de ``RECOGNITION_FEATURES`` valores ``float32`` con los
+keypoints de manos y pose. El servidor mantiene una ventana deslizante por stream y agrupa
+las ventanas listas de todos los streams en una única llamada vectorizada al clasificador;
+las ventanas ya vistas se resuelven en la caché de resultados (``core.recognition_cache``).
+Los resultados se envían como mensajes de texto JSON.
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import history, metrics, recognition_cache
+from .authentication import StatelessJWTAuthentication
+from .classifiers import get_classifier
+
+logger = logging.getLogger(__name__)
+
+PATH = '/ws/recognition/'
+
+# Códigos de cierre de la aplicación (rango 4000-4999 del protocolo WebSocket)
+CLOSE_NOT_FOUND = 4404
+CLOSE_UNAUTHORIZED = 4401
+
+
+def frame_dtype(features):
+    """
+    Tipo estructurado de un frame: secuencia ``uint32`` + ``features`` keypoints ``float32``.
+    """
+    return np.dtype([('seq', '<u4'), ('keypoints', '<f4', (features,))])
+
+
+class SlidingWindow:
+    """
+    Últimos ``size`` frames de un stream. Indica cuándo hay una ventana nueva que clasificar
+    (cada ``stride`` frames) y descarta los frames que llegan desordenados o repetidos.
+    """
+
+    def __init__(self, size, features, stride):
+        self.buffer = np.zeros((size, features), dtype=np.float32)
+        self.stride = stride
+        self.filled = 0
+        self.since_last = 0
+        self.last_seq = None
+
+    def push(self, frames):
+        if self.last_seq is not None:
+            frames = frames[frames['seq'] > self.last_seq]
+        if not len(frames):
+            return False
+        self.last_seq = int(frames['seq'][-1])
+
+        keypoints = frames['keypoints'][-len(self.buffer):]
+        count = len(keypoints)
+        self.buffer[:-count] = self.buffer[count:]
+        self.buffer[-count:] = keypoints
+        self.filled = min(len(self.buffer), self.filled + count)
+        self.since_last += len(frames)
+
+        if self.filled == len(self.buffer) and self.since_last >= self.stride:
+            self.since_last = 0
+            return True
+        return False
+
+
+class RecognitionStream:
+    """
+    Estado de una conexión: su ventana y la cola acotada de resultados pendientes de envío.
+    """
+
+    def __init__(self, send, user_id):
+        self.send = send
+        self.user_id = user_id
+        self.window = SlidingWindow(settings.RECOGNITION_WINDOW, settings.RECOGNITION_FEATURES, settings.RECOGNITION_STRIDE)
+        self.results = asyncio.Queue(maxsize=settings.RECOGNITION_RESULT_QUEUE)
+
+    def deliver(self, result):
+        # Si el cliente no consume los resultados, se descarta el más antiguo
+        if self.results.full():
+            self.results.get_nowait()
+        self.results.put_nowait(result)
+
+    async def send_results(self):
+        while True:
+            result = await self.results.get()
+            await self.send({'type': 'websocket.send', 'text': json.dumps(result)})
+
+
+class MicroBatcher:
+    """
+    Agrupa las ventanas listas de todos los streams y las clasifica por lotes.
+
+    Cada stream tiene como máximo una ventana pendiente: si llega otra antes de que se
+    procese, sustituye a la anterior (la ventana vieja ya no interesa). Un lote se lanza al
+    alcanzar ``max_batch`` ventanas o tras esperar ``max_delay`` segundos.
+    """
+
+    def __init__(self, max_batch, max_delay):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.loop = asyncio.get_running_loop()
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._task = self.loop.create_task(self._run())
+
+    def submit(self, stream, window, seq):
+        self._pending[stream] = (window, seq)
+        self._wakeup.set()
+
+    def discard(self, stream):
+        self._pending.pop(stream, None)
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                stream = next(iter(self._pending))
+                batch.append((stream, *self._pending.pop(stream)))
+            if not self._pending:
+                self._wakeup.clear()
+            if batch:
+                try:
+                    await self._classify(batch)
+                except Exception:
+                    # Un fallo del modelo (carga o inferencia) no debe detener el batcher del worker
+                    logger.exception("Error al clasificar un lote de %s ventanas", len(batch))
+                    for stream, _, seq in batch:
+                        stream.deliver({'seq': seq, 'error': 'No se pudo clasificar la ventana.'})
+
+    async def _classify(self, batch):
+        classifier = get_classifier()
+        windows = np.stack([window for _, window, _ in batch])
+        started = time.perf_counter()
+        indices, confidences = await self.loop.run_in_executor(
+            None, lambda: recognition_cache.predict(classifier, windows)
+        )
+        metrics.registry.observe('core_recognition_inference_seconds', time.perf_counter() - started)
+        metrics.registry.observe('core_recognition_batch_size', len(batch))
+
+        for (stream, _, seq), index, confidence in zip(batch, indices, confidences):
+            label = classifier.labels[index]
+            stream.deliver({
+                'seq': seq,
+                'label': label,
+                'confidence': round(float(confidence), 4),
+                'model': classifier.version,
+            })
+            history.record(stream.user_id, label, confidence, classifier.version)
+
+
+_batcher = None
+
+
+def get_batcher():
+    """
+    Devuelve el micro-batcher del event loop en curso (uno por worker); si su tarea ha
+    terminado (p. ej. cancelada), crea otro.
+    """
+    global _batcher
+    if _batcher is None or _batcher.loop is not asyncio.get_running_loop() or _batcher._task.done():
+        _batcher = MicroBatcher(settings.RECOGNITION_MAX_BATCH, settings.RECOGNITION_MAX_DELAY)
+    return _batcher
+
+
+def authenticate(scope):
+    """
+    Valida el access token JWT del parámetro ``token`` y devuelve el id del usuario o ``None``.
+    """
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if not token:
+        return None
+    try:
+        validated = StatelessJWTAuthentication().get_validated_token(token)
+    except (InvalidToken, TokenError):
+        return None
+    return validated.get(jwt_settings.USER_ID_CLAIM)
+
+
+async def websocket_application(scope, receive, send):
+    """
+    Aplicación ASGI para las conexiones WebSocket.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if scope['path'] != PATH:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    # Fuera del event loop: la comprobación de revocación puede consultar la base de datos
+    user_id = await sync_to_async(authenticate)(scope)
+    if user_id is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    await send({'type': 'websocket.accept'})
+    dtype = frame_dtype(settings.RECOGNITION_FEATURES)
+    stream = RecognitionStream(send, user_id)
+    sender = asyncio.create_task(stream.send_results())
+    batcher = get_batcher()
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            data = message.get('bytes')
+            if not data or len(data) % dtype.itemsize:
+                stream.deliver({'error': 'Formato de frame inválido.'})
+                continue
+            if stream.window.push(np.frombuffer(data, dtype=dtype)):
+                batcher.submit(stream, stream.window.buffer.copy(), stream.window.last_seq)
+    finally:
+        batcher.discard(stream)
+        sender.cancel()
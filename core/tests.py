@@ -1,3 +1,1292 @@
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import urls as core_urls
+from . import (
+    bulk_users, classifiers, compositor, fastjson, frames, hashing, history, instrumentation, maintenance, metrics, outbox, recognition_cache,
+    revocation, routers, scheduler, sign_index, streaming, throttling, uploads,
+)
+from .admin import UserAdmin
+from .model_registry import ModelRegistry
+from .middleware import QueryBudgetExceeded, ReplicaPinningMiddleware, get_query_budget
+from .models import EmailOutbox, Lesson, Resource, RevokedToken, Sign, TranslationEvent, Upload, User, VerificationToken
+from .serializers import TranslationEventSerializer, TranslationEventValuesSerializer, UserReadSerializer, UserValuesSerializer
+from .tokens import tokens_for_user
+from .views import MediaView, VerifyEmailView
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+PASSWORD = 'Clave-Segura-123'
+
+
+class QueryBudgetDeclarationTests(SimpleTestCase):
+    def test_every_core_route_declares_a_budget(self):
+        for pattern in core_urls.urlpatterns:
+            with self.subTest(route=pattern.name):
+                self.assertIsNotNone(get_query_budget(pattern.callback))
+
+
+REGISTRATION = {
+    'email': 'nuevo@example.com',
+    'password': PASSWORD,
+    'confirm_password': PASSWORD,
+    'security_answer_1': 'uno',
+    'security_answer_2': 'dos',
+}
+
+
+class ApiTestMixin:
+    """
+    Usuario de prueba y atajos para las peticiones a ``core.urls``. Las clases que lo usan son
+    ``TransactionTestCase``: el pool de hashing y los ``on_commit`` necesitan transacciones reales.
+    """
+
+    def setUp(self):
+        cache.clear()  # Límites de intentos y páginas del catálogo de la prueba anterior
+        self.user = User.objects.create(email='ana@example.com', name='Ana', password=make_password(PASSWORD))
+
+    def create_token(self, token, **kwargs):
+        kwargs.setdefault('expires', timezone.now() + timedelta(hours=1))
+        return VerificationToken.objects.create(identifier=self.user.email, token=token, **kwargs)
+
+    @staticmethod
+    def route(name):
+        return next(str(p.pattern) for p in core_urls.urlpatterns if p.name == name)
+
+    def post(self, name, data, **extra):
+        return self.client.post(f'/api/{self.route(name)}', data, content_type='application/json', **extra)
+
+    def bearer(self):
+        return {'HTTP_AUTHORIZATION': f'Bearer {tokens_for_user(self.user).access_token}'}
+
+    def create_signs(self):
+        Sign.objects.all().delete()
+        signs = []
+        for name, vector in [('hola', [1, 0]), ('adiós', [0.6, 0.8]), ('gracias', [0, 1])]:
+            sign = Sign(name=name)
+            sign.set_embedding(vector + [0] * 6)
+            sign.save()
+            signs.append(sign)
+        return signs
+
+    def create_clip_signs(self, names):
+        for name, aliases in names:
+            Sign.objects.create(name=name, aliases=aliases, clip=f'signs/{name}.mp4')
+
+    def create_lessons(self):
+        cache.clear()
+        Lesson.objects.all().delete()
+        for position, slug in enumerate(['abecedario', 'saludos', 'numeros']):
+            lesson = Lesson.objects.create(title=slug.title(), slug=slug, position=position)
+            Resource.objects.create(lesson=lesson, kind='video', title='Video', url='https://example.com/v.mp4')
+
+    def create_media_files(self, root):
+        MediaView.access_cache.clear()
+        lesson = Lesson.objects.create(title='Video', slug='video-media')
+        Resource.objects.create(lesson=lesson, kind='video', title='Clip', file='lessons/clip.mp4')
+        os.makedirs(os.path.join(root, 'lessons'))
+        with open(os.path.join(root, 'lessons', 'clip.mp4'), 'wb') as fh:
+            fh.write(bytes(range(100)))
+        with open(os.path.join(root, 'lessons', 'privado.mp4'), 'wb') as fh:
+            fh.write(b'x')
+
+    def put_chunk(self, upload, body, content_range):
+        return self.client.put(
+            f'/api/uploads/{upload.id}/', body, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=content_range, **self.bearer(),
+        )
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTests(ApiTestMixin, TransactionTestCase):
+    """
+    Recorre el camino más caro de cada ruta de ``core.urls``; ``QueryBudgetMiddleware`` hace
+    fallar la petición si supera su presupuesto. El comportamiento de cada vista se prueba
+    en su propia clase.
+    """
+
+    def call_register(self):
+        self.assertEqual(self.post('register', REGISTRATION).status_code, 201)
+        self.assertEqual(self.post('register', REGISTRATION).status_code, 400)
+
+    def call_login(self):
+        self.assertEqual(self.post('login', {'email': self.user.email, 'password': PASSWORD}).status_code, 200)
+
+    def call_token_refresh(self):
+        self.assertEqual(self.post('token-refresh', {'refresh': str(tokens_for_user(self.user))}).status_code, 200)
+
+    def call_logout(self):
+        self.assertEqual(self.post('logout', {'refresh': str(tokens_for_user(self.user))}, **self.bearer()).status_code, 200)
+
+    def call_verify_email(self):
+        self.create_token('valido')
+        self.assertEqual(self.post('verify-email', {'token': 'valido'}).status_code, 200)
+
+    def call_profile(self):
+        headers = self.bearer()
+        for _ in range(2):
+            self.assertEqual(self.client.get(f'/api/{self.route("profile")}', **headers).status_code, 200)
+
+    def call_translation_history(self):
+        TranslationEvent.objects.bulk_create(
+            TranslationEvent(user=self.user, label=label, confidence=0.9, model_version='v1') for label in ('a', 'b', 'c')
+        )
+        page = self.client.get(f'/api/{self.route("translation-history")}?limit=2', **self.bearer()).json()
+        self.assertEqual(self.client.get(page['next'], **self.bearer()).status_code, 200)
+
+    @override_settings(SIGN_EMBEDDING_DIM=8)
+    def call_sign_search(self):
+        with mock.patch.object(sign_index, '_index', None):
+            self.create_signs()
+            self.assertEqual(self.post('sign-search', {'embeddings': [[1] * 8], 'k': 2}).status_code, 200)
+
+    @override_settings(SIGN_EMBEDDING_DIM=8)
+    def call_sign_similar(self):
+        with mock.patch.object(sign_index, '_index', None):
+            signs = self.create_signs()
+            self.assertEqual(self.client.get(f'/api/signs/{signs[0].id}/similar/').status_code, 200)
+
+    def call_sign_compose(self):
+        with mock.patch.object(compositor, '_compositor', None):
+            Sign.objects.all().delete()
+            self.create_clip_signs([('hola', ''), ('letra a', '')])
+            self.assertEqual(self.post('sign-compose', {'text': 'hola Ana'}).status_code, 200)
+
+    def call_lesson_list(self):
+        self.create_lessons()
+        self.assertEqual(self.client.get(f'/api/{self.route("lesson-list")}').status_code, 200)
+
+    def call_lesson_detail(self):
+        self.create_lessons()
+        self.assertEqual(self.client.get('/api/lessons/saludos/').status_code, 200)
+
+    def call_media(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            self.create_media_files(root)
+            self.assertEqual(self.client.get('/api/media/lessons/clip.mp4', **self.bearer()).status_code, 200)
+
+    def call_upload_list(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(UPLOAD_ROOT=root):
+            response = self.post('upload-list', {'filename': 'clip.gif', 'kind': 'images', 'size': 10}, **self.bearer())
+            self.assertEqual(response.status_code, 201)
+
+    def call_upload_detail(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(UPLOAD_ROOT=root):
+            upload = uploads.create_upload(self.user.id, 'clip.bin', 'images', 10)
+            self.assertEqual(self.put_chunk(upload, b'01234', 'bytes 0-4/10').status_code, 200)
+            with mock.patch.object(uploads, 'submit'):
+                self.assertEqual(self.put_chunk(upload, b'56789', 'bytes 5-9/10').status_code, 200)
+
+    def call_metrics(self):
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        self.user.refresh_from_db()
+        self.assertEqual(self.client.get(f'/api/{self.route("metrics")}', **self.bearer()).status_code, 200)
+
+    def test_every_route_is_exercised(self):
+        names = {pattern.name for pattern in core_urls.urlpatterns}
+        self.assertEqual({name for name in names if hasattr(self, f'call_{name.replace("-", "_")}')}, names)
+
+    def test_routes_stay_within_budget(self):
+        for pattern in core_urls.urlpatterns:
+            with self.subTest(route=pattern.name):
+                getattr(self, f'call_{pattern.name.replace("-", "_")}')()
+
+    def test_exceeding_the_budget_fails(self):
+        self.create_token('valido')
+        with mock.patch.object(VerifyEmailView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.post('verify-email', {'token': 'valido'})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RegisterTests(ApiTestMixin, TransactionTestCase):
+    def test_creates_user_and_queues_verification_email(self):
+        self.assertEqual(self.post('register', REGISTRATION).status_code, 201)
+        self.assertTrue(VerificationToken.objects.filter(identifier='nuevo@example.com').exists())
+        self.assertEqual(EmailOutbox.objects.filter(to='nuevo@example.com', sent_at=None).count(), 1)
+
+    def test_rejects_duplicate_email_ignoring_case(self):
+        self.post('register', REGISTRATION)
+        duplicate = self.post('register', dict(REGISTRATION, email='Nuevo@Example.com'))
+        self.assertEqual(duplicate.status_code, 400)
+        self.assertEqual(duplicate.json(), {'email': ['Este correo electrónico ya está en uso.']})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginTests(ApiTestMixin, TransactionTestCase):
+    def test_email_is_case_insensitive_and_password_is_checked(self):
+        self.assertEqual(self.post('login', {'email': self.user.email, 'password': PASSWORD}).status_code, 200)
+        self.assertEqual(self.post('login', {'email': 'ANA@example.com', 'password': PASSWORD}).status_code, 200)
+        self.assertEqual(self.post('login', {'email': self.user.email, 'password': 'otra'}).status_code, 400)
+
+
+class HashingPoolTests(ApiTestMixin, TransactionTestCase):
+    def use_executor(self, max_workers, max_queue):
+        executor = hashing.BoundedHashingExecutor(max_workers, max_queue)
+        self.addCleanup(executor.shutdown)
+        patcher = mock.patch.object(hashing, '_executor', executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return executor
+
+    def test_saturated_pool_answers_503_with_retry_after(self):
+        executor = self.use_executor(max_workers=1, max_queue=0)
+        release = threading.Event()
+        self.addCleanup(release.set)  # Antes del shutdown: las limpiezas se ejecutan en orden inverso
+        freed = threading.Event()
+        executor.submit(release.wait).add_done_callback(lambda _: freed.set())  # Tras la liberación del hueco
+
+        for name, data in [('register', REGISTRATION), ('login', {'email': self.user.email, 'password': PASSWORD})]:
+            response = self.post(name, data)
+            self.assertEqual(response.status_code, 503, name)
+            self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(User.objects.filter(email=REGISTRATION['email']).exists())
+
+        release.set()
+        self.assertTrue(freed.wait(5))
+        self.assertEqual(self.post('login', {'email': self.user.email, 'password': PASSWORD}).status_code, 200)
+
+    def test_request_context_follows_the_job_into_the_worker(self):
+        executor = self.use_executor(max_workers=1, max_queue=1)
+
+        def read_context():
+            return routers._state.get(), instrumentation.current_stats()
+
+        pin, stats = routers.PinState(pinned=True), instrumentation.RequestStats()
+        token = routers.activate(pin)
+        try:
+            with instrumentation.activate(stats):
+                self.assertEqual(executor.submit(read_context).result(), (pin, stats))
+        finally:
+            routers.deactivate(token)
+        self.assertIn('hash', stats.stages)
+        # El hilo no conserva el contexto de la petición anterior
+        self.assertEqual(executor.submit(read_context).result(), (None, None))
+
+
+class TokenLifecycleTests(ApiTestMixin, TransactionTestCase):
+    def test_refresh_rotates_and_rejects_reuse(self):
+        refresh = str(tokens_for_user(self.user))
+        response = self.post('token-refresh', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()['refresh'], refresh)
+        self.assertEqual(self.post('token-refresh', {'refresh': refresh}).status_code, 401)  # Ya rotado
+        self.client.cookies.clear()
+        self.assertEqual(self.post('token-refresh', {}).status_code, 401)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        tokens = tokens_for_user(self.user)
+        access_token = tokens.access_token
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {access_token}'}
+        profile_url = f'/api/{self.route("profile")}'
+        self.assertEqual(self.client.get(profile_url, **headers).status_code, 200)
+        self.assertEqual(self.post('logout', {'refresh': str(tokens)}, **headers).status_code, 200)
+        self.assertEqual(RevokedToken.objects.filter(jti__in=[tokens['jti'], access_token['jti']]).count(), 2)
+        self.assertEqual(self.client.get(profile_url, **headers).status_code, 401)
+        self.assertEqual(self.post('token-refresh', {'refresh': str(tokens)}).status_code, 401)
+
+
+class VerifyEmailTests(ApiTestMixin, TransactionTestCase):
+    def test_only_the_latest_unused_and_unexpired_token_verifies(self):
+        self.create_token('valido')
+        self.create_token('expirado', expires=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.post('verify-email', {'token': 'valido'}).status_code, 200)
+        self.assertEqual(self.post('verify-email', {'token': 'valido'}).status_code, 400)
+        self.assertEqual(self.post('verify-email', {'token': 'expirado'}).status_code, 400)
+        self.create_token('otro')
+        self.assertEqual(self.post('verify-email', {'token': 'otro'}).status_code, 400)
+
+
+    def test_cached_user_sees_the_verification_immediately(self):
+        from .authentication import get_cached_user
+
+        self.assertEqual(self.client.get(f'/api/{self.route("profile")}', **self.bearer()).status_code, 200)
+        self.assertFalse(get_cached_user(self.user.id).email_verified)  # El perfil lo dejó en caché
+        self.create_token('valido')
+        self.assertEqual(self.post('verify-email', {'token': 'valido'}).status_code, 200)
+        self.assertTrue(get_cached_user(self.user.id).email_verified)
+
+
+class TranslationHistoryTests(ApiTestMixin, TransactionTestCase):
+    def test_pages_newest_first(self):
+        buffer = history.EventBuffer(max_size=100, interval=60, max_pending=100)
+        for label in ('hola', 'gracias', 'adiós'):
+            buffer.add((self.user.id, label, 0.9, 'v1', timezone.now()))
+        self.assertEqual(buffer.flush(), 3)
+
+        headers = self.bearer()
+        first = self.client.get(f'/api/{self.route("translation-history")}?limit=2', **headers).json()
+        self.assertEqual([event['label'] for event in first['results']], ['adiós', 'gracias'])
+        second = self.client.get(first['next'], **headers).json()
+        self.assertEqual([event['label'] for event in second['results']], ['hola'])
+        self.assertIsNone(second['next'])
+
+    def test_copy_keeps_empty_model_version_as_empty_string(self):
+        copied = {}
+
+        def copy_expert(sql, buffer):
+            copied['sql'], copied['rows'] = sql, list(csv.reader(buffer))
+
+        fake = mock.MagicMock(vendor='postgresql')
+        fake.ops.quote_name = connection.ops.quote_name
+        fake.cursor.return_value.__enter__.return_value.cursor = mock.Mock(copy_expert=copy_expert)
+        created_at = timezone.now()
+        with mock.patch.object(history, 'connections', {'default': fake}):
+            history.write_events([(self.user.id, 'hola', 0.9, '', created_at)])
+
+        # COPY ... FORMAT csv lee un campo vacío sin comillas como NULL salvo en FORCE_NOT_NULL
+        self.assertIn('FORCE_NOT_NULL (label, model_version)', copied['sql'])
+        self.assertEqual(copied['rows'], [[str(self.user.id), 'hola', '0.9', '', str(created_at)]])
+
+    @skipUnless(connection.vendor == 'postgresql', "COPY solo existe en PostgreSQL")
+    def test_copy_writes_events_without_model_version(self):
+        history.ensure_partitions(0)
+        history.write_events([(self.user.id, 'hola', 0.9, '', timezone.now())])
+        self.assertEqual(list(TranslationEvent.objects.values_list('model_version', flat=True)), [''])
+
+    @skipUnless(connection.vendor == 'postgresql', "Particiones solo en PostgreSQL")
+    def test_partition_is_created_over_rows_in_the_default_partition(self):
+        month = history.month_start(timezone.now(), 6)  # Más allá de TRANSLATION_PARTITIONS_AHEAD
+        table = TranslationEvent._meta.db_table
+        history.write_events([(self.user.id, 'hola', 0.9, 'v1', month)])
+
+        self.assertEqual(history.ensure_partitions(0, now=month), [history.partition_name(table, month)])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT tableoid::regclass::text FROM {table}')
+            self.assertEqual(cursor.fetchall(), [(history.partition_name(table, month),)])
+
+
+@override_settings(SIGN_EMBEDDING_DIM=8)
+class SignSearchTests(ApiTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(sign_index, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_sees_new_signs_and_validates_input(self):
+        signs = self.create_signs()
+        response = self.post('sign-search', {'embeddings': [signs[1].get_embedding().tolist()], 'k': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([match['name'] for match in response.json()['results'][0]], ['adiós', 'gracias'])
+
+        Sign.objects.create(name='nueva', embedding=np.float32([1] * 8).tobytes())
+        response = self.post('sign-search', {'embeddings': [[1] * 8], 'k': 1})
+        self.assertEqual(response.json()['results'][0][0]['name'], 'nueva')
+        self.assertEqual(self.post('sign-search', {'embeddings': [[1, 2]]}).status_code, 400)
+
+    def test_malformed_embeddings_are_rejected_and_skipped(self):
+        from django.core.exceptions import ValidationError
+
+        with self.assertRaises(ValueError):
+            Sign(name='corta').set_embedding([1, 2])
+        with self.assertRaises(ValidationError):
+            Sign(name='corta', embedding=b'1234').clean()
+
+        signs = self.create_signs()
+        Sign.objects.create(name='mal formada', embedding=b'1234')
+        response = self.post('sign-search', {'embeddings': [[1] * 8], 'k': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('mal formada', [match['name'] for match in response.json()['results'][0]])
+
+        Sign.objects.filter(pk=signs[0].pk).update(embedding=b'')  # Pierde el embedding
+        sign_index.get_index().mark_stale()
+        response = self.post('sign-search', {'embeddings': [[1] * 8], 'k': 5})
+        self.assertEqual([match['name'] for match in response.json()['results'][0]], ['adiós', 'gracias'])
+
+    def test_similar_excludes_the_sign_and_sees_deletions(self):
+        signs = self.create_signs()
+        response = self.client.get(f'/api/signs/{signs[0].id}/similar/?k=1')
+        self.assertEqual(response.json()['results'][0]['name'], 'adiós')
+        signs[1].delete()
+        response = self.client.get(f'/api/signs/{signs[0].id}/similar/?k=5')
+        self.assertEqual([match['name'] for match in response.json()['results']], ['gracias'])
+
+    def test_deletion_and_addition_in_the_same_interval(self):
+        with mock.patch.object(sign_index, '_index', None):
+            signs = self.create_signs()
+            sign = Sign.objects.create(name='nueva')  # Sin embedding: no entra en el índice
+            self.post('sign-search', {'embeddings': [[1] * 8], 'k': 5})  # Primera carga completa
+            signs[1].delete()
+            # Recibe su embedding con un UPDATE masivo que no avanza updated_at
+            sign.set_embedding([0.8, 0.6] + [0] * 6)
+            Sign.objects.filter(pk=sign.pk).update(embedding=sign.embedding, updated_at=timezone.now() - timedelta(hours=1))
+            sign_index.get_index().mark_stale()
+            response = self.post('sign-search', {'embeddings': [[1] * 8], 'k': 5})
+            self.assertEqual([match['name'] for match in response.json()['results'][0]], ['nueva', 'hola', 'gracias'])
+        self.assertEqual(self.client.get(f'/api/signs/{signs[1].id}/similar/').status_code, 404)
+
+
+class TextToSignTests(ApiTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(compositor, '_compositor', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_composes_phrases_and_fingerspells_unknown_words(self):
+        self.create_clip_signs([
+            ('buenos', ''), ('buenos días', 'buen día'), ('casa', 'hogar'), ('letra a', ''), ('letra n', ''),
+        ])
+        response = self.post('sign-compose', {'text': '¡Buenos días! Casas, hogar y Ana'})
+        self.assertEqual(response.status_code, 200)
+        playlist = response.json()['playlist']
+        self.assertEqual(
+            [(item['type'], item['text']) for item in playlist],
+            [('sign', 'buenos dias'), ('sign', 'casas'), ('sign', 'hogar'), ('unknown', 'y'),
+             ('letter', 'a'), ('letter', 'n'), ('letter', 'a')],
+        )
+        self.assertEqual(playlist[0]['clip'], '/api/media/signs/buenos%20d%C3%ADas.mp4')
+
+        self.create_clip_signs([('Ana', '')])
+        response = self.post('sign-compose', {'text': 'buen día, Ana'})
+        self.assertEqual([item['name'] for item in response.json()['playlist']], ['buenos días', 'Ana'])
+
+
+    @override_settings(SIGN_EMBEDDING_DIM=8)
+    def test_clip_only_signs_coexist_with_embedded_signs(self):
+        with mock.patch.object(sign_index, '_index', None):
+            signs = self.create_signs()
+            Sign.objects.filter(pk=signs[0].pk).update(clip='signs/hola.mp4')
+            self.create_clip_signs([('letra a', ''), ('letra n', '')])
+            response = self.post('sign-search', {'embeddings': [[1] * 8], 'k': 5})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results'][0]), 3)
+            self.assertEqual(self.client.get(f'/api/signs/{signs[0].id}/similar/').status_code, 200)
+
+            playlist = self.post('sign-compose', {'text': 'hola Ana'}).json()['playlist']
+            self.assertEqual([item['type'] for item in playlist], ['sign', 'letter', 'letter', 'letter'])
+
+
+class LessonCatalogueTests(ApiTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_lessons()
+
+    def test_list_is_cached_and_revalidated(self):
+        url = f'/api/{self.route("lesson-list")}?limit=2'
+        first = self.client.get(url)
+        self.assertEqual([lesson['slug'] for lesson in first.json()['results']], ['abecedario', 'saludos'])
+        self.assertEqual(self.client.get(first.json()['next']).json()['results'][0]['slug'], 'numeros')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, first.content)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        Lesson.objects.filter(slug='saludos').get().delete()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual([lesson['slug'] for lesson in changed.json()['results']], ['abecedario', 'numeros'])
+
+    def test_detail(self):
+        response = self.client.get('/api/lessons/saludos/')
+        self.assertEqual(response.json()['resources'][0]['kind'], 'video')
+        self.assertEqual(self.client.get('/api/lessons/saludos/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/lessons/otra/').status_code, 404)
+
+    def test_cursor_walks_lessons_that_share_a_position(self):
+        Lesson.objects.all().delete()
+        slugs = [Lesson.objects.create(title=f'L{n}', slug=f'l{n}', position=n // 3).slug for n in range(7)]
+        url = f'/api/{self.route("lesson-list")}?limit=2'
+
+        seen, pages = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(url).json()
+            self.assertFalse(any('OFFSET' in query['sql'].upper() for query in queries.captured_queries))
+            seen += [lesson['slug'] for lesson in page['results']]
+            pages.append(page)
+            url = page['next']
+        self.assertEqual(seen, slugs)
+
+        previous = self.client.get(pages[-1]['previous']).json()
+        self.assertEqual(previous['results'], pages[-2]['results'])
+        self.assertEqual(self.client.get(f'/api/{self.route("lesson-list")}?cursor=roto').status_code, 404)
+
+
+class MediaViewTests(ApiTestMixin, TransactionTestCase):
+    def test_serves_ranges_of_published_files_only(self):
+        url = '/api/media/lessons/clip.mp4'
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            self.create_media_files(root)
+            self.assertEqual(self.client.get(url).status_code, 401)
+            self.client.cookies['access'] = str(tokens_for_user(self.user).access_token)
+
+            full = self.client.get(url)
+            self.assertEqual(full.status_code, 200)
+            self.assertEqual(full['Accept-Ranges'], 'bytes')
+            self.assertEqual(b''.join(full.streaming_content), bytes(range(100)))
+
+            partial = self.client.get(url, HTTP_RANGE='bytes=10-19')
+            self.assertEqual(partial.status_code, 206)
+            self.assertEqual(partial['Content-Range'], 'bytes 10-19/100')
+            self.assertEqual(b''.join(partial.streaming_content), bytes(range(10, 20)))
+            self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-5').streaming_content), bytes(range(95, 100)))
+            self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=100-').status_code, 416)
+
+            self.assertEqual(self.client.get('/api/media/lessons/privado.mp4').status_code, 404)
+            with override_settings(MEDIA_X_ACCEL_PREFIX='/protegido/'):
+                delegated = self.client.get(url, HTTP_RANGE='bytes=10-19')
+                self.assertEqual(delegated['X-Accel-Redirect'], '/protegido/lessons/clip.mp4')
+
+
+class UploadViewTests(ApiTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        settings_override = override_settings(UPLOAD_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_create_requires_authentication(self):
+        response = self.post('upload-list', {'filename': 'clip.gif', 'kind': 'images', 'size': 10}, **self.bearer())
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(os.path.exists(uploads.source_path(response.json()['id'])))
+        self.assertEqual(self.client.post(f'/api/{self.route("upload-list")}').status_code, 401)
+
+    def test_chunks_are_appended_in_order(self):
+        upload = uploads.create_upload(self.user.id, 'clip.bin', 'images', 10)
+        self.assertEqual(self.put_chunk(upload, b'01234', 'bytes 0-4/10').json()['received'], 5)
+        self.assertEqual(self.put_chunk(upload, b'01234', 'bytes 0-4/10').status_code, 409)  # Parte repetida
+        self.assertEqual(self.put_chunk(upload, b'567', 'bytes 5-9/10').status_code, 400)  # Cuerpo incompleto
+        self.assertEqual(self.client.get(f'/api/uploads/{upload.id}/', **self.bearer()).json()['received'], 5)
+        with mock.patch.object(uploads, 'submit') as submit:
+            self.assertEqual(self.put_chunk(upload, b'56789', 'bytes 5-9/10').json()['status'], 'processing')
+        submit.assert_called_once_with(upload.id, 'images')
+        with open(uploads.source_path(upload.id), 'rb') as fh:
+            self.assertEqual(fh.read(), b'0123456789')
+
+    def write_chunk(self, upload, body, content_range):
+        request = RequestFactory().put('/', body, content_type='application/octet-stream', HTTP_CONTENT_RANGE=content_range)
+        return uploads.write_chunk(upload, request)
+
+    def assertChunkError(self, status, upload, body, content_range):
+        with self.assertRaises(uploads.ChunkError) as error:
+            self.write_chunk(upload, body, content_range)
+        self.assertEqual(error.exception.status, status)
+
+    @override_settings(UPLOAD_MAX_CHUNK=8)
+    def test_write_chunk_checks_the_offset_and_concurrent_writers(self):
+        upload = uploads.create_upload(self.user.id, 'clip.bin', 'images', 10)
+        self.assertChunkError(400, upload, b'01234', 'bytes 0-4/11')  # Otro tamaño total
+        self.assertChunkError(413, upload, b'0123456789', 'bytes 0-9/10')
+        self.assertChunkError(409, upload, b'56789', 'bytes 5-9/10')  # Hueco: aún no hay nada recibido
+
+        stale = Upload.objects.get(id=upload.id)
+        self.assertEqual(self.write_chunk(upload, b'01234', 'bytes 0-4/10').received, 5)
+        # Otra petición leyó la subida antes del avance: el UPDATE condicional la rechaza
+        self.assertChunkError(409, stale, b'01234', 'bytes 0-4/10')
+        self.assertEqual(Upload.objects.get(id=upload.id).received, 5)
+
+    def test_rolled_back_upload_leaves_no_directory(self):
+        with mock.patch('core.views._upload_payload', side_effect=RuntimeError('fallo tras el INSERT')):
+            with self.assertRaises(RuntimeError):
+                self.post('upload-list', {'filename': 'clip.gif', 'kind': 'images', 'size': 10}, **self.bearer())
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(os.listdir(self.root), [])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTests(SimpleTestCase):
+    router = routers.ReplicaRouter()
+
+    def read_with(self, state):
+        token = routers.activate(state)
+        try:
+            return self.router.db_for_read(User)
+        finally:
+            routers.deactivate(token)
+
+    def test_reads_go_to_a_replica(self):
+        self.assertIn(self.router.db_for_read(User), ['replica_1', 'replica_2'])
+        self.assertIn(self.read_with(routers.PinState()), ['replica_1', 'replica_2'])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_go_to_primary_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_pinned_session_reads_from_primary(self):
+        self.assertEqual(self.read_with(routers.PinState(pinned=True)), 'default')
+
+    def test_write_pins_the_rest_of_the_request(self):
+        state = routers.PinState()
+        token = routers.activate(state)
+        try:
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        finally:
+            routers.deactivate(token)
+
+    def test_middleware_sets_pin_cookie_after_a_write(self):
+        def view(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().post('/'))
+        self.assertIn('db_pin', response.cookies)
+        response = ReplicaPinningMiddleware(lambda request: HttpResponse())(RequestFactory().get('/'))
+        self.assertNotIn('db_pin', response.cookies)
+
+
+class ThrottlingTests(SimpleTestCase):
+    def test_sliding_window_counter(self):
+        backend = throttling.LocalBackend()
+        for _ in range(3):
+            self.assertIsNone(backend.hit('k', 3, 60, now=600))
+        self.assertEqual(backend.hit('k', 3, 60, now=630), 30)
+        # En la ventana siguiente los intentos anteriores pesan según el solapamiento
+        self.assertIsNone(backend.hit('k', 3, 60, now=661))
+        self.assertIsNotNone(backend.hit('k', 3, 60, now=662))
+        self.assertIsNone(backend.hit('k', 3, 60, now=715))
+
+    @override_settings(THROTTLE_LOCAL_MAX_KEYS=10)
+    def test_spraying_keys_does_not_reset_other_limits(self):
+        backend = throttling.LocalBackend()
+        for _ in range(3):
+            backend.hit('login:ana', 3, 60, now=600)
+        for i in range(9):  # Otras claves hasta llenar el diccionario; 'login:ana' sigue siendo reciente
+            backend.hit(f'login:{i}', 3, 60, now=601)
+            self.assertIsNotNone(backend.hit('login:ana', 3, 60, now=601))
+        self.assertEqual(len(backend._counters), 10)
+        backend.hit('login:otra', 3, 60, now=602)  # Descarta la clave menos reciente, no todas
+        self.assertNotIn('login:0', backend._counters)
+        self.assertIsNotNone(backend.hit('login:ana', 3, 60, now=602))
+
+    def test_cache_backend_survives_the_key_expiring_before_incr(self):
+        backend = throttling.CacheBackend()
+        backend.cache.clear()
+        # add falla porque la clave existe, pero expira antes del incr
+        with mock.patch.object(backend.cache, 'incr', side_effect=ValueError):
+            with mock.patch.object(backend.cache, 'add', side_effect=[False, True]) as add:
+                self.assertIsNone(backend.hit('k', 3, 60, now=600))
+        self.assertEqual(add.call_count, 2)
+        with mock.patch.object(backend.cache, 'aincr', side_effect=ValueError):
+            with mock.patch.object(backend.cache, 'aadd', side_effect=[False, True]) as aadd:
+                self.assertIsNone(asyncio.run(backend.ahit('k', 3, 60, now=600)))
+        self.assertEqual(aadd.call_count, 2)
+
+    @override_settings(AUTH_THROTTLE_RATES={'login_email': '0/min'})
+    def test_rejects_before_touching_the_database(self):
+        response = self.client.post('/api/auth/login/', {'email': 'a@example.com', 'password': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class StreamingTests(SimpleTestCase):
+    def frames(self, seqs):
+        frames = np.zeros(len(seqs), dtype=streaming.frame_dtype(4))
+        frames['seq'] = seqs
+        frames['keypoints'] = np.arange(4, dtype=np.float32)
+        return frames
+
+    def test_sliding_window_emits_every_stride_and_drops_stale_frames(self):
+        window = streaming.SlidingWindow(size=3, features=4, stride=2)
+        self.assertFalse(window.push(self.frames([0, 1])))
+        self.assertTrue(window.push(self.frames([2])))
+        self.assertFalse(window.push(self.frames([1, 2])))  # Repetidos o desordenados
+        self.assertFalse(window.push(self.frames([3])))
+        self.assertTrue(window.push(self.frames([4])))
+        self.assertEqual(window.last_seq, 4)
+
+    @override_settings(
+        RECOGNITION_FEATURES=4, RECOGNITION_WINDOW=3, RECOGNITION_STRIDE=3, TRANSLATION_HISTORY_ENABLED=False,
+    )
+    def test_websocket_classifies_binary_frames(self):
+        token = str(tokens_for_user(User(id=1, email='ana@example.com')).access_token)
+        scope = {'type': 'websocket', 'path': streaming.PATH, 'query_string': f'token={token}'.encode()}
+        sent = []
+
+        async def run():
+            inbox = asyncio.Queue()
+            await inbox.put({'type': 'websocket.connect'})
+            await inbox.put({'type': 'websocket.receive', 'bytes': self.frames([0, 1, 2]).tobytes()})
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'websocket.send':
+                    await inbox.put({'type': 'websocket.disconnect'})
+
+            with mock.patch('core.classifiers._classifier', None):
+                await asyncio.wait_for(streaming.websocket_application(scope, inbox.get, send), timeout=5)
+
+        asyncio.run(run())
+        self.assertEqual(sent[0]['type'], 'websocket.accept')
+        result = json.loads(sent[1]['text'])
+        self.assertEqual(result['seq'], 2)
+        self.assertEqual(result['model'], 'stub')
+
+    @override_settings(
+        RECOGNITION_FEATURES=4, RECOGNITION_WINDOW=3, TRANSLATION_HISTORY_ENABLED=False, RECOGNITION_CACHE_SIZE=0,
+    )
+    def test_batcher_recovers_after_classifier_errors(self):
+        class Stream:
+            user_id = 1
+
+            def __init__(self):
+                self.results = []
+
+            def deliver(self, result):
+                self.results.append(result)
+
+        stream = Stream()
+        window = np.ones((3, 4), dtype=np.float32)
+        stub = classifiers.StubClassifier()
+
+        async def wait_for_results(count):
+            while len(stream.results) < count:
+                await asyncio.sleep(0.01)
+
+        async def run():
+            batcher = streaming.get_batcher()
+            with mock.patch.object(streaming, 'get_classifier', side_effect=[RuntimeError('modelo'), stub]):
+                batcher.submit(stream, window, 1)
+                await wait_for_results(1)
+                batcher.submit(stream, window, 2)
+                await wait_for_results(2)
+            self.assertIs(streaming.get_batcher(), batcher)
+
+            batcher._task.cancel()
+            await asyncio.sleep(0)
+            self.assertIsNot(streaming.get_batcher(), batcher)
+            streaming.get_batcher()._task.cancel()
+
+        with mock.patch.object(streaming, '_batcher', None), self.assertLogs('core.streaming', 'ERROR'):
+            asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertEqual(stream.results[0], {'seq': 1, 'error': 'No se pudo clasificar la ventana.'})
+        self.assertEqual(stream.results[1]['model'], 'stub')
+
+    def test_websocket_rejects_missing_token(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        asyncio.run(streaming.websocket_application({'type': 'websocket', 'path': streaming.PATH}, receive, send))
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': streaming.CLOSE_UNAUTHORIZED}])
+
+
+class StreamingRevocationTests(TransactionTestCase):
+    def test_revoked_token_is_rejected(self):
+        access = tokens_for_user(User(id=1, email='ana@example.com')).access_token
+        revocation.get_store().revoke(access['jti'], access['exp'])
+        scope = {'type': 'websocket', 'path': streaming.PATH, 'query_string': f'token={access}'.encode()}
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        asyncio.run(streaming.websocket_application(scope, receive, send))
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': streaming.CLOSE_UNAUTHORIZED}])
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def register(self, registry, version, classes):
+        arrays = {'weights': np.ones((4, classes), dtype=np.float32), 'bias': np.arange(classes, dtype=np.float32)}
+        registry.register(version, arrays, {'labels': [f'{version}-{i}' for i in range(classes)]})
+
+    def test_loads_memory_mapped_weights_and_hot_swaps(self):
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root, check_interval=0)
+            self.assertIsNone(registry.current())
+
+            self.register(registry, 'v1', classes=2)
+            first = registry.current()
+            self.assertIsInstance(first.arrays['weights'], np.memmap)
+            self.assertIs(registry.current(), first)
+
+            self.register(registry, 'v2', classes=3)
+            with override_settings(RECOGNITION_MODEL_DIR=root, RECOGNITION_MODEL_CHECK_INTERVAL=0):
+                classifier = classifiers.get_classifier()
+                self.assertEqual(classifier.version, 'v2')
+                indices, _ = classifier.predict(np.zeros((1, 3, 4), dtype=np.float32))
+                self.assertEqual(classifier.labels[indices[0]], 'v2-2')
+
+                registry.activate('v1')
+                self.assertEqual(classifiers.get_classifier().version, 'v1')
+
+
+class MetricsTests(ApiTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        patcher = mock.patch.object(metrics, 'registry', metrics.MetricsRegistry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_worker(self, pid, value):
+        with open(os.path.join(self.root, f'{metrics.FILE_PREFIX}{pid}.json'), 'w') as fh:
+            json.dump([['core_db_queries', [['view', 'login']], [0, value] + [0] * 9 + [value]]], fh)
+
+    def test_collect_merges_live_workers_and_removes_dead_ones(self):
+        dead = subprocess.Popen(['true'])
+        dead.wait()
+        metrics.registry.observe('core_db_queries', 1, view='login')
+        self.write_worker(os.getppid(), 1)
+        self.write_worker(dead.pid, 5)
+
+        with override_settings(METRICS_DIR=self.root):
+            total = metrics.collect()
+        series = total[('core_db_queries', (('view', 'login'),))]
+        self.assertEqual((series[1], series[-1]), (2, 2))  # Este proceso + el worker vivo
+        self.assertEqual(os.listdir(self.root), [f'{metrics.FILE_PREFIX}{os.getppid()}.json'])
+        self.assertIn('core_db_queries_count{view="login"} 2', metrics.render_prometheus(total))
+
+    def test_metrics_require_the_token_or_staff(self):
+        url = f'/api/{self.route("metrics")}'
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, **self.bearer()).status_code, 403)
+        with override_settings(METRICS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        self.user.refresh_from_db()
+        self.assertEqual(self.client.get(url, **self.bearer()).status_code, 200)
+
+    def test_requests_report_server_timing(self):
+        response = self.post('login', {'email': self.user.email, 'password': PASSWORD})
+        timings = dict(item.split(';', 1) for item in response['Server-Timing'].split(', '))
+        self.assertEqual(list(timings)[0], 'db')
+        self.assertRegex(timings['db'], r'^dur=\d+\.\d{2};desc="[1-9]\d* queries"$')
+        self.assertIn('hash', timings)
+        self.assertRegex(timings['total'], r'^dur=\d+\.\d{2}$')
+        self.assertIn(('core_request_duration_seconds', (('view', 'login'),)), metrics.registry.snapshot())
+
+
+class RecognitionCacheTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.windows = rng.standard_normal((3, 5, 4)).astype(np.float32)
+        self.classifier = classifiers.LinearClassifier(
+            rng.standard_normal((4, 6)).astype(np.float32), np.zeros(6, dtype=np.float32), range(6), version='v1',
+        )
+        self.inferred = []
+        predict = self.classifier.predict
+        self.classifier.predict = lambda windows: self.inferred.append(len(windows)) or predict(windows)
+
+    def test_repeated_windows_skip_inference(self):
+        cache = recognition_cache.RecognitionCache(maxsize=100, ttl=60, quantum=0.05)
+        # La 4ª ventana repite la 1ª con ruido por debajo del paso de cuantización
+        batch = np.concatenate([self.windows, self.windows[:1] + 1e-4])
+        indices, confidences = cache.predict(self.classifier, batch)
+        expected = classifiers.LinearClassifier.predict(self.classifier, classifiers.normalize_windows(batch))
+        np.testing.assert_array_equal(indices, expected[0])
+        np.testing.assert_allclose(confidences[:3], expected[1][:3], rtol=1e-6)
+        self.assertEqual(self.inferred, [3])
+
+        cache.predict(self.classifier, self.windows[::-1] * 2 + 1)  # La normalización absorbe escala y posición
+        self.assertEqual(self.inferred, [3])
+        self.assertEqual(cache.hits, {'local': 4, 'shared': 0, 'miss': 3})
+        self.assertIn(
+            'core_recognition_cache_lookups_total{result="local"}', metrics.render_prometheus(metrics.registry.snapshot()),
+        )
+
+        self.classifier.version = 'v2'  # Otro modelo: las entradas anteriores no sirven
+        cache.predict(self.classifier, self.windows)
+        self.assertEqual(self.inferred, [3, 3])
+        self.assertEqual(len(cache.local), 3)
+
+    def test_shared_tier_is_used_across_workers(self):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        shared = LocMemCache('recognition-tests', {})
+        first = recognition_cache.RecognitionCache(maxsize=100, ttl=60, quantum=0.05, shared=shared)
+        second = recognition_cache.RecognitionCache(maxsize=100, ttl=60, quantum=0.05, shared=shared)
+        first.predict(self.classifier, self.windows)
+        second.predict(self.classifier, self.windows)
+        self.assertEqual(self.inferred, [3])
+        self.assertEqual(second.hits['shared'], 3)
+        self.assertEqual(second.hit_rate(), 1.0)
+
+
+class CompositorTests(SimpleTestCase):
+    def test_longest_match_and_fingerspelling(self):
+        composer = compositor.SignCompositor(letter_prefix='letra ')
+        composer.build([
+            (1, 'calle', 'calles', 'signs/calle.mp4'), (2, 'letra c', '', 'signs/c.mp4'),
+            (3, 'letra a', '', 'signs/a.mp4'), (4, 'letra l', '', 'signs/l.mp4'), (5, 'letra ll', '', 'signs/ll.mp4'),
+            (6, 'luz', '', 'signs/luz.mp4'),
+        ])
+        composer.mark_stale = composer.refresh = lambda: None  # Sin base de datos
+        playlist = composer.compose('Luces en la calle Calla')
+        self.assertEqual(
+            [(item['type'], item['text']) for item in playlist],
+            [('sign', 'luces'), ('unknown', 'e'), ('unknown', 'n'), ('letter', 'l'), ('letter', 'a'),
+             ('sign', 'calle'), ('letter', 'c'), ('letter', 'a'), ('letter', 'll'), ('letter', 'a')],
+        )
+        self.assertIs(composer.compose('luces en la CALLE, calla.'), playlist)
+
+
+class SignIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.vectors = rng.standard_normal((4000, 32)).astype(np.float32)
+        self.ids = np.arange(1, 4001)
+        self.names = [f'seña_{i}' for i in self.ids]
+        self.queries = self.vectors[:200] + 0.05 * rng.standard_normal((200, 32)).astype(np.float32)
+
+    def test_exact_search_finds_the_nearest_sign(self):
+        index = sign_index.SignIndex(32)
+        index.replace(self.ids, self.vectors, self.names)
+        top = [matches[0][0] for matches in index.search(self.queries, k=3)]
+        self.assertEqual(top, list(self.ids[:200]))
+
+    def test_ivf_search_keeps_recall_and_accepts_incremental_updates(self):
+        index = sign_index.SignIndex(32, ivf_min=1000, nprobe=8)
+        index.replace(self.ids, self.vectors, self.names)
+        top = np.array([matches[0][0] for matches in index.search(self.queries, k=1)])
+        self.assertGreaterEqual((top == self.ids[:200]).mean(), 0.9)
+
+        index.upsert([9999, 1], [self.vectors[0], -self.vectors[0]], ['copia', 'seña_1'])
+        matches = index.search(self.vectors[0], k=2)[0]
+        self.assertEqual(matches[0][:2], (9999, 'copia'))
+        self.assertNotIn(1, [sign_id for sign_id, _, _ in matches])
+        self.assertEqual(len(index), 4001)
+
+        index.remove({9999, 1})
+        self.assertEqual(len(index), 3999)
+        self.assertNotIn(9999, [sign_id for sign_id, _, _ in index.search(self.vectors[0], k=5)[0]])
+        self.assertEqual(index.search(self.vectors[2], k=1)[0][0][0], self.ids[2])
+
+
+class FrameExtractionTests(SimpleTestCase):
+    def test_animated_image_is_normalized_into_frames_and_thumbnail(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, 'clip.gif')
+            images = [Image.new('RGB', (64, 32), color) for color in ('red', 'green', 'blue')]
+            images[0].save(source, save_all=True, append_images=images[1:])
+
+            output = os.path.join(root, 'frames')
+            self.assertEqual(frames.extract_frames(source, output, 'images', size=16, thumbnail_size=8), 3)
+            stack = np.load(os.path.join(output, 'frames.npy'))
+            self.assertEqual(stack.shape, (3, 16, 16, 3))
+            with Image.open(os.path.join(output, 'thumbnail.jpg')) as thumbnail:
+                self.assertLessEqual(max(thumbnail.size), 8)
+
+            with open(source, 'wb') as fh:
+                fh.write(b'no es una imagen')
+            with self.assertRaises(frames.UnsupportedMedia):
+                frames.extract_frames(source, output, 'images')
+
+
+@override_settings(PASSWORD_HASHERS=['core.hashers.PBKDF2PasswordHasher'], PASSWORD_PBKDF2_ITERATIONS=1000)
+class RehashTests(TestCase):
+    def test_password_rehashed_when_cost_changes(self):
+        user = User.objects.create_user(username='rehash', email='rehash@example.com', password='clave')
+        self.assertIn('$1000$', user.password)
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertTrue(user.check_password('clave'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_legacy_security_answer_rehashed_on_check(self):
+        user = User.objects.create_user(username='legacy', email='legacy@example.com', password='clave')
+        user.security_answer_1 = hashlib.sha256(b'uno').hexdigest()
+        user.save()
+
+        self.assertFalse(user.check_security_answer(1, 'dos'))
+        self.assertTrue(user.check_security_answer(1, 'uno'))
+        user.refresh_from_db()
+        self.assertTrue(user.security_answer_1.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_security_answer(1, 'uno'))
+        self.assertFalse(user.check_security_answer(2, 'uno'))  # Sin respuesta guardada
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkUsersTests(TestCase):
+    def test_import_reports_rejected_rows_and_export_streams(self):
+        User.objects.create_user(username='existe', email='Existe@example.com', password='clave')
+        source = io.StringIO(
+            'email,name,password,role,is_deaf,security_answer_1\n'
+            'ana@example.com,Ana,clave-ana,user,sí,perro\n'
+            'no-es-un-email,X,clave,user,,\n'
+            'existe@example.com,Dup,clave,user,,\n'
+            'ANA@example.com,Otra,clave,user,,\n'
+            'luis@example.com,Luis,,user,,\n'
+            'eva@example.com,Eva,clave-eva,admin,0,\n'
+        )
+        errors = []
+        created, rejected = bulk_users.import_users(
+            source, 'csv', batch_size=2, workers=0, on_error=lambda *error: errors.append(error),
+        )
+
+        self.assertEqual((created, rejected), (2, 4))
+        self.assertEqual(sorted(line for line, _, _ in errors), [3, 4, 5, 6])
+        ana = User.objects.get(email='ana@example.com')
+        self.assertEqual((ana.username, ana.is_deaf, ana.email_verified), ('ana@example.com', True, False))
+        self.assertTrue(ana.check_password('clave-ana'))
+        self.assertTrue(ana.check_security_answer(1, 'perro'))
+        self.assertEqual(User.objects.get(email='eva@example.com').role, 'admin')
+
+        exported = [json.loads(line) for line in bulk_users.export_lines('ndjson', chunk_size=2)]
+        self.assertEqual([row['email'] for row in exported], ['Existe@example.com', 'ana@example.com', 'eva@example.com'])
+        self.assertNotIn('password', exported[0])
+
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='clave')
+        self.client.force_login(admin_user)
+        response = self.client.get('/admin/core/user/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], ','.join(bulk_users.EXPORT_FIELDS))
+        self.assertEqual(len(lines), 5)
+
+    def test_import_command_reads_stdin_without_closing_it(self):
+        stdin = io.StringIO('email,password\nana@example.com,clave-ana\n')
+        out = io.StringIO()
+        with mock.patch('sys.stdin', stdin):
+            call_command('import_users', '-', '--workers', '0', stdout=out)
+        self.assertFalse(stdin.closed)
+        self.assertIn('Usuarios creados: 1', out.getvalue())
+        self.assertTrue(User.objects.filter(email='ana@example.com').exists())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UserAdminTests(TestCase):
+    def test_keyset_pages_filters_and_prefix_search(self):
+        admin_user = User.objects.create_superuser(username='root', email='root@example.com', password='clave')
+        users = [
+            User.objects.create_user(username=f'u{i}', email=f'alumno{i}@example.com', password='x', is_deaf=i % 2 == 0)
+            for i in range(5)
+        ]
+        self.client.force_login(admin_user)
+
+        with mock.patch.object(UserAdmin, 'list_per_page', 2):
+            cl = self.client.get('/admin/core/user/').context['cl']
+            self.assertEqual([user.pk for user in cl.result_list], [users[4].pk, users[3].pk])
+            self.assertEqual(cl.result_count, 6)
+            self.assertIsNone(cl.first_url)
+
+            second = self.client.get('/admin/core/user/' + cl.next_url).context['cl']
+            self.assertEqual([user.pk for user in second.result_list], [users[2].pk, users[1].pk])
+            self.assertEqual(second.first_url, '?')
+
+            deaf = self.client.get('/admin/core/user/', {'is_deaf__exact': '1', 'after': users[4].pk}).context['cl']
+            self.assertEqual([user.pk for user in deaf.result_list], [users[2].pk, users[0].pk])
+            self.assertIsNone(deaf.next_url)
+
+        found = self.client.get('/admin/core/user/', {'q': 'ALUMNO3'}).context['cl']
+        self.assertEqual([user.pk for user in found.result_list], [users[3].pk])
+        self.assertEqual(self.client.get('/admin/core/user/', {'q': 'lumno'}).context['cl'].result_count, 0)
+
+
+class MaintenanceTests(TestCase):
+    def create_tokens(self, prefix, count, expires, is_used=False):
+        VerificationToken.objects.bulk_create(
+            VerificationToken(identifier='ana@example.com', token=f'{prefix}{n}', expires=expires, is_used=is_used)
+            for n in range(count)
+        )
+
+    def test_purge_deletes_only_expired_or_used_tokens_in_batches(self):
+        now = timezone.now()
+        self.create_tokens('expirado', 5, now - timedelta(hours=1))
+        self.create_tokens('usado', 4, now + timedelta(hours=1), is_used=True)
+        self.create_tokens('ambos', 1, now - timedelta(hours=1), is_used=True)
+        self.create_tokens('valido', 3, now + timedelta(hours=1))
+
+        with mock.patch.object(maintenance, '_delete_batch', wraps=maintenance._delete_batch) as delete_batch:
+            self.assertEqual(maintenance.purge_verification_tokens(batch_size=2, max_batches=2, now=now), 4)
+            self.assertEqual(delete_batch.call_count, 2)
+            # Expirados: 2 más un lote vacío; usados: 2 + 2 más un lote vacío
+            self.assertEqual(maintenance.purge_verification_tokens(batch_size=2, now=now), 6)
+            self.assertEqual(delete_batch.call_count, 7)
+        self.assertEqual(sorted(VerificationToken.objects.values_list('token', flat=True)), ['valido0', 'valido1', 'valido2'])
+
+    @override_settings(VERIFICATION_TOKEN_PURGE_INTERVAL=60, EMAIL_OUTBOX_INTERVAL=10, TRANSLATION_MAINTENANCE_INTERVAL=3600)
+    def test_periodic_tasks_start_only_from_the_server_entry_point(self):
+        names = {'purge-verification-tokens', 'send-outbox', 'prune-translation-events', 'sync-revocations', 'prune-revoked-tokens'}
+        self.assertFalse(names & set(scheduler._tasks))  # django.setup() no inicia ninguna
+        with mock.patch.object(scheduler, 'schedule') as schedule:
+            scheduler.start_background_tasks()
+        self.assertEqual({call.args[0] for call in schedule.call_args_list}, names)
+
+    def test_purge_command(self):
+        self.create_tokens('expirado', 3, timezone.now() - timedelta(hours=1))
+        self.create_tokens('valido', 1, timezone.now() + timedelta(hours=1))
+        out = io.StringIO()
+        call_command('purge_verification_tokens', '--batch-size', '2', stdout=out)
+        self.assertIn('Tokens eliminados: 3', out.getvalue())
+        self.assertEqual(list(VerificationToken.objects.values_list('token', flat=True)), ['valido0'])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BenchAuthTests(TransactionTestCase):
+    command = 'core.management.commands.bench_auth'
+
+    def setUp(self):
+        # La prueba ya corre sobre una base de datos de pruebas: el comando la reutiliza
+        for name in ('setup_test_environment', 'teardown_test_environment', 'teardown_databases'):
+            patcher = mock.patch(f'{self.command}.{name}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch(f'{self.command}.setup_databases', return_value=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(connection.settings_dict['TEST'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_runs_a_tiny_scenario_and_compares_results(self):
+        with tempfile.TemporaryDirectory() as root:
+            output = os.path.join(root, 'bench.json')
+            for mode in ('asgi', 'wsgi'):
+                out = io.StringIO()
+                call_command(
+                    'bench_auth', '--endpoints', 'login,verify-email', '--requests', '2', '--concurrency', '1',
+                    '--mode', mode, '--output', output, stdout=out,
+                )
+                with open(output) as fh:
+                    report = json.load(fh)
+                self.assertEqual(report['mode'], mode)
+                self.assertEqual(sorted(report['results']), ['login', 'verify-email'])
+                for result in report['results'].values():
+                    self.assertEqual((result['requests'], result['errors']), (2, 0))
+                    self.assertIsNotNone(result['queries_per_request'])
+
+            out = io.StringIO()
+            call_command(
+                'bench_auth', '--endpoints', 'login', '--requests', '2', '--concurrency', '1',
+                '--compare', output, '--threshold', '1000', stdout=out,
+            )
+            self.assertIn('Sin regresiones', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('bench_auth', '--endpoints', 'logout')
+
+
+class RevocationTests(SimpleTestCase):
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = revocation.BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'otro-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_buckets_are_dropped_after_expiry(self):
+        store = revocation.RevocationStore(bucket_seconds=60, capacity=100, error_rate=0.01)
+        store._add_local('a', 1000)
+        store._add_local('b', 1100)
+        self.assertTrue(store.might_be_revoked('a', 1000))
+        self.assertFalse(store.might_be_revoked('a', 1100))  # Solo se mira el intervalo de su exp
+        store.expire(now=1090)
+        self.assertEqual(len(store), 1)
+        self.assertFalse(store.might_be_revoked('a', 1000))
+        self.assertTrue(store.might_be_revoked('b', 1100))
+
+
+class FastJSONTests(SimpleTestCase):
+    def test_lean_serializers_render_like_drf(self):
+        from rest_framework.renderers import JSONRenderer
+
+        now = timezone.now()
+        event = TranslationEvent(id=1, label='hola', confidence=0.875, model_version='v1', created_at=now)
+        user = User(id=2, email='á@example.com', name='Ñandú', role='user', date_joined=now)
+        renderer = fastjson.FastJSONRenderer()
+        for drf_data, lean_data in (
+            (TranslationEventSerializer(event).data, TranslationEventValuesSerializer.to_representation(event)),
+            (UserReadSerializer(user).data, UserValuesSerializer.to_representation(user)),
+        ):
+            self.assertEqual(json.loads(renderer.render(lean_data)), json.loads(JSONRenderer().render(drf_data)))
+
+    def test_parser_rejects_invalid_json(self):
+        from rest_framework.exceptions import ParseError
+
+        parser = fastjson.FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"a": [1, "ñ"]}'.encode())), {'a': [1, 'ñ']})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+
+class EmailOutboxTests(TransactionTestCase):
+    def test_sends_pending_rows_once_and_backs_off_on_failure(self):
+        for i in range(3):
+            outbox.enqueue(f'user{i}@example.com', 'Asunto', 'Cuerpo')
+
+        self.assertEqual(outbox.send_pending(batch_size=2), 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{i}@example.com' for i in range(3)])
+        self.assertFalse(EmailOutbox.objects.filter(sent_at=None).exists())
+        self.assertEqual(outbox.send_pending(), 0)
+
+        row = outbox.enqueue('falla@example.com', 'Asunto', 'Cuerpo')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')):
+            self.assertEqual(outbox.send_pending(), 0)
+        row.refresh_from_db()
+        self.assertEqual((row.attempts, row.last_error, row.sent_at), (1, 'SMTP caído', None))
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.send_pending(), 0)  # Aún no toca reintentar
+        self.assertEqual(outbox.send_pending(now=row.next_attempt_at), 1)
+
+    def test_sends_outside_the_claim_transaction(self):
+        row = outbox.enqueue('nuevo@example.com', 'Asunto', 'Cuerpo')
+        during = {}
+
+        def send_messages(messages):
+            during['atomic'] = connection.in_atomic_block
+            during['pending'] = outbox._pending(timezone.now()).exists()
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(outbox.send_pending(), 1)
+        self.assertEqual(during, {'atomic': False, 'pending': False})  # Sin bloqueos y ya reservada
+        row.refresh_from_db()
+        self.assertEqual(row.attempts, 1)
+        self.assertIsNotNone(row.sent_at)
+
+    def test_lease_expires_when_a_worker_dies(self):
+        row = outbox.enqueue('nuevo@example.com', 'Asunto', 'Cuerpo')
+        now = timezone.now()
+        self.assertEqual(len(outbox._claim(10, now)), 1)  # El proceso muere sin registrar el envío
+        self.assertEqual(outbox.send_pending(now=now), 0)
+        self.assertEqual(outbox.send_pending(now=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE + 1)), 1)
+        row.refresh_from_db()
+        self.assertEqual((row.attempts, len(mail.outbox)), (2, 1))
+
+    def test_each_batch_is_leased_from_the_time_it_is_claimed(self):
+        for i in range(2):
+            outbox.enqueue(f'user{i}@example.com', 'Asunto', 'Cuerpo')
+        clock = [timezone.now()]
+        leases = []
+
+        def send_messages(messages):
+            leases.append(EmailOutbox.objects.get(to=messages[0].to[0]).next_attempt_at - clock[0])
+            clock[0] += timedelta(seconds=settings.EMAIL_OUTBOX_LEASE + 60)  # Un envío muy lento
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            with mock.patch.object(outbox.timezone, 'now', side_effect=lambda: clock[0]):
+                self.assertEqual(outbox.send_pending(batch_size=1), 2)
+        # El segundo lote no nace con la concesión ya vencida
+        self.assertEqual(leases, [timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)] * 2)
@@ -0,0 +1,144 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Convierte una tasa ``"20/min"`` en ``(20, 60)``, igual que los throttles de DRF.
+    """
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def _estimate(previous, current, elapsed, window):
+    """
+    Contador de ventana deslizante: la ventana anterior pesa en proporción al tramo
+    que aún se solapa con la ventana deslizante actual.
+    """
+    return previous * (1 - elapsed / window) + current
+
+
+class LocalBackend:
+    """
+    Contadores en memoria del proceso. Sustituto local (desarrollo, tests o un solo worker).
+    Por encima de ``THROTTLE_LOCAL_MAX_KEYS`` se descartan las claves usadas hace más tiempo,
+    no todas: llenar el diccionario con claves aleatorias no reinicia los límites de los demás.
+    """
+
+    def __init__(self):
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now=None):
+        """
+        Registra un intento; devuelve ``None`` si se permite o los segundos a esperar.
+        """
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            current_index, current, previous = self._counters.get(key, (index, 0, 0))
+            if current_index != index:
+                previous = current if current_index == index - 1 else 0
+                current = 0
+            blocked = _estimate(previous, current, elapsed, window) >= limit
+            self._counters[key] = (index, current if blocked else current + 1, previous)
+            self._counters.move_to_end(key)
+            while len(self._counters) > settings.THROTTLE_LOCAL_MAX_KEYS:
+                self._counters.popitem(last=False)
+        return max(1, math.ceil(window - elapsed)) if blocked else None
+
+    async def ahit(self, key, limit, window, now=None):
+        return self.hit(key, limit, window, now)
+
+
+class CacheBackend:
+    """
+    Contadores en la caché de Django (``THROTTLE_CACHE``). Con Redis o Memcached los
+    comparten todos los workers; cada intento cuesta una lectura múltiple y un incremento.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE]
+
+    def _keys(self, key, window, now):
+        index, elapsed = divmod(now, window)
+        return f'throttle:{key}:{int(index)}', f'throttle:{key}:{int(index) - 1}', elapsed
+
+    def hit(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        current_key, previous_key, elapsed = self._keys(key, window, now)
+        counts = self.cache.get_many([current_key, previous_key])
+        if _estimate(counts.get(previous_key, 0), counts.get(current_key, 0), elapsed, window) >= limit:
+            return max(1, math.ceil(window - elapsed))
+        if not self.cache.add(current_key, 1, timeout=2 * window):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:  # La clave expiró entre add e incr
+                self.cache.add(current_key, 1, timeout=2 * window)
+        return None
+
+    async def ahit(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        current_key, previous_key, elapsed = self._keys(key, window, now)
+        counts = await self.cache.aget_many([current_key, previous_key])
+        if _estimate(counts.get(previous_key, 0), counts.get(current_key, 0), elapsed, window) >= limit:
+            return max(1, math.ceil(window - elapsed))
+        if not await self.cache.aadd(current_key, 1, timeout=2 * window):
+            try:
+                await self.cache.aincr(current_key)
+            except ValueError:
+                await self.cache.aadd(current_key, 1, timeout=2 * window)
+        return None
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.THROTTLE_BACKEND)()
+    return _backend
+
+
+def client_ip(request):
+    """
+    IP del cliente; con ``THROTTLE_NUM_PROXIES`` se toma de ``X-Forwarded-For`` como en DRF.
+    """
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded and settings.THROTTLE_NUM_PROXIES:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(settings.THROTTLE_NUM_PROXIES, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+async def check(scope, request, email=None):
+    """
+    Aplica los límites ``<scope>_ip`` y ``<scope>_email`` de ``AUTH_THROTTLE_RATES``.
+
+    Devuelve ``None`` si la petición puede continuar o los segundos de ``Retry-After``.
+    """
+    backend = get_backend()
+    keys = [(f'{scope}_ip', client_ip(request))]
+    if email:
+        keys.append((f'{scope}_email', str(email).strip().lower()))
+
+    for rate_name, value in keys:
+        rate = settings.AUTH_THROTTLE_RATES.get(rate_name)
+        if not rate:
+            continue
+        limit, window = parse_rate(rate)
+        digest = hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+        retry_after = await backend.ahit(f'{rate_name}:{digest}', limit, window)
+        if retry_after is not None:
+            return retry_after
+    return None
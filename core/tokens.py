@@ -0,0 +1,14 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Atributos del usuario que viajan firmados en el token para no consultarlos en cada petición
+USER_CLAIMS = ('role', 'email_verified', 'is_deaf', 'is_mute', 'is_staff')
+
+
+def tokens_for_user(user):
+    """
+    Genera el refresh token del usuario con sus claims; el access token los hereda.
+    """
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
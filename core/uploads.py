@@ -0,0 +1,178 @@
+"""
+Subidas por partes reanudables y procesamiento de los clips en un pool de procesos.
+
+Cada parte llega en un ``PUT`` con ``Content-Range: bytes inicio-fin/total`` y se copia del
+cuerpo de la petición al fichero en bloques de ``COPY_BLOCK_SIZE`` bytes, sin cargarla entera
+en memoria. Solo se acepta la parte que empieza en ``Upload.received``: si la conexión se
+corta, el cliente consulta el progreso y reenvía desde ahí.
+
+Al completarse la subida, la decodificación y normalización de frames (``core.frames``) se
+envía a un ``ProcessPoolExecutor``, de modo que el trabajo de CPU escala con los núcleos y
+la petición responde en cuanto la última parte está en disco.
+"""
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import frames
+from .models import Upload
+
+logger = logging.getLogger(__name__)
+
+COPY_BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class ChunkError(Exception):
+    """
+    Parte rechazada; ``status`` es el código HTTP de la respuesta.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_dir(upload_id):
+    return os.path.join(settings.UPLOAD_ROOT, str(upload_id))
+
+
+def source_path(upload_id):
+    return os.path.join(upload_dir(upload_id), 'source')
+
+
+def frames_dir(upload_id):
+    return os.path.join(upload_dir(upload_id), 'frames')
+
+
+def create_upload(user_id, filename, kind, size):
+    """
+    Registra la subida y reserva su fichero en disco al confirmar la transacción: si la
+    petición falla y se deshace, no queda un directorio sin fila.
+    """
+    upload = Upload.objects.create(user_id=user_id, filename=filename, kind=kind, size=size)
+    transaction.on_commit(lambda: _create_files(upload.id))
+    return upload
+
+
+def _create_files(upload_id):
+    os.makedirs(upload_dir(upload_id), exist_ok=True)
+    open(source_path(upload_id), 'wb').close()
+
+
+def parse_content_range(header):
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise ChunkError("Cabecera Content-Range inválida; se espera 'bytes inicio-fin/total'.")
+    start, end, total = (int(value) for value in match.groups())
+    if start > end:
+        raise ChunkError("Rango vacío o invertido.")
+    return start, end, total
+
+
+def write_chunk(upload, request):
+    """
+    Escribe en disco la parte del cuerpo de ``request`` y avanza ``received``.
+    Devuelve la subida actualizada; si era la última parte, lanza su procesamiento.
+    """
+    start, end, total = parse_content_range(request.headers.get('Content-Range'))
+    length = end - start + 1
+    if total != upload.size or end >= upload.size:
+        raise ChunkError("El rango no corresponde al tamaño de la subida.")
+    if length > settings.UPLOAD_MAX_CHUNK:
+        raise ChunkError("La parte supera el tamaño máximo permitido.", status=413)
+    if start != upload.received:
+        raise ChunkError(f"Se esperaba la parte que empieza en el byte {upload.received}.", status=409)
+
+    written = 0
+    with open(source_path(upload.id), 'r+b') as fh:
+        fh.seek(start)
+        while written < length:
+            block = request.read(min(COPY_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            fh.write(block)
+            written += len(block)
+        fh.truncate(start + written)
+    if written != length:
+        raise ChunkError("El cuerpo de la petición no coincide con Content-Range.")
+
+    completed = end + 1 == upload.size
+    # UPDATE condicional: dos peticiones con la misma parte no pueden avanzar ambas
+    updated = Upload.objects.filter(id=upload.id, received=start, status='uploading').update(
+        received=end + 1, status='processing' if completed else 'uploading', updated_at=timezone.now(),
+    )
+    if not updated:
+        raise ChunkError("La subida ha cambiado durante la escritura; consulte el progreso.", status=409)
+    upload.received = end + 1
+    if completed:
+        upload.status = 'processing'
+        submit(upload.id, upload.kind)
+    return upload
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Pool de procesos del worker. Usa ``spawn``: hacer ``fork`` de un servidor con hilos y
+    conexiones abiertas no es seguro.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.UPLOAD_PROCESS_WORKERS or os.cpu_count(),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _pool
+
+
+def submit(upload_id, kind):
+    """
+    Envía la extracción de frames al pool; el resultado se guarda al terminar.
+    """
+    future = get_pool().submit(
+        frames.extract_frames,
+        source_path(upload_id),
+        frames_dir(upload_id),
+        kind,
+        settings.UPLOAD_FRAME_SIZE,
+        settings.UPLOAD_THUMBNAIL_SIZE,
+        settings.UPLOAD_MAX_FRAMES,
+    )
+    future.add_done_callback(lambda done: finish(upload_id, done))
+    return future
+
+
+def _set_result(upload_id, **fields):
+    Upload.objects.filter(id=upload_id, status='processing').update(updated_at=timezone.now(), **fields)
+
+
+def finish(upload_id, future):
+    """
+    Guarda el resultado del procesamiento (se ejecuta en un hilo del pool).
+    """
+    close_old_connections()
+    try:
+        try:
+            count = future.result()
+        except frames.UnsupportedMedia as exc:
+            _set_result(upload_id, status='failed', error=str(exc))
+        except Exception as exc:
+            logger.exception("Error al procesar la subida %s", upload_id)
+            _set_result(upload_id, status='failed', error=f"Error interno: {exc}")
+        else:
+            _set_result(upload_id, status='ready', frame_count=count)
+    finally:
+        close_old_connections()
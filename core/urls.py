@@ -1,7 +1,25 @@
 from django.urls import path
-from .views import RegisterView, LoginView
+from .views import (
+    RegisterView, LoginView, TokenRefreshView, LogoutView, VerifyEmailView, ProfileView, TranslationHistoryView, SignSearchView, SimilarSignsView,
+    TextToSignView, LessonListView, LessonDetailView, MediaView, UploadListView, UploadDetailView,
+    MetricsView,
+)
 
 urlpatterns = [
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('auth/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
+    path('auth/verify-email/', VerifyEmailView.as_view(), name='verify-email'),
+    path('auth/me/', ProfileView.as_view(), name='profile'),
+    path('translations/', TranslationHistoryView.as_view(), name='translation-history'),
+    path('signs/search/', SignSearchView.as_view(), name='sign-search'),
+    path('signs/<int:pk>/similar/', SimilarSignsView.as_view(), name='sign-similar'),
+    path('signs/compose/', TextToSignView.as_view(), name='sign-compose'),
+    path('lessons/', LessonListView.as_view(), name='lesson-list'),
+    path('lessons/<slug:slug>/', LessonDetailView.as_view(), name='lesson-detail'),
+    path('media/<path:path>', MediaView.as_view(), name='media'),
+    path('uploads/', UploadListView.as_view(), name='upload-list'),
+    path('uploads/<uuid:upload_id>/', UploadDetailView.as_view(), name='upload-detail'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
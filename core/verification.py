@@ -0,0 +1,122 @@
+import secrets
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import outbox
+from .authentication import user_cache
+from .models import User, VerificationToken
+
+# Resultados posibles de la verificación de un email
+VERIFIED = 'verified'
+TOKEN_NOT_FOUND = 'token_not_found'
+TOKEN_EXPIRED = 'token_expired'
+TOKEN_USED = 'token_used'
+USER_NOT_FOUND = 'user_not_found'
+ALREADY_VERIFIED = 'already_verified'
+
+
+def _consume_token(token, now):
+    """
+    Marca el token como usado con un único UPDATE condicional y devuelve su identifier.
+
+    Solo se consume si no está usado ni expirado; si otra petición lo consumió antes,
+    el UPDATE no afecta a ninguna fila y se devuelve ``None``.
+    """
+    table = connection.ops.quote_name(VerificationToken._meta.db_table)
+    now_value = connection.ops.adapt_datetimefield_value(now)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET is_used = %s, used_at = %s "
+            f"WHERE token = %s AND is_used = %s AND expires > %s "
+            f"RETURNING identifier",
+            [True, now_value, token, False, now_value],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _mark_verified(identifier):
+    """
+    Marca como verificado al usuario con ese email (sin distinguir mayúsculas) si aún no lo
+    estaba y devuelve su id, o ``None``. Como ``.update()``, no envía ``post_save``: quien
+    llama debe invalidar la caché de usuarios.
+    """
+    table = connection.ops.quote_name(User._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET email_verified = %s "
+            f"WHERE LOWER(email) = %s AND email_verified = %s "
+            f"RETURNING id",
+            [True, identifier.lower(), False],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _token_failure(token, now):
+    """
+    Determina por qué no se pudo consumir un token (solo en el camino de error).
+    """
+    state = VerificationToken.objects.filter(token=token).values('is_used', 'expires').first()
+    if state is None:
+        return TOKEN_NOT_FOUND
+    if state['is_used']:
+        return TOKEN_USED
+    if now > state['expires']:
+        return TOKEN_EXPIRED
+    return TOKEN_USED
+
+
+def verify_email(token):
+    """
+    Consume el token y marca el email del usuario como verificado en la misma transacción.
+
+    En el caso exitoso cuesta dos consultas: el UPDATE ... RETURNING del token y el
+    UPDATE del usuario. Si el usuario no existe o ya estaba verificado, la transacción
+    se revierte y el token queda sin consumir.
+    """
+    if not token:
+        return TOKEN_NOT_FOUND
+
+    now = timezone.now()
+    with transaction.atomic(savepoint=False):
+        identifier = _consume_token(token, now)
+        if identifier is None:
+            return _token_failure(token, now)
+
+        user_id = _mark_verified(identifier)
+        if user_id is not None:
+            # Sin esto, el perfil seguiría mostrando el email sin verificar hasta USER_CACHE_TTL
+            transaction.on_commit(lambda: user_cache.delete(user_id))
+            return VERIFIED
+
+        result = ALREADY_VERIFIED if User.objects.filter_email(identifier).exists() else USER_NOT_FOUND
+        # Revertir el consumo del token antes de responder
+        transaction.set_rollback(True)
+        return result
+
+
+def queue_verification_email(user):
+    """
+    Crea el token de verificación y encola el correo con el enlace. Se llama dentro de la
+    transacción del registro: si esta se revierte, no queda ni token ni correo.
+    """
+    token = secrets.token_urlsafe(32)
+    VerificationToken.objects.create(
+        identifier=user.email,
+        token=token,
+        expires=timezone.now() + timedelta(hours=settings.VERIFICATION_TOKEN_HOURS),
+    )
+    link = f"{settings.FRONTEND_URL.rstrip('/')}/verify-email?{urlencode({'token': token})}"
+    outbox.enqueue(
+        user.email,
+        "Verifica tu correo electrónico",
+        f"Hola {user.name or user.email},\n\n"
+        f"Para activar tu cuenta, abre el siguiente enlace:\n{link}\n\n"
+        f"El enlace caduca en {settings.VERIFICATION_TOKEN_HOURS} horas.",
+    )
+    return token
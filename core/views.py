@@ -1,39 +1,151 @@
 from rest_framework import generics, status, serializers
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework.exceptions import APIException
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.exceptions import APIException, AuthenticationFailed, ParseError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.contrib.auth import authenticate
 from django.db import transaction  # Para el manejo de transacciones
-from django.utils import timezone  # Para manejar la fecha y hora
-from .models import User, VerificationToken
-from .serializers import UserSerializer
+from django.db.models import Prefetch
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from . import catalogue, compositor, instrumentation, media, metrics, revocation, sign_index, throttling, uploads, verification
+from .authentication import authenticate_request, get_cached_user
+from .cache import TTLCache
+from .fastjson import JsonResponse
+from .hashing import HashingPoolFull, run_in_pool
+from .models import Lesson, Resource, Sign, TranslationEvent, Upload
+from .pagination import CatalogueCursorPagination, TranslationCursorPagination
+from .routers import read_only
+from .serializers import (
+    LessonDetailSerializer, LessonSerializer, SignSearchSerializer, TextToSignSerializer, TranslationEventSerializer,
+    TranslationEventValuesSerializer, UserReadSerializer, UserSerializer, UserValuesSerializer,
+)
+from .tokens import tokens_for_user
 
 
-class RegisterView(generics.CreateAPIView):
+def _parse_data(request):
     """
-    Vista para el registro de nuevos usuarios.
+    Interpreta el cuerpo de la petición con los parsers configurados en DRF.
     """
-    queryset = User.objects.all()
-    serializer_class = UserSerializer
-    permission_classes = [AllowAny]
+    parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    return Request(request, parsers=parsers).data
 
-    def post(self, request, *args, **kwargs):
+
+def _throttled_response(retry_after):
+    """
+    Respuesta cuando se supera el límite de intentos, antes de cualquier hash o consulta.
+    """
+    response = JsonResponse(
+        {'error': 'Demasiados intentos, inténtelo de nuevo más tarde.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _email_of(data):
+    return data.get('email') if hasattr(data, 'get') else None
+
+
+def _set_token_cookies(response, access_token, refresh_token):
+    response.set_cookie(key='access', value=access_token, httponly=True, samesite='None', secure=True)  # Cookie para el access
+    response.set_cookie(key='refresh', value=refresh_token, httponly=True, samesite='None', secure=True)  # Cookie para el refresh
+
+
+def _refresh_token_of(request):
+    """
+    Refresh token del cuerpo (``refresh``) o, si no viene, de la cookie ``refresh``.
+    """
+    try:
+        data = _parse_data(request)
+    except ParseError:
+        data = {}
+    raw = data.get('refresh') if hasattr(data, 'get') else None
+    return raw or request.COOKIES.get('refresh')
+
+
+def _decode_token(token_class, raw_token):
+    """
+    Valida un token recibido. ``TokenError`` si falta: con ``None`` simplejwt crearía uno nuevo.
+    """
+    if not raw_token:
+        raise TokenError("No se ha enviado el token.")
+    return token_class(raw_token)
+
+
+def _pool_full_response():
+    """
+    Respuesta rápida cuando el pool de hashing está saturado.
+    """
+    response = JsonResponse(
+        {'error': 'El servicio está ocupado, inténtelo de nuevo en unos segundos.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+@method_decorator([csrf_exempt, transaction.non_atomic_requests], name='dispatch')
+class RegisterView(View):
+    """
+    Vista asíncrona para el registro de nuevos usuarios.
+    El hash de la contraseña se ejecuta en el pool acotado de ``core.hashing``.
+    """
+    query_budget = 3  # INSERT del usuario (la unicidad la garantiza el índice) + token + correo
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = _parse_data(request)
+        except ParseError as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=status.HTTP_400_BAD_REQUEST)
+
+        retry_after = await throttling.check('register', request, _email_of(data))
+        if retry_after is not None:
+            return _throttled_response(retry_after)
+
+        try:
+            payload = await run_in_pool(self.register, data, {'request': request})
+        except HashingPoolFull:
+            return _pool_full_response()
+        except serializers.ValidationError as exc:
+            return JsonResponse(exc.detail, status=status.HTTP_400_BAD_REQUEST, safe=False)
+
+        return JsonResponse(payload, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def register(data, context):
+        """
+        Valida y crea el usuario; se ejecuta dentro de un hilo del pool de hashing.
+        """
         with transaction.atomic():  # Asegura que todas las operaciones sean atómicas
-            serializer = self.get_serializer(data=request.data)
+            serializer = UserSerializer(data=data, context=context)
             serializer.is_valid(raise_exception=True)
             user = serializer.save()
+            # El correo se envía después desde la cola (send_outbox), fuera de la petición
+            verification.queue_verification_email(user)
 
-            # Generar tokens JWT
-            refresh = RefreshToken.for_user(user)
-            access_token = refresh.access_token
+        # Generar tokens JWT
+        with instrumentation.stage('jwt'):
+            refresh = tokens_for_user(user)
+            refresh_token = str(refresh)
+            access_token = str(refresh.access_token)
 
-            return Response({
-                "user": UserSerializer(user, context=self.get_serializer_context()).data,
-                "refresh": str(refresh),  # Token de refresh JWT
-                "access": str(access_token),  # Token de acceso JWT
-                "message": "Usuario registrado correctamente.",
-            }, status=status.HTTP_201_CREATED)
+        return {
+            "user": UserValuesSerializer.to_representation(user),
+            "refresh": refresh_token,  # Token de refresh JWT
+            "access": access_token,  # Token de acceso JWT
+            "message": "Usuario registrado correctamente.",
+        }
 
 
 class LoginSerializer(serializers.Serializer):
@@ -57,77 +169,415 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
-class LoginView(generics.GenericAPIView):
+@method_decorator([csrf_exempt, transaction.non_atomic_requests], name='dispatch')
+class LoginView(View):
     """
-    Vista para el inicio de sesión de usuarios.
+    Vista asíncrona para el inicio de sesión de usuarios.
+    La verificación de la contraseña se ejecuta en el pool acotado de ``core.hashing``.
     """
-    serializer_class = LoginSerializer
-    permission_classes = [AllowAny]
+    query_budget = 2  # Búsqueda del usuario + UPDATE si se rehace el hash de la contraseña
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         try:
-            serializer = self.get_serializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
+            data = _parse_data(request)
+            retry_after = await throttling.check('login', request, _email_of(data))
+            if retry_after is not None:
+                return _throttled_response(retry_after)
+
+            user = await run_in_pool(self.check_credentials, data, {'request': request})
 
-            # Autenticación del usuario
-            user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            with instrumentation.stage('jwt'):
+                refresh = tokens_for_user(user)
+                refresh_token = str(refresh)
+                access_token = str(refresh.access_token)
 
             # Crear respuesta
-            response = Response({
-                'refresh': str(refresh),  # Token de refresh JWT
+            response = JsonResponse({
+                'refresh': refresh_token,  # Token de refresh JWT
                 'message': 'Inicio de sesión exitoso'
             })
-            # Establecer las cookies
-            response.set_cookie(key='access', value=str(refresh.access_token), httponly=True, samesite='None', secure=True)  # Cookie para el access
-            response.set_cookie(key='refresh', value=str(refresh), httponly=True, samesite='None', secure=True)  # Cookie para el refresh
-
+            _set_token_cookies(response, access_token, refresh_token)
             return response
+        except HashingPoolFull:
+            return _pool_full_response()
         except APIException as api_exception:
-            return Response({'error': str(api_exception)}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': str(api_exception)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({'error': 'Ocurrió un error interno: ' + str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return JsonResponse({'error': 'Ocurrió un error interno: ' + str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def check_credentials(data, context):
+        """
+        Verifica las credenciales del usuario; se ejecuta en un hilo del pool de hashing.
+        """
+        serializer = LoginSerializer(data=data, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        # Autenticación del usuario
+        return serializer.validated_data['user']
+
+
+@method_decorator([csrf_exempt, transaction.non_atomic_requests], name='dispatch')
+class TokenRefreshView(View):
+    """
+    Rota el refresh token: el recibido se revoca (es de un solo uso) y se emiten un access y
+    un refresh nuevos con los claims actuales del usuario. Un refresh ya rotado o revocado
+    por logout devuelve 401.
+    """
+    query_budget = 2  # INSERT de la revocación + usuario (si no está en la caché)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            refresh = _decode_token(RefreshToken, _refresh_token_of(request))
+        except TokenError:
+            return JsonResponse({'error': 'Refresh token inválido o expirado.'}, status=status.HTTP_401_UNAUTHORIZED)
+        # El INSERT es el consumo: si dos peticiones usan el mismo token, solo una lo consigue
+        if not revocation.get_store().revoke(refresh[jwt_settings.JTI_CLAIM], refresh['exp']):
+            return JsonResponse({'error': 'El refresh token ya se ha utilizado.'}, status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            user = get_cached_user(refresh[jwt_settings.USER_ID_CLAIM])
+        except AuthenticationFailed:
+            return JsonResponse({'error': 'Usuario no encontrado.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        new_refresh = tokens_for_user(user)
+        refresh_token = str(new_refresh)
+        access_token = str(new_refresh.access_token)
+        response = JsonResponse({'refresh': refresh_token, 'access': access_token})
+        _set_token_cookies(response, access_token, refresh_token)
+        return response
+
+
+@method_decorator([csrf_exempt, transaction.non_atomic_requests], name='dispatch')
+class LogoutView(View):
+    """
+    Cierra la sesión: revoca el refresh token y el access token en uso y borra las cookies.
+    """
+    query_budget = 2  # Revocación del refresh + revocación del access
+
+    def post(self, request, *args, **kwargs):
+        store = revocation.get_store()
+        try:
+            refresh = _decode_token(RefreshToken, _refresh_token_of(request))
+            store.revoke(refresh[jwt_settings.JTI_CLAIM], refresh['exp'])
+        except TokenError:
+            pass  # Ya expirado o ausente: no hay nada que revocar
+        header = request.headers.get('Authorization', '').split()
+        raw_access = header[1] if len(header) == 2 else request.COOKIES.get('access')
+        try:
+            access = _decode_token(AccessToken, raw_access)
+            store.revoke(access[jwt_settings.JTI_CLAIM], access['exp'])
+        except TokenError:
+            pass
+
+        response = JsonResponse({'message': 'Sesión cerrada.'})
+        response.delete_cookie('access', samesite='None')
+        response.delete_cookie('refresh', samesite='None')
+        return response
 
 
 class VerifyEmailView(generics.GenericAPIView):
     """
     Vista para verificar el correo electrónico utilizando un token.
     """
+    query_budget = 3  # UPDATE del token + UPDATE del usuario (+1 en los casos de error)
     permission_classes = [AllowAny]
 
+    # Mensajes y códigos de estado para cada resultado de ``verify_email``
+    RESPONSES = {
+        verification.VERIFIED: ("Email verificado con éxito.", status.HTTP_200_OK),
+        verification.TOKEN_NOT_FOUND: ("Token no encontrado.", status.HTTP_400_BAD_REQUEST),
+        verification.TOKEN_EXPIRED: ("Token expirado.", status.HTTP_400_BAD_REQUEST),
+        verification.TOKEN_USED: ("El token ya ha sido utilizado.", status.HTTP_400_BAD_REQUEST),
+        verification.USER_NOT_FOUND: ("Usuario no encontrado.", status.HTTP_404_NOT_FOUND),
+        verification.ALREADY_VERIFIED: ("Email ya verificado.", status.HTTP_400_BAD_REQUEST),
+    }
+
     def post(self, request):
-        token = request.data.get("token")
+        result = verification.verify_email(request.data.get("token"))
+        message, status_code = self.RESPONSES[result]
+        return Response({"message": message}, status=status_code)
 
-        # Verificar si existe un token en la base de datos
-        verify_token = VerificationToken.objects.filter(token=token).first()
-        if not verify_token:
-            return Response({"message": "Token no encontrado."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Verificar si el token ya expiró
-        if verify_token.is_expired():
-            return Response({"message": "Token expirado."}, status=status.HTTP_400_BAD_REQUEST)
+@read_only
+class ProfileView(generics.GenericAPIView):
+    """
+    Vista de lectura del perfil del usuario autenticado.
+    Usa el usuario cacheado del proceso, por lo que no consulta la base de datos en cada petición.
+    """
+    query_budget = 1  # Usuario completo solo si no está en caché
+    serializer_class = UserReadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(UserValuesSerializer.to_representation(request.user.get_user()))
+
+
+@read_only
+class TranslationHistoryView(generics.ListAPIView):
+    """
+    Historial de traducciones del usuario autenticado, del más reciente al más antiguo.
+    """
+    query_budget = 1  # Página de eventos (sin COUNT)
+    serializer_class = TranslationEventSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TranslationCursorPagination
+
+    def get_queryset(self):
+        return TranslationEvent.objects.filter(user_id=self.request.user.id)
 
-        # Verificar si el token ya fue utilizado
-        if verify_token.is_used:
-            return Response({"message": "El token ya ha sido utilizado."}, status=status.HTTP_400_BAD_REQUEST)
+    def list(self, request, *args, **kwargs):
+        # Filas de .values() paginadas tal cual: sin instancias de modelo ni campos de DRF
+        page = self.paginate_queryset(TranslationEventValuesSerializer.values(self.get_queryset()))
+        return self.get_paginated_response(page)
 
-        # Buscar al usuario asociado con el token
-        user = User.objects.filter(email=verify_token.identifier).first()
+
+def _sign_matches(matches):
+    return [{'id': sign_id, 'name': name, 'score': score} for sign_id, name, score in matches]
+
+
+@read_only
+class SignSearchView(generics.GenericAPIView):
+    """
+    "¿Qué seña es esta?": señas del diccionario más similares a uno o varios embeddings.
+    La búsqueda se hace sobre el índice en memoria de ``core.sign_index``.
+    """
+    query_budget = 3  # Sincronización incremental del índice (+1 si hay que reconstruirlo)
+    serializer_class = SignSearchSerializer
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = sign_index.get_index().search(serializer.validated_data['embeddings'], serializer.validated_data['k'])
+        return Response({'results': [_sign_matches(matches) for matches in results]})
+
+
+@read_only
+class SimilarSignsView(generics.GenericAPIView):
+    """
+    Señas con la ejecución más parecida a la seña indicada.
+    """
+    query_budget = 3  # Sincronización incremental del índice (+1 si hay que reconstruirlo)
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        try:
+            k = min(max(int(request.query_params.get('k', 10)), 1), 100)
+        except ValueError:
+            return Response({'error': 'Parámetro k inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        index = sign_index.get_index()
+        index.refresh()
+        vector = index.vector(pk)
+        if vector is None:
+            return Response({'error': 'Seña no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        matches = index.search(vector, k, exclude=pk)[0]
+        return Response({'results': _sign_matches(matches)})
+
+
+@read_only
+class TextToSignView(generics.GenericAPIView):
+    """
+    Texto en español a la lista de clips de señas que lo representan (ver ``core.compositor``).
+    """
+    query_budget = 2  # Comprobación de cambios en las señas (+1 si hay que reconstruir el índice)
+    serializer_class = TextToSignSerializer
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'playlist': compositor.get_compositor().compose(serializer.validated_data['text'])})
+
+
+class CachedCatalogueMixin:
+    """
+    Lectura pública de un catálogo con ETag y caché de páginas renderizadas.
+
+    El ETag es la versión del catálogo (``core.catalogue``): si coincide con
+    ``If-None-Match`` se responde 304 sin consultar la base de datos ni serializar. Si no,
+    se sirve la página renderizada desde la caché o se genera y se guarda.
+    """
+    authentication_classes = []  # El contenido no depende del usuario
+    permission_classes = [AllowAny]
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        version = catalogue.get_version()
+        etag = catalogue.etag(version)
+        path = request.build_absolute_uri()  # Los enlaces de paginación incluyen el host
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = catalogue.get_page(version, path)
+            if content is not None:
+                response = HttpResponse(content, content_type='application/json')
+            else:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    response.add_post_render_callback(lambda rendered: catalogue.set_page(version, path, rendered.content))
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'  # El cliente puede guardarla, pero debe revalidarla
+        return response
+
+
+@read_only
+class LessonListView(CachedCatalogueMixin, generics.ListAPIView):
+    """
+    Catálogo de lecciones publicadas, paginado por cursor.
+    """
+    query_budget = 2  # Versión del catálogo (si no está en caché) + página
+    serializer_class = LessonSerializer
+    pagination_class = CatalogueCursorPagination
+    queryset = Lesson.objects.filter(is_published=True)
+
+
+@read_only
+class LessonDetailView(CachedCatalogueMixin, generics.RetrieveAPIView):
+    """
+    Lección publicada con sus recursos.
+    """
+    query_budget = 3  # Versión del catálogo (si no está en caché) + lección + recursos
+    serializer_class = LessonDetailSerializer
+    lookup_field = 'slug'
+    queryset = Lesson.objects.filter(is_published=True).prefetch_related(
+        Prefetch('resources', queryset=Resource.objects.order_by('position', 'id'))
+    )
+
+
+@read_only
+class MediaView(View):
+    """
+    Videos de las lecciones y clips de señas para usuarios autenticados, con soporte de
+    ``Range`` para poder saltar a cualquier punto del video (ver ``core.media``).
+    Solo se sirven ficheros referenciados por un recurso publicado o por una seña.
+    """
+    query_budget = 2  # Recurso + seña (el resultado se recuerda MEDIA_ACCESS_CACHE_TTL segundos)
+    access_cache = TTLCache(10000, settings.MEDIA_ACCESS_CACHE_TTL)
+
+    def is_public_file(self, path):
+        allowed = self.access_cache.get(path)
+        if allowed is None:
+            allowed = (
+                Resource.objects.filter(file=path, lesson__is_published=True).exists()
+                or Sign.objects.filter(clip=path).exists()
+            )
+            self.access_cache.set(path, allowed)
+        return allowed
+
+    def get(self, request, path):
+        if authenticate_request(request) is None:
+            return JsonResponse({'error': 'Autenticación requerida.'}, status=status.HTTP_401_UNAUTHORIZED)
+        if not self.is_public_file(path):
+            return JsonResponse({'error': 'Fichero no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        response = media.serve(request, path)
+        response['Cache-Control'] = 'private, max-age=3600'
+        return response
+
+
+def _upload_payload(upload):
+    return {
+        'id': str(upload.id),
+        'filename': upload.filename,
+        'kind': upload.kind,
+        'size': upload.size,
+        'received': upload.received,
+        'status': upload.status,
+        'frame_count': upload.frame_count,
+        'error': upload.error,
+    }
+
+
+def _unauthorized_response():
+    return JsonResponse({'error': 'Autenticación requerida.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UploadListView(View):
+    """
+    Inicia una subida por partes de un clip de entrenamiento (ver ``core.uploads``).
+    """
+    query_budget = 1  # INSERT de la subida
+
+    def post(self, request):
+        user = authenticate_request(request, cookie=False)
+        if user is None:
+            return _unauthorized_response()
+        try:
+            data = _parse_data(request)
+            filename = str(data['filename'])[:255]
+            kind = data['kind']
+            size = int(data['size'])
+        except (ParseError, KeyError, TypeError, ValueError):
+            return JsonResponse(
+                {'error': "Se requieren 'filename', 'kind' y 'size'."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        if kind not in dict(Upload.KIND_CHOICES):
+            return JsonResponse({'error': "Tipo de subida no válido."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < size <= settings.UPLOAD_MAX_SIZE:
+            return JsonResponse(
+                {'error': f"El tamaño debe estar entre 1 y {settings.UPLOAD_MAX_SIZE} bytes."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        upload = uploads.create_upload(user.id, filename, kind, size)
+        payload = dict(_upload_payload(upload), max_chunk=settings.UPLOAD_MAX_CHUNK)
+        return JsonResponse(payload, status=status.HTTP_201_CREATED)
+
+
+@method_decorator([csrf_exempt, transaction.non_atomic_requests], name='dispatch')
+class UploadDetailView(View):
+    """
+    Progreso de una subida (``GET``) y envío de cada parte (``PUT`` con ``Content-Range``).
+    El cuerpo se copia a disco por bloques y la respuesta vuelve en cuanto la parte está
+    escrita; el procesamiento de frames continúa en segundo plano.
+    """
+    query_budget = 2  # Subida + UPDATE condicional del progreso
+
+    def get_upload(self, request, upload_id):
+        user = authenticate_request(request, cookie=False)
         if user is None:
-            return Response({"message": "Usuario no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+            return None
+        return Upload.objects.filter(id=upload_id, user_id=user.id).first()
 
-        # Verificar si el email ya está verificado
-        if user.email_verified:
-            return Response({"message": "Email ya verificado."}, status=status.HTTP_400_BAD_REQUEST)
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return JsonResponse({'error': 'Subida no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        return JsonResponse(_upload_payload(upload))
+
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return JsonResponse({'error': 'Subida no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        if upload.status != 'uploading':
+            return JsonResponse(_upload_payload(upload), status=status.HTTP_409_CONFLICT)
+        try:
+            upload = uploads.write_chunk(upload, request)
+        except uploads.ChunkError as exc:
+            return JsonResponse({'error': str(exc), 'received': upload.received}, status=exc.status)
+        return JsonResponse(_upload_payload(upload))
 
-        # Marcar el email como verificado
-        user.email_verified = True  # Cambia a True para indicar que el email está verificado
-        user.save()
 
-        # Marcar el token como utilizado
-        verify_token.is_used = True
-        verify_token.used_at = timezone.now()  # Registrar cuándo se utilizó el token
-        verify_token.save()
+@read_only
+class MetricsView(View):
+    """
+    Expone los histogramas de todos los workers en formato de texto de Prometheus.
+    Solo para el ``METRICS_TOKEN`` (si está configurado) como token Bearer o el access
+    token de un usuario ``is_staff``.
+    """
+    query_budget = 0  # Solo lee memoria y ficheros
 
-        return Response({"message": "Email verificado con éxito."}, status=status.HTTP_200_OK)
+    @staticmethod
+    def is_allowed(request):
+        header = request.headers.get('Authorization', '')
+        if settings.METRICS_TOKEN and constant_time_compare(header, f'Bearer {settings.METRICS_TOKEN}'):
+            return True
+        user = authenticate_request(request, cookie=False)
+        return user is not None and user.is_staff
 
+    def get(self, request):
+        if not self.is_allowed(request):
+            return HttpResponseForbidden()
+        return HttpResponse(
+            metrics.render_prometheus(metrics.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
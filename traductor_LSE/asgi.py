@@ -2,6 +2,8 @@
 ASGI config for traductor_LSE project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are served by Django; WebSocket connections go to the real-time
+sign recognition endpoint in ``core.streaming``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,4 +15,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traductor_LSE.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.scheduler import start_background_tasks  # noqa: E402  (requiere Django configurado)
+from core.streaming import websocket_application  # noqa: E402
+
+start_background_tasks()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        return await websocket_application(scope, receive, send)
+    return await django_application(scope, receive, send)
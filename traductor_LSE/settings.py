@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,12 +47,126 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'core.User'
 
+# Login por email sin distinguir mayúsculas (o por username, p. ej. superusuarios)
+AUTHENTICATION_BACKENDS = ['core.backends.EmailBackend']
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.StatelessJWTAuthentication',
+    ),
+    # JSON con orjson si está instalado (core/fastjson.py); si no, los de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
+# Caché en proceso de usuarios completos para las vistas que los necesitan (core.authentication)
+USER_CACHE_MAXSIZE = config('USER_CACHE_MAXSIZE', default=10000, cast=int)
+USER_CACHE_TTL = config('USER_CACHE_TTL', default=60, cast=int)
+
+# Caché compartida entre workers (p. ej. django.core.cache.backends.redis.RedisCache).
+# Por defecto, caché local de cada proceso.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Listado de usuarios del admin: por encima de este número de filas estimadas (PostgreSQL)
+# se muestra la estimación del planificador en lugar de ejecutar COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# Límites de intentos de login y registro por IP y por email (core/throttling.py).
+# CacheBackend usa THROTTLE_CACHE (compartida si es Redis/Memcached); LocalBackend es solo del proceso.
+AUTH_THROTTLE_RATES = {
+    'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+    'login_email': config('THROTTLE_LOGIN_EMAIL', default='10/min'),
+    'register_ip': config('THROTTLE_REGISTER_IP', default='10/hour'),
+    'register_email': config('THROTTLE_REGISTER_EMAIL', default='3/hour'),
+}
+THROTTLE_BACKEND = config('THROTTLE_BACKEND', default='core.throttling.CacheBackend')
+THROTTLE_CACHE = 'default'
+THROTTLE_NUM_PROXIES = config('THROTTLE_NUM_PROXIES', default=0, cast=int)
+THROTTLE_LOCAL_MAX_KEYS = 100000
+
+# Reconocimiento en tiempo real por WebSocket (core/streaming.py)
+RECOGNITION_CLASSIFIER = config('RECOGNITION_CLASSIFIER', default='core.classifiers.StubClassifier')
+RECOGNITION_FEATURES = 225  # (21 + 21 keypoints de manos + 33 de pose) x 3 coordenadas
+RECOGNITION_WINDOW = config('RECOGNITION_WINDOW', default=30, cast=int)  # Frames por ventana
+RECOGNITION_STRIDE = config('RECOGNITION_STRIDE', default=5, cast=int)  # Frames entre clasificaciones
+RECOGNITION_MAX_BATCH = config('RECOGNITION_MAX_BATCH', default=64, cast=int)
+RECOGNITION_MAX_DELAY = config('RECOGNITION_MAX_DELAY', default=0.005, cast=float)  # Segundos
+RECOGNITION_RESULT_QUEUE = 8  # Resultados pendientes de envío por conexión
+
+# Registro de modelos: versiones con pesos .npy proyectados en memoria (mmap) y compartidos
+# entre workers. Vacío = se usa RECOGNITION_CLASSIFIER.
+RECOGNITION_MODEL_DIR = config('RECOGNITION_MODEL_DIR', default='')
+RECOGNITION_MODEL_CHECK_INTERVAL = config('RECOGNITION_MODEL_CHECK_INTERVAL', default=5.0, cast=float)  # Segundos
+RECOGNITION_WARMUP = config('RECOGNITION_WARMUP', default=False, cast=bool)  # Cargar el modelo al arrancar
+
+# Caché de resultados de reconocimiento (core/recognition_cache.py): por huella de la ventana
+# normalizada y versión del modelo. Nivel local LRU por proceso y, opcionalmente, uno
+# compartido en el alias de CACHES indicado (vacío = solo local). Un acierto cuesta ~65 µs por
+# ventana (normalizar + hash): compensa con cualquier modelo más caro que el lineal.
+RECOGNITION_CACHE_SIZE = config('RECOGNITION_CACHE_SIZE', default=10000, cast=int)  # Entradas por proceso (0 = sin caché)
+RECOGNITION_CACHE_TTL = config('RECOGNITION_CACHE_TTL', default=3600, cast=int)  # Segundos
+RECOGNITION_CACHE_QUANTUM = config('RECOGNITION_CACHE_QUANTUM', default=0.05, cast=float)  # Paso de cuantización (desviaciones típicas)
+RECOGNITION_CACHE = config('RECOGNITION_CACHE', default='')
+
+# Diccionario de señas: índice de embeddings en memoria para búsquedas por similitud
+SIGN_EMBEDDING_DIM = config('SIGN_EMBEDDING_DIM', default=128, cast=int)
+SIGN_INDEX_IVF_MIN = config('SIGN_INDEX_IVF_MIN', default=20000, cast=int)  # Señas a partir de las que se usa IVF (0 = nunca)
+SIGN_INDEX_NPROBE = config('SIGN_INDEX_NPROBE', default=8, cast=int)  # Listas IVF exploradas por consulta
+SIGN_INDEX_REFRESH_INTERVAL = config('SIGN_INDEX_REFRESH_INTERVAL', default=5.0, cast=float)  # Segundos
+
+# Texto a señas (core/compositor.py): índice de expresiones en memoria y caché de listas por frase
+TEXT_TO_SIGN_LETTER_PREFIX = config('TEXT_TO_SIGN_LETTER_PREFIX', default='letra ')  # Nombre de las señas del alfabeto
+TEXT_TO_SIGN_MAX_LENGTH = 1000  # Caracteres por petición
+TEXT_TO_SIGN_CACHE_SIZE = config('TEXT_TO_SIGN_CACHE_SIZE', default=10000, cast=int)  # Frases por proceso
+TEXT_TO_SIGN_CACHE_TTL = config('TEXT_TO_SIGN_CACHE_TTL', default=3600, cast=int)  # Segundos
+TEXT_TO_SIGN_REFRESH_INTERVAL = config('TEXT_TO_SIGN_REFRESH_INTERVAL', default=5.0, cast=float)  # Segundos
+
+# Catálogo de aprendizaje: versión (ETag) y páginas renderizadas en caché
+CATALOGUE_CACHE = 'default'
+CATALOGUE_VERSION_TTL = config('CATALOGUE_VERSION_TTL', default=30, cast=int)  # Retraso máximo con caché local por proceso
+CATALOGUE_PAGE_TTL = config('CATALOGUE_PAGE_TTL', default=3600, cast=int)
+
+# Correo: los mensajes se encolan en EmailOutbox y los envía send_outbox (core.outbox)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='no-reply@localhost')
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_BACKOFF = 30  # Segundos antes del primer reintento (se duplica en cada fallo)
+EMAIL_OUTBOX_BACKOFF_MAX = 6 * 3600
+# Segundos que un lote reclamado queda reservado para su proceso; debe superar lo que tarda en enviarse
+EMAIL_OUTBOX_LEASE = config('EMAIL_OUTBOX_LEASE', default=300, cast=int)
+# Segundos entre envíos de la cola en los procesos del servidor (0 = solo con el comando send_outbox)
+EMAIL_OUTBOX_INTERVAL = config('EMAIL_OUTBOX_INTERVAL', default=0, cast=int)
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')  # Base de los enlaces de los correos
+VERIFICATION_TOKEN_HOURS = config('VERIFICATION_TOKEN_HOURS', default=24, cast=int)
+
+# Historial de traducciones: buffer en memoria volcado por lotes (COPY en PostgreSQL)
+TRANSLATION_HISTORY_ENABLED = config('TRANSLATION_HISTORY_ENABLED', default=True, cast=bool)
+TRANSLATION_BUFFER_SIZE = config('TRANSLATION_BUFFER_SIZE', default=500, cast=int)  # Eventos por volcado
+TRANSLATION_FLUSH_INTERVAL = config('TRANSLATION_FLUSH_INTERVAL', default=1.0, cast=float)  # Segundos
+TRANSLATION_BUFFER_MAX = config('TRANSLATION_BUFFER_MAX', default=50000, cast=int)  # Eventos retenidos como máximo
+TRANSLATION_HISTORY_MONTHS = config('TRANSLATION_HISTORY_MONTHS', default=12, cast=int)  # Retención
+TRANSLATION_PARTITIONS_AHEAD = 2  # Particiones mensuales creadas por adelantado
+# Segundos entre ejecuciones de prune_translation_events en los procesos del servidor (0 = desactivado)
+TRANSLATION_MAINTENANCE_INTERVAL = config('TRANSLATION_MAINTENANCE_INTERVAL', default=0, cast=int)
+
 # Configuración JWT opcional (expiración del token, etc.)
 from datetime import timedelta
 
@@ -60,14 +174,52 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
-    'BLACKLIST_AFTER_ROTATION': True,
+    # La rotación y la revocación las hace core.revocation (auth/refresh/ y auth/logout/),
+    # no la app token_blacklist de simplejwt
+    'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Revocación de tokens (core/revocation.py): filtros de Bloom por intervalo de expiración
+# delante de la tabla RevokedToken. Las revocaciones de otros workers se ven tras
+# REVOCATION_SYNC_INTERVAL segundos; las filas expiradas se purgan cada REVOCATION_PRUNE_INTERVAL.
+# Ambas tareas solo corren en los procesos del servidor (asgi.py/wsgi.py), nunca en comandos de
+# gestión ni en tests; 0 = desactivada (con varios workers, la sincronización es necesaria para
+# que un logout se aplique en todos).
+REVOCATION_BUCKET_SECONDS = config('REVOCATION_BUCKET_SECONDS', default=3600, cast=int)
+REVOCATION_BLOOM_CAPACITY = config('REVOCATION_BLOOM_CAPACITY', default=50000, cast=int)  # Revocaciones por intervalo
+REVOCATION_BLOOM_ERROR_RATE = config('REVOCATION_BLOOM_ERROR_RATE', default=0.01, cast=float)
+REVOCATION_SYNC_INTERVAL = config('REVOCATION_SYNC_INTERVAL', default=5, cast=int)
+REVOCATION_SYNC_OVERLAP = 60  # Segundos que se vuelven a leer en cada sincronización
+REVOCATION_PRUNE_INTERVAL = config('REVOCATION_PRUNE_INTERVAL', default=3600, cast=int)
+
+# Pool acotado para el hash de contraseñas en login/registro (ver core/hashing.py).
+# Cuando hay MAX_WORKERS + MAX_QUEUE trabajos pendientes, las vistas responden 503.
+HASHING_POOL_MAX_WORKERS = config('HASHING_POOL_MAX_WORKERS', default=os.cpu_count() or 1, cast=int)
+HASHING_POOL_MAX_QUEUE = config('HASHING_POOL_MAX_QUEUE', default=32, cast=int)
+
+# Intervalo en segundos de la purga de tokens de verificación en los procesos del servidor
+# (asgi.py/wsgi.py; 0 = desactivada).
+# Alternativa: ejecutar `manage.py purge_verification_tokens` desde cron.
+VERIFICATION_TOKEN_PURGE_INTERVAL = config('VERIFICATION_TOKEN_PURGE_INTERVAL', default=0, cast=int)
+
+# Métricas por petición (core.middleware.InstrumentationMiddleware, /api/metrics).
+# METRICS_DIR: directorio local compartido por los workers de la máquina, donde cada uno vuelca
+# sus histogramas para agregarlos (los ficheros de procesos terminados se eliminan al leerlos).
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # Token Bearer del scraper; sin él, solo usuarios is_staff
+
+# Falla con QueryBudgetExceeded si una vista supera su `query_budget` (ver core/middleware.py).
+QUERY_BUDGET_ENFORCE = config('QUERY_BUDGET_ENFORCE', default=DEBUG, cast=bool)
+
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -119,6 +271,25 @@ DATABASES = {
     }
 }
 
+# Réplicas de solo lectura (core.routers.ReplicaRouter): lista separada por comas de hosts,
+# o de ficheros de base de datos cuando DB_ENGINE es SQLite (útil para pruebas locales).
+DATABASE_REPLICAS = []
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME' if 'sqlite' in DATABASES['default']['ENGINE'] else 'HOST': replica,
+        'ATOMIC_REQUESTS': False,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Tras una escritura, la sesión lee del primario durante este tiempo (lectura de sus escrituras)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+REPLICA_PIN_COOKIE = 'db_pin'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -138,6 +309,25 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Algoritmo y coste del hash de contraseñas y respuestas de seguridad (core/hashers.py).
+# `manage.py calibrate_hashers` mide cada algoritmo en esta máquina y propone el coste.
+# 0 = valor por defecto de Django. Los hashes con otro algoritmo o coste se rehacen al verificarlos.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')  # pbkdf2, argon2 (argon2-cffi) o scrypt
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=0, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=0, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=0, cast=int)  # KiB
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=0, cast=int)
+
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+}
+# El primero cifra; el resto solo verifica hashes anteriores
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -156,6 +346,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Ficheros de las lecciones y clips de señas, servidos por core.views.MediaView
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+MEDIA_URL = '/api/media/'
+# Delegación en el proxy frontal: prefijo de la location interna de nginx (X-Accel-Redirect)
+# o X-Sendfile (Apache/lighttpd). Vacío/False = Django sirve el fichero con FileResponse.
+MEDIA_X_ACCEL_PREFIX = config('MEDIA_X_ACCEL_PREFIX', default='')
+MEDIA_X_SENDFILE = config('MEDIA_X_SENDFILE', default=False, cast=bool)
+MEDIA_ACCESS_CACHE_TTL = 60  # Segundos que se recuerda si un fichero es accesible
+
+# Subidas por partes de clips de entrenamiento y extracción de frames (core.uploads)
+UPLOAD_ROOT = config('UPLOAD_ROOT', default=str(BASE_DIR / 'uploads'))
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=500 * 1024 * 1024, cast=int)  # Bytes por fichero
+UPLOAD_MAX_CHUNK = config('UPLOAD_MAX_CHUNK', default=8 * 1024 * 1024, cast=int)  # Bytes por petición
+UPLOAD_PROCESS_WORKERS = config('UPLOAD_PROCESS_WORKERS', default=0, cast=int)  # 0 = un proceso por CPU
+UPLOAD_FRAME_SIZE = 224  # Lado de los frames normalizados
+UPLOAD_THUMBNAIL_SIZE = 160
+UPLOAD_MAX_FRAMES = 300
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traductor_LSE.settings')
 
 application = get_wsgi_application()
+
+from core.scheduler import start_background_tasks  # noqa: E402  (requiere Django configurado)
+
+start_background_tasks()